@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" CalvOS DBC import benchmark.
+
+Generates a synthetic production-size CAN database (DBC format) and measures:
+    - The time to read it (comgen.dbc.parse_dbc).
+    - The time to load it as a CAN network component of a calvos project (Network_CAN
+      model built from the database, model cache disabled).
+
+Usage:
+    python benchmarks/benchmark_dbc.py [--messages N] [--signals-per-message N] [--nodes N]
+                                       [--runs N] [--keep FOLDER]
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import os
+import sys
+import time
+import logging
+import pathlib as pl
+import tempfile
+from argparse import ArgumentParser
+
+DEFAULT_MESSAGES = 1500
+DEFAULT_SIGNALS_PER_MESSAGE = 10
+DEFAULT_NODES = 40
+
+# Value tables of the synthetic database {name : [(value, description), ...]}
+VALUE_TABLES = {"VT_OnOff" : [(0, "Off"), (1, "On"), (3, "Not Available")], \
+                "VT_Gear" : [(0, "Park"), (1, "Reverse"), (2, "Neutral"), (3, "Drive"), \
+                             (15, "Invalid")], \
+                "VT_Status" : [(0, "OK"), (1, "Warning"), (2, "Error"), (3, "SNA")]}
+
+PROJECT_TEMPLATE = """<?xml version="1.0" ?>
+<CalvosProject>
+	<Name>DBC benchmark</Name>
+	<Desc/>
+	<Version/>
+	<Date/>
+	<Components>
+		<Component type="comgen.CAN">
+			<Name>Benchmark network</Name>
+			<Desc/>
+			<Input type="dbc">"usr_in/%s"</Input>
+			<Params>
+			</Params>
+		</Component>
+	</Components>
+	<Params>
+		<Param id="log_level">WARNING</Param>
+	</Params>
+</CalvosProject>
+"""
+
+#===================================================================================================
+def gen_dbc(file_name, messages_count, signals_per_message, nodes_count):
+    """ Writes a synthetic DBC file.
+
+    Each message has signals_per_message signals laid out back to back (little endian, except
+    for one big endian signal per message), some of them using value tables or own value
+    descriptions. Messages have comments, cycle time and send type attributes.
+
+    Returns
+    -------
+        tuple
+            (number of messages, number of signals)
+    """
+    nodes = ["ECU_%02d" % idx for idx in range(nodes_count)]
+    signal_len = (64 // signals_per_message) if signals_per_message <= 64 else 1
+    lines = ['VERSION "benchmark"', '', 'NS_ :', '\tCM_', '\tBA_DEF_', '\tVAL_', '', 'BS_:', \
+             '', 'BU_: ' + " ".join(nodes), '']
+    for name, values in VALUE_TABLES.items():
+        lines.append("VAL_TABLE_ %s %s ;" \
+                     % (name, " ".join('%s "%s"' % value for value in values)))
+    lines.append("")
+
+    comments = ['CM_ "Synthetic database for the DBC import benchmark.";']
+    attributes = []
+    value_descriptions = []
+    signals_count = 0
+    for msg_idx in range(messages_count):
+        if msg_idx % 5 == 4:
+            raw_id = 0x80000000 | (0x18000000 + msg_idx)
+        else:
+            raw_id = msg_idx + 1
+        msg_name = "MSG_%04d" % msg_idx
+        transmitter = nodes[msg_idx % nodes_count]
+        receivers = [nodes[(msg_idx + offset) % nodes_count] for offset in (1, 2, 3)]
+        lines.append("BO_ %s %s: 8 %s" % (raw_id, msg_name, transmitter))
+        for sig_idx in range(signals_per_message):
+            sig_name = "SIG_%04d_%02d" % (msg_idx, sig_idx)
+            if sig_idx == 0 and signal_len <= 8:
+                # Big endian signal within the first byte (start bit is the msb)
+                layout = "%s|%s@0+" % (signal_len - 1, signal_len)
+            else:
+                layout = "%s|%s@1+" % (sig_idx * signal_len, signal_len)
+            lines.append(' SG_ %s : %s (0.5,-10) [-10|100] "km/h" %s' \
+                         % (sig_name, layout, ",".join(receivers[:1 + sig_idx % 3])))
+            if sig_idx % 4 == 1:
+                value_table = list(VALUE_TABLES.values())[sig_idx % len(VALUE_TABLES)]
+                value_descriptions.append("VAL_ %s %s %s ;" % (raw_id, sig_name, \
+                    " ".join('%s "%s"' % value for value in value_table)))
+            elif sig_idx % 4 == 3:
+                value_descriptions.append('VAL_ %s %s 0 "Idle %s" 1 "Active %s" ;' \
+                                          % (raw_id, sig_name, sig_idx, sig_idx))
+            if sig_idx % 2 == 0:
+                comments.append('CM_ SG_ %s %s "Signal %s of message %s.";' \
+                                % (raw_id, sig_name, sig_idx, msg_name))
+                attributes.append('BA_ "GenSigStartValue" SG_ %s %s %s;' \
+                                  % (raw_id, sig_name, sig_idx % 3))
+            signals_count += 1
+        lines.append("")
+        comments.append('CM_ BO_ %s "Message %s published by %s.";' \
+                        % (raw_id, msg_name, transmitter))
+        attributes.append('BA_ "GenMsgCycleTime" BO_ %s %s;' % (raw_id, 10 * (1 + msg_idx % 10)))
+        attributes.append('BA_ "GenMsgSendType" BO_ %s %s;' % (raw_id, msg_idx % 3))
+
+    lines.extend(comments)
+    lines.extend(['BA_DEF_ "DBName" STRING ;', \
+                  'BA_DEF_ BO_ "GenMsgCycleTime" INT 0 65535;', \
+                  'BA_DEF_ BO_ "GenMsgSendType" ENUM "Cyclic","Spontaneous","CyclicAndSpontan";', \
+                  'BA_DEF_ SG_ "GenSigStartValue" INT 0 65535;', \
+                  'BA_DEF_DEF_ "DBName" "";', \
+                  'BA_DEF_DEF_ "GenMsgCycleTime" 0;', \
+                  'BA_DEF_DEF_ "GenMsgSendType" "Cyclic";', \
+                  'BA_DEF_DEF_ "GenSigStartValue" 0;', \
+                  'BA_ "DBName" "Benchmark";'])
+    lines.extend(attributes)
+    lines.extend(value_descriptions)
+
+    with open(str(file_name), "w", encoding = "latin-1", newline = "\r\n") as f:
+        f.write("\n".join(lines) + "\n")
+
+    return (messages_count, signals_count)
+
+#===================================================================================================
+def best_time(function, runs):
+    """ Runs function the given number of times, returns (best time in seconds, result). """
+    best = None
+    result = None
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return (best, result)
+
+#===================================================================================================
+def main():
+    parser = ArgumentParser(description = "Measures the import of a synthetic DBC database.")
+    parser.add_argument("--messages", type = int, default = DEFAULT_MESSAGES, \
+                        help = "Number of messages. Default is %s." % DEFAULT_MESSAGES)
+    parser.add_argument("--signals-per-message", type = int, \
+                        default = DEFAULT_SIGNALS_PER_MESSAGE, \
+                        help = "Number of signals per message. Default is %s." \
+                        % DEFAULT_SIGNALS_PER_MESSAGE)
+    parser.add_argument("--nodes", type = int, default = DEFAULT_NODES, \
+                        help = "Number of nodes. Default is %s." % DEFAULT_NODES)
+    parser.add_argument("--runs", type = int, default = 3, \
+                        help = "Number of runs, best one is taken. Default is 3.")
+    parser.add_argument("--keep", default = None, \
+                        help = "Folder where the benchmark project is created and kept. " \
+                        + "A temporary folder is used by default.")
+    args = parser.parse_args()
+
+    engine_path = pl.Path(__file__).parent.parent.absolute()
+    sys.path.insert(0, str(engine_path))
+    calvos_path = engine_path / "calvos"
+
+    if args.keep is None:
+        temp_folder = tempfile.TemporaryDirectory(prefix = "calvos_dbc_")
+        project_path = pl.Path(temp_folder.name)
+    else:
+        temp_folder = None
+        project_path = pl.Path(args.keep).absolute()
+    (project_path / "usr_in").mkdir(parents = True, exist_ok = True)
+    dbc_file = project_path / "usr_in" / "benchmark.dbc"
+    project_file = project_path / "project.xml"
+
+    messages_count, signals_count = gen_dbc(dbc_file, args.messages, \
+                                            args.signals_per_message, args.nodes)
+    with open(str(project_file), "w") as f:
+        f.write(PROJECT_TEMPLATE % dbc_file.name)
+    print("Database: %s messages, %s signals, %.1f MB" \
+          % (messages_count, signals_count, os.path.getsize(str(dbc_file)) / 1e6))
+
+    import calvos.common.logsys as lg
+    lg.log_system = lg.Log(logging.WARNING, project_path / "log.log", to_console = False)
+
+    import calvos.common.codegen as cg
+    import calvos.common.project as pj
+    import calvos.comgen.dbc as dbc
+    cg.calvos_path = calvos_path
+    cg.calvos_project_path = project_path
+
+    read_time, database = best_time(lambda: dbc.parse_dbc(dbc_file), args.runs)
+    print("%-24s %8.3f s  (%s messages, %s signals)" \
+          % ("Read DBC:", read_time, len(database.messages), \
+             sum(len(message.signals) for message in database.messages.values())))
+
+    project = pj.Project("DBC benchmark", project_file, calvos_path)
+    project.load_project()
+    project.update_simple_param("common.project", "project_model_cache", False)
+    component = project.components[0]
+
+    def load_network():
+        project.load_component(component)
+        return component.component_object
+
+    warnings_count = lg.log_system.counters["warning"]
+    load_time, network = best_time(load_network, args.runs)
+    if network is None:
+        print("Failed to load the network, see '%s'." % (project_path / "log.log"))
+        return 1
+    print("%-24s %8.3f s  (%s messages, %s signals, %s enum types)" \
+          % ("Load Network_CAN:", load_time, len(network.messages), len(network.signals), \
+             len(network.enum_types)))
+    print("Warnings per load: %s" \
+          % ((lg.log_system.counters["warning"] - warnings_count) // max(1, args.runs)))
+
+    logging.shutdown()
+    if temp_folder is not None:
+        temp_folder.cleanup()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
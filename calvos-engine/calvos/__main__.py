@@ -18,10 +18,8 @@ of embedded systems in C-language.
 import sys
 import os
 import pathlib as pl
-import shutil
 import logging
 import traceback
-import csv
 
 from argparse import ArgumentParser
 from argparse import RawDescriptionHelpFormatter
@@ -154,6 +152,23 @@ USAGE
             help=("Optional. Backups of the overwritten C-code during an export operation " \
                   + "will be placed in the provided BACKUP path. " \
                   + "This is only used if -e argument was provided."))
+        parser.add_argument("-j","--jobs", dest="jobs", required=False, type=int, \
+            help=("Optional. Number of worker processes used for code generation. " \
+                  + "Default is 1 (no worker processes)."))
+        parser.add_argument("-i","--incremental", dest="incremental", required=False, \
+            action="store_true", \
+            help=("Optional. Incremental generation. Output folder is not cleaned and components " \
+                  + "whose inputs didn't change since the last generation are skipped."))
+        parser.add_argument("-w","--watch", dest="watch", required=False, \
+            action="store_true", \
+            help=("Optional. Resident mode. After processing the project, its user inputs, " \
+                  + "project file and templates are watched for changes and only the affected " \
+                  + "components are re-generated (and exported if -e is given). Stop with Ctrl+C."))
+        parser.add_argument("--pickle-models", dest="pickle_models", required=False, \
+            action="store_true", \
+            help=("Optional. Debug mode. Project and component models are handed over to the " \
+                  + "code generation templates through pickle files in the working directory " \
+                  + "instead of in-process."))
         
 
         # Process arguments
@@ -282,8 +297,10 @@ USAGE
             # Setup needed calvOS project folders
             #==============================================================================
             log.info("main","Setting up project folders.")
-            #Delete output and working directories
-            cg.delete_folder_contents(project_path_output)
+            # Delete working directory. Generated files in the output directory are kept so
+            # that unchanged ones are not re-written (stale ones are deleted after generation).
+            if args.incremental is False:
+                cg.delete_folder_contents(project_path_working_dir)
               
             # Recreate output folder structure
             cg.create_folder(project_path_output)
@@ -304,135 +321,69 @@ USAGE
             
             calvos_project.load_project()
             
+            def set_project_options(project_obj):
+                """ Applies command line options to the project parameters. """
+                if args.jobs is not None:
+                    project_obj.update_simple_param("common.project", "project_jobs", args.jobs)
+                
+                if args.pickle_models is True:
+                    project_obj.update_simple_param("common.project", "project_pickle_models", \
+                                                    True)
+                
+                if args.incremental is True:
+                    project_obj.update_simple_param("common.project", "project_incremental", True)
+            
+            set_project_options(calvos_project)
+            
             calvos_project.process_project()
             
+            # Delete output files not generated in this run (incremental mode deletes the
+            # stale outputs based on the generation manifest).
+            if args.incremental is False:
+                import calvos.common.cogtemplates as ctpl
+                cg.delete_folder_contents(project_path_output, ctpl.output_files \
+                    + [project_path_working_dir, project_path_docs])
+            
             #==============================================================================
             # Process export argument
             #==============================================================================
             if args.export is not None:
-                log.info("main","============== Exporting generated code. ==============")
-                print("INFO: Exporting generated C-code...")
+                import calvos.common.export as ex
+                
                 export_path = string_to_path(args.export)
-                if cg.folder_exists(export_path):
-                    # Get files to export
-                    c_files = list(project_path_output.glob('*.c'))
-                    h_files = list(project_path_output.glob('*.h'))
-                    
-                    # If backup location is defined then do the backup
-                    if args.backup is not None:
-                        MAX_BKUP_COPIES = 10
-                        current_bkup_copy = 0
-                        create_header = False
-
-                        log.info("main","-------------- Backing up files. --------------")
-                        print("INFO: Backing up C-code to be overwritten during export...")
-                        backup_path =  string_to_path(args.backup)
-                        if export_path != backup_path:
-                            if cg.folder_exists(backup_path) is False:
-                                log.info("main", " Backup path '%s' doesn't exist, creating it..." \
-                                         % backup_path)
-                                cg.create_folder(backup_path)
-                            # Check if history file exists
-                            try:
-                                history_file_name = "backup_history.csv"
-                                history_fields = ['bkpu_set', 'store_date']
-                                history_file = backup_path / history_file_name
-                                if cg.file_exists(history_file):
-                                    # Get last stored backup set
-                                    with open(history_file, newline='') as csvfile:
-                                        reader = csv.DictReader(csvfile, fieldnames=history_fields)
-                                        for row in reader:
-                                            current_bkup_copy = row['bkpu_set']
-                                            
-                                        #current_bkup_copy = int(writer[-1][history_fields[0]])
-                                        current_bkup_copy = int(current_bkup_copy)
-                                        # increment bkup copy
-                                        if current_bkup_copy < MAX_BKUP_COPIES - 1:
-                                            current_bkup_copy += 1
-                                        else:
-                                            current_bkup_copy = 0
-                                else:
-                                    # Create history file header
-                                    create_header = True
-                                    current_bkup_copy = 0
-                            except Exception as e:
-                                current_bkup_copy = MAX_BKUP_COPIES
-                                print(("WARNING: Error accessing bkup history file (backup_history.csv). " \
-                                      + "Backed up in set number %s.") % MAX_BKUP_COPIES)
-                                log.warning(("Error accessing bkup history file (backup_history.csv). " \
-                                      + "Backed up in set number %s.") % MAX_BKUP_COPIES)
-                            
-                            # Backup files to be overwritten
-                            file_counter = 0
-                            for file in c_files:
-                                file_name = str(file.name)
-                                file_name_dest = file_name
-                                if current_bkup_copy > 0:
-                                    file_name_dest = str(current_bkup_copy) + "_" +  file_name_dest
-                                orig_file = export_path / file_name
-                                dest_file = backup_path / file_name_dest
-                                if cg.file_exists(orig_file):
-                                    # Copy file to backup location
-                                    shutil.copy(orig_file, dest_file)
-                                    file_counter += 1
-                            for file in h_files:
-                                file_name = str(file.name)
-                                file_name_dest = file_name
-                                file_name_dest = str(current_bkup_copy) + "_" + file_name_dest 
-                                orig_file = export_path / file_name
-                                dest_file = backup_path / file_name_dest
-                                if cg.file_exists(orig_file):
-                                    # Copy file to backup location
-                                    shutil.copy(orig_file, dest_file)
-                                    file_counter += 1
-                            
-                            # Write history file with latest information
-                            with open(history_file, 'a', newline='') as csvfile:
-                                writer = csv.DictWriter(csvfile, fieldnames=history_fields)
-                                if create_header:
-                                    writer.writeheader()
-                                writer.writerow({history_fields[0] : str(current_bkup_copy), 
-                                                history_fields[1] : "\tCreated on " \
-                                                + cg.get_local_time_formatted() \
-                                                + ". " + str(file_counter) + " file(s) backed-up."})
-                            
-                            log.info("main", " Backup completed. '%s' file(s) backed-up." \
-                                         % file_counter)
-                            print("INFO: Backup completed. '%s' file(s) backed-up." % file_counter)
-                        else:
-                            arguments_OK = False
-                            log.warning("main", "Provided Export and Backup folders are same. " \
-                                + "Export operation cancelled.")
-                    
-                    # Export files
-                    if arguments_OK is True:
-                        log.info("main","-------------- Exporting files. --------------")
-                        
-                        file_counter = 0
-                        for file in c_files:
-                            file_name = file.name
-                            orig_file = project_path_output / file_name
-                            dest_file = export_path / file_name
-                            if cg.file_exists(orig_file):
-                                # Copy file to backup location
-                                shutil.copy(orig_file, dest_file)
-                                file_counter += 1
-                        for file in h_files:
-                            file_name = file.name
-                            orig_file = project_path_output / file_name
-                            dest_file = export_path / file_name
-                            if cg.file_exists(orig_file):
-                                # Copy file to backup location
-                                shutil.copy(orig_file, dest_file)
-                                file_counter += 1
-                        
-                        log.info("main", "Export completed. '%s' file(s) exported." % file_counter)
-                        print("INFO: Export completed. '%s' file(s) exported." % file_counter)
-                else:
-                    print("ERROR: Export folder '%s' doesn't exist. No export performed." \
-                             % export_path)
-                    log.warning("main", "Export folder '%s' doesn't exist. No export performed." \
-                             % export_path)
+                backup_path = None
+                if args.backup is not None:
+                    backup_path = string_to_path(args.backup)
+                export_threads = ex.DEFAULT_THREADS
+                if args.jobs is not None and args.jobs > export_threads:
+                    export_threads = args.jobs
+                
+                def export_code(project_obj = None):
+                    ex.export_code(project_path_output, export_path, backup_path, export_threads)
+                
+                export_code()
+            else:
+                export_code = None
+            
+            #==============================================================================
+            # Process watch argument
+            #==============================================================================
+            if args.watch is True:
+                import calvos.common.watch as wt
+                
+                def reload_project():
+                    log.info("main",'Re-loading project "%s"' % project_file)
+                    reloaded_project = pj.Project("Project Name", project_file, calvos_path)
+                    reloaded_project.load_project()
+                    set_project_options(reloaded_project)
+                    return reloaded_project
+                
+                watcher = wt.ProjectWatcher(calvos_project)
+                try:
+                    watcher.watch(reload_project, export_code)
+                except KeyboardInterrupt:
+                    log.info("main","Watch mode stopped.")
+                    print("INFO: Watch mode stopped.")
             
             log.info("main","============== Finished calvOS project processing. ==============")
             print("INFO: ============== Finished calvOS project processing. ==============")
@@ -12,12 +12,9 @@ __version__ = '0.0.1'
 __date__ = '2020-08-03'
 __updated__ = '2020-12-18'
     
-import pyexcel as pe
+import re
 import math
-from lxml import etree as ET
-import xml.dom.minidom
 import pickle
-import cogapp as cog
 import pathlib as pl
 import importlib
 import json
@@ -25,7 +22,10 @@ import copy
 
 import calvos.common.codegen as cg
 import calvos.common.logsys as lg
+import calvos.common.cogtemplates as ctpl
 import calvos.common.general as grl
+import calvos.common.odsreader as ods
+import calvos.common.modelcache as mc
 
 # --------------------------------------------------------------------------------------------------
 # Definitions for the logging system
@@ -86,9 +86,27 @@ WRITE = 1
 # Constants for indicating message direction (transmission or reception)
 CAN_TX = 0
 CAN_RX = 1
+# Forms of the lookup of RX messages (values of parameter CAN_msg_search_algorithm), listed in order
+# of preference when two forms have the same cost. See Network_CAN.NodeView.set_rx_lookup.
+RX_LOOKUP_DIRECT = "direct"
+RX_LOOKUP_HASH = "hash"
+RX_LOOKUP_SWITCH = "switch"
+RX_LOOKUP_SEARCH_TREE = "search_tree"
+rx_lookup_list = (RX_LOOKUP_DIRECT, RX_LOOKUP_HASH, RX_LOOKUP_SWITCH, RX_LOOKUP_SEARCH_TREE)
+# Forms of the supervision of RX message timeouts (values of parameter CAN_rx_timeout_supervision).
+# See Network_CAN.NodeView.set_rx_timeouts.
+RX_TIMEOUT_SCAN = "scan"
+RX_TIMEOUT_TIMER_WHEEL = "timer_wheel"
+rx_timeout_supervision_list = (RX_TIMEOUT_SCAN, RX_TIMEOUT_TIMER_WHEEL)
+# Maximum number of slots of the RX timeout timer wheel (slots are indexed with 16 bits)
+RX_TIMEOUT_WHEEL_MAX_SLOTS = 0x8000
 
 # Cog sources to use for code generation of this module
 cog_sources = cg.CogSources("comgen.CAN")
+
+# Version of the model classes (Network_CAN and inner classes). Shall be incremented whenever
+# they change so that cached models (see common.modelcache) are discarded.
+MODEL_SCHEMA_VERSION = 8
     
 #===================================================================================================
 class Network_CAN:
@@ -152,6 +170,26 @@ class Network_CAN:
         self.messages = {} # {message name, message object}
         self.signals = {}# {signal name, signal object}
         
+        # Indexes for validating new messages and signals layout in constant time. Updated by
+        # add_message and add_signal_to_message (see update_indexes).
+        self.messages_by_id = {} # {message id : message name}
+        self.messages_occupancy = {} # {message name : bits taken by signals (int bitmap)}
+        # Indexes for queries of the network (e.g., from the templates). Updated by add_signal,
+        # add_message, add_tx_message_to_node, add_signal_to_message and remove_node.
+        # Signals of a message are listed in the order of the network (see signals_positions),
+        # messages of a node in the order they were assigned.
+        self.signals_positions = {} # {signal name : position in the network signals}
+        self.messages_signals = {} # {message name : [signal name, ...]}
+        self.nodes_tx_messages = {} # {publisher node name : [message name, ...]}
+        # (signals sorted by layout, names of signals without message), None if not sorted yet.
+        # See get_sorted_signals_by_layout.
+        self.sorted_signals = None
+        # Signal access plans {(access, signal layout, compiler settings) : SignalAccess object}
+        # and access of each signal {(access, signal name) : (plan key, SignalAccess object)}.
+        # See get_signal_access.
+        self.signal_access_plans = {}
+        self.signals_access = {}
+        
         # Code generation parameters for CAN network
         self.gP = cg.GenParams("CAN_gen_params","comgen.CAN" \
             ,"Parameters for code generation of this CAN network.")
@@ -169,6 +207,13 @@ class Network_CAN:
         
         self.subnetwork = None # Expect object of class Network_CAN
         
+        # True if this object is a subnetwork view of another network (see get_subnetwork)
+        self.is_subnetwork = False
+        # Subnetworks of this subnetwork view {tuple of node names : Network_CAN object}
+        self.subnetworks = {}
+        # Node views of this subnetwork view {node name : NodeView object}, see get_node_view
+        self.node_views = {}
+        
         self.gen_path = self.project_obj.get_component_gen_path(self.module)
            
     #===============================================================================================
@@ -417,6 +462,7 @@ class Network_CAN:
         """ Removes the specified node from the network. """
         if name in self.nodes:
             self.nodes.pop(name)
+            self.nodes_tx_messages.pop(name, None)
         else:
             #Node doesn't exist
             log_warn(("Node \"" + name + "\" doesn't exist"))
@@ -432,17 +478,14 @@ class Network_CAN:
                 raw_id = cg.get_valid_number(msg_id)
                 if raw_id is not None:
                     #Verify that the message ID is not already taken
-                    id_already_taken = False
-                    for message in self.messages.values():
-                        if message.id == msg_id:
-                            id_already_taken = True
-                            break;
-                    
-                    if not id_already_taken:
+                    if raw_id not in self.messages_by_id:
                         #Create new message object in the network
-                        self.messages.update( {name : \
-                            self.Message(name, msg_id, length, extended_id, tx_type, \
-                                         tx_period, tx_baf_repeats, description)} )
+                        message = self.Message(name, msg_id, length, extended_id, tx_type, \
+                                               tx_period, tx_baf_repeats, description)
+                        self.messages.update({name : message})
+                        self.messages_by_id.setdefault(message.id, name)
+                        self.messages_occupancy.update({name : 0})
+                        self.messages_signals.update({name : []})
                     else:
                         log_warn(("Duplicated Message Id: \"" + str(msg_id) \
                               + "\". Message \"" + name + "\" not added to the network."))
@@ -466,6 +509,8 @@ class Network_CAN:
                 if self.messages[message_name].get_publisher() is None or \
                     self.messages[message_name].get_publisher() == node_name:
                     # Add publisher to the given message
+                    if self.messages[message_name].get_publisher() is None:
+                        self.nodes_tx_messages.setdefault(node_name, []).append(message_name)
                     self.messages[message_name].set_publisher(node_name)
                 else:
                     log_warn(("Message: \"" + message_name \
@@ -491,13 +536,7 @@ class Network_CAN:
                 for node in temporal_entries:
                     if node in self.nodes:
                         #Check if message is not set as published by this node
-                        published_by_this_node = False
-                        for message in self.messages.values():
-                            if message_name == message.name \
-                                    and message.publisher == node:
-                                published_by_this_node = True
-                                break
-                        if not published_by_this_node:    
+                        if self.messages[message_name].publisher != node:
                             #Add subscribed message and its timeout
                             self.nodes[node].add_subscriber(message_name, \
                                       temporal_entries[node])
@@ -552,9 +591,7 @@ class Network_CAN:
         """ Gets the direction ('Tx', 'Rx' or None) for the given node. """
         return_value = [] # List of node names
         if node_name in self.nodes:
-            for message in self.messages.values():
-                if message.publisher == node_name:
-                    return_value.append(message.name)
+            return_value.extend(self.nodes_tx_messages.get(node_name, []))
             for message_name in self.nodes[node_name].subscribed_messages.keys():
                 return_value.append(message_name)  
         return return_value          
@@ -566,10 +603,8 @@ class Network_CAN:
         return_data = [] # [signal_object_1, signal_object_2, ...]
         
         if message_name in self.messages:
-            for signal in self.signals.values():
-                if signal.message == message_name:
-                    # Add this signal object to the return value
-                    return_data.append(signal)
+            for signal_name in self.messages_signals[message_name]:
+                return_data.append(self.signals[signal_name])
         else:
             return_data = None
             #TODO: warning, message not found.
@@ -1008,6 +1043,8 @@ class Network_CAN:
                 #Create new signal object in the network
                 self.signals.update( {name : \
                                       self.Signal(name, lenght, description)} )
+                self.signals_positions.update({name : len(self.signals_positions)})
+                self.clear_sorted_signals()
             else:
                 log_warn(("Duplicated Signal: \"" + name + \
                           "\" not added to the network."))
@@ -1043,25 +1080,16 @@ class Network_CAN:
                                       + message_name + "\"."))
                     else:
                         #check if signal space is not occupied by other signals
-                        space_occupied = False
-                        for signal in self.signals.values():
-                            if signal.message == message_name:
-                                #Current signal is assgined to the target message
-                                #Check if space doesn't overlap with the new one
-                                absolute_start_bit = (int(signal.start_byte) * 8) \
-                                                    + int(signal.start_bit)
-                                absolute_end_bit = absolute_start_bit \
-                                                    + int(signal.len) - 1
-                                
-                                if cg.ranges_overlap(absolute_start_bit, \
-                                                       absolute_end_bit, \
-                                                       new_absolute_start_bit, \
-                                                       new_absolute_end_bit) is True:
-                                    space_occupied = True
-                                    log_warn(("Signal \"" + signal_name \
-                                      + "\" overlaps with signal \"" \
-                                      + signal.name + "\"."))
-                                    break
+                        new_bits = ((1 << self.signals[signal_name].len) - 1) \
+                                    << new_absolute_start_bit
+                        space_occupied = \
+                            (self.messages_occupancy[message_name] & new_bits) != 0
+                        if space_occupied is True:
+                            overlapped_signal = \
+                                self.get_overlapped_signal(message_name, new_bits)
+                            log_warn(("Signal \"" + signal_name \
+                              + "\" overlaps with signal \"" \
+                              + str(overlapped_signal) + "\"."))
                         if space_occupied is False:
                             # If signal is of array type (data_types_list[ARRAY]) 
                             # then verify that aboslute start bit is byte-aligned 
@@ -1074,11 +1102,30 @@ class Network_CAN:
                             and len_modulus == 0) \
                             or (self.signals[signal_name].data_type != \
                             data_types_list[ARRAY]):
+                                # Release the space taken in the previous conveyor message
+                                previous_bits = self.get_signal_bits(signal_name)
+                                previous_message = self.signals[signal_name].message
+                                if previous_bits != 0 \
+                                and previous_message in self.messages_occupancy:
+                                    self.messages_occupancy[previous_message] &= ~previous_bits
+                                if previous_message in self.messages_signals \
+                                and signal_name in self.messages_signals[previous_message]:
+                                    self.messages_signals[previous_message].remove(signal_name)
                                 #Set signal's conveyor message
                                 self.signals[signal_name].set_conveyor_message(message_name)
                                 #Set layout information
                                 self.signals[signal_name].set_layout_info(start_byte, \
                                                start_bit)
+                                self.messages_occupancy[message_name] |= new_bits
+                                self.clear_sorted_signals()
+                                # Keep signals of the message in the order of the network
+                                message_signals = self.messages_signals[message_name]
+                                position = self.signals_positions[signal_name]
+                                index = len(message_signals)
+                                while index > 0 and position \
+                                < self.signals_positions[message_signals[index - 1]]:
+                                    index -= 1
+                                message_signals.insert(index, signal_name)
                             else:
                                 log_warn(("Signal \"" + signal_name \
                                       + "\" is of array type and its start bit " \
@@ -1100,6 +1147,51 @@ class Network_CAN:
             log_warn(("Message \"" + message_name + "\" associated to signal \"" \
                       + signal_name + "\" is not defined."))
             
+    #===============================================================================================
+    def get_signal_bits(self, signal_name):
+        """ Returns the bits (int bitmap) taken by the given signal in its conveyor message, 0 if
+        the signal has no layout. """
+        signal = self.signals[signal_name]
+        return_value = 0
+        if signal.message is not None and signal.start_byte is not None \
+        and signal.start_bit is not None and signal.len is not None:
+            return_value = ((1 << int(signal.len)) - 1) \
+                << ((int(signal.start_byte) * 8) + int(signal.start_bit))
+        return return_value
+    
+    #===============================================================================================
+    def get_overlapped_signal(self, message_name, bits):
+        """ Returns the name of the first signal of the given message taking any of the given
+        bits (int bitmap), None if there is none. """
+        return_value = None
+        for signal_name in self.messages_signals[message_name]:
+            if (self.get_signal_bits(signal_name) & bits) != 0:
+                return_value = signal_name
+                break
+        return return_value
+    
+    #===============================================================================================
+    def update_indexes(self):
+        """ Rebuilds the indexes of messages and signals from the current messages and signals
+        (e.g., after messages or signals are removed). """
+        self.clear_sorted_signals()
+        self.messages_by_id = {}
+        self.messages_occupancy = {}
+        self.signals_positions = {signal_name : position for position, signal_name \
+                                  in enumerate(self.signals)}
+        self.messages_signals = {}
+        self.nodes_tx_messages = {}
+        for message in self.messages.values():
+            self.messages_by_id.setdefault(message.id, message.name)
+            self.messages_occupancy.update({message.name : 0})
+            self.messages_signals.update({message.name : []})
+            if message.publisher in self.nodes:
+                self.nodes_tx_messages.setdefault(message.publisher, []).append(message.name)
+        for signal in self.signals.values():
+            if signal.message in self.messages_occupancy:
+                self.messages_occupancy[signal.message] |= self.get_signal_bits(signal.name)
+                self.messages_signals[signal.message].append(signal.name)
+    
     #===============================================================================================    
     def set_signal_data_type(self, signal_name, data_type):
         """ Sets the data type of a signal. """
@@ -1132,204 +1224,58 @@ class Network_CAN:
         """ Sorts the signals in this network according to their layout.
         
         Sorting order is as follows: sort by message name, then by start byte, then by start bit.
+        Signals with same layout keep their order in the network. Signals without conveyor
+        message are not included (a warning is logged for each one).
+        
+        The sorting is kept until the signals or their layout change (see
+        clear_sorted_signals).
+        
+        Returns
+        -------
+            dict or list
+                If grouped_by_message is False, a dictionary {signal name : signal object} of
+                the sorted signals. Otherwise, a list with a list of signals per message, each
+                signal given as a dictionary {signal name : signal object}.
+                None if the network has no signals.
         """
-        return_list = {}
-        sorted_signals_list = []
-        
-        # If input signals has elements do the sorting, otherwise return empty output.
-        if len(self.signals) > 0:
-            # Create working list of signals
-            for signal in self.signals:
-                if self.signals[signal].message is not None:
-                    sorted_signals_list.append({signal : self.signals[signal]})
-                else:
-                    log_warn(("Signal: \"" + signal \
-                            + "\" doesn't have a publishing message."))
-                
-            # Sort signals by their messages
-            sorted_signals_list = \
-                sorted(sorted_signals_list, \
-                       key= lambda signal_entry : list(signal_entry.values())[0].message)
-
-            # Sort signals by layout within each message
-            # Following code will create temporal individual lists of signals
-            # for each message, then sort them. At the end all lists will be
-            # glued back together.
-            current_message = list(sorted_signals_list[0].values())[0].message
-            signals_of_a_message = []
-            list_of_list_of_signals = []
-            counter = 0
-            
-            for signal in sorted_signals_list:
-                
-                counter += 1
-                signal_object = list(signal.values())[0]
-                signal_name = list(signal.keys())[0]
-                
-                # Check if we have changed to another message or not
-                if signal_object.message == current_message:
-                    new_message = False
+        if len(self.signals) == 0:
+            return None
+        
+        if self.sorted_signals is None:
+            sorted_signals = []
+            unmapped_signals = []
+            for signal in self.signals.values():
+                if signal.message is not None:
+                    sorted_signals.append(signal)
                 else:
-                    # Jumping to a new message. Need to sort the list of the 
-                    # current message and then start the one of the new message
-                    new_message = True
+                    unmapped_signals.append(signal.name)
+            sorted_signals.sort(key = lambda signal : \
+                                (signal.message, signal.start_byte, signal.start_bit))
+            self.sorted_signals = (sorted_signals, unmapped_signals)
+        
+        sorted_signals, unmapped_signals = self.sorted_signals
+        for signal_name in unmapped_signals:
+            log_warn(("Signal: \"" + signal_name + "\" doesn't have a publishing message."))
+        
+        if grouped_by_message is False:
+            return_list = {signal.name : signal for signal in sorted_signals}
+        else:
+            # Group the sorted signals by message
+            return_list = []
+            current_message = None
+            for signal in sorted_signals:
+                if len(return_list) == 0 or signal.message != current_message:
+                    current_message = signal.message
+                    return_list.append([])
+                return_list[-1].append({signal.name : signal})
+        
+        return return_list
     
-                # For last item sort the list of current message and append it
-                # to the list of lists
-                if counter == len(sorted_signals_list):
-                    last_signal = True
-                else:
-                    last_signal = False 
-                # If from above code a sort and start new list is required
-                # then do it.    
-                
-                if not new_message and not last_signal:
-                    pre_add_signal = True
-                    sort_and_append = False
-                    post_add_signal = False
-                    append_directly = False
-                elif not new_message and last_signal:
-                    pre_add_signal = True
-                    sort_and_append = True
-                    post_add_signal = False
-                    append_directly = False
-                elif new_message and not last_signal:
-                    pre_add_signal = False
-                    sort_and_append = True
-                    post_add_signal = True
-                    append_directly = False
-                else: #new_byte and last_byte
-                    pre_add_signal = False
-                    sort_and_append = True
-                    post_add_signal = True
-                    append_directly = True
-                                
-                # Execute actions
-                if pre_add_signal:
-                    # Keep forming list of signals for a message
-                    signals_of_a_message.append({signal_name : signal_object})
-                if sort_and_append:
-                    # 1) Sort the list
-                    signals_of_a_message = \
-                        sorted(signals_of_a_message, \
-                               key= lambda signal_entry : \
-                               list(signal_entry.values())[0].start_byte)
-                    # Now sort by byte and bit  
-                    # ------------------------
-                    # Now sort each byte by start_bit
-                    # A new list for each byte will be created, then it will be
-                    # sorted. At the end it will be glued back to the list of the
-                    # message.
-                    current_byte = list(signals_of_a_message[0].values())[0].start_byte
-                    signals_by_start_byte = []
-                    list_of_lists_by_byte = []
-                    counter2 = 0
-                    for signal_in_byte in signals_of_a_message:
-                        counter2 += 1
-                        signal_name2 = list(signal_in_byte.keys())[0]
-                        signal_object2 = list(signal_in_byte.values())[0]
-                        
-                        # Check if we have changed to another byte or not
-                        if signal_object2.start_byte == current_byte:
-                            new_byte = False
-                            
-                        else:
-                            # Jumping to a new byte. Defer appending this new signal
-                            # until after the list for current byte is sorted
-                            # and appended to the parent's list.
-                            new_byte = True
-                        # For last item sort the list of current byte and append it
-                        # to the list of lists
-                        if counter2 == len(signals_of_a_message):
-                            last_byte = True
-                        else:
-                            last_byte = False
-                        # If from above code a sort and start new list is required
-                        # then do it.
-
-                        if not new_byte and not last_byte:
-                            pre_add_signal2 = True
-                            sort_and_append2 = False
-                            post_add_signal2 = False
-                            append_directly2 = False
-                        elif not new_byte and last_byte:
-                            pre_add_signal2 = True
-                            sort_and_append2 = True
-                            post_add_signal2 = False
-                            append_directly2 = False
-                        elif new_byte and not last_byte:
-                            pre_add_signal2 = False
-                            sort_and_append2 = True
-                            post_add_signal2 = True
-                            append_directly2 = False
-                        else: #new_byte and last_byte
-                            pre_add_signal2 = False
-                            sort_and_append2 = True
-                            post_add_signal2 = True
-                            append_directly2 = True
-                        # Execute actions
-                        if pre_add_signal2:
-                            # Keep forming list of signals by start byte
-                            signals_by_start_byte.append({signal_name2 : signal_object2})
-                        if sort_and_append2:
-                            # 1) Sort the list
-                            signals_by_start_byte = \
-                                sorted(signals_by_start_byte, \
-                                       key= lambda signal_entry : \
-                                       list(signal_entry.values())[0].start_bit)
-                            # 2) Append list to the parent's list
-                            list_of_lists_by_byte.append(signals_by_start_byte.copy())
-                        if post_add_signal2:
-                            current_byte = signal_object2.start_byte
-                            signals_by_start_byte.clear()
-                            signals_by_start_byte.append({signal_name2 : signal_object2})
-                            
-                        if append_directly2:
-                            # 2) Append list to the parent's list
-#                            signals_by_start_byte.clear()
-#                            signals_by_start_byte.append({signal_name2 : signal_object2})
-                            list_of_lists_by_byte.append(signals_by_start_byte.copy())
-
-                    # glue_back the list
-                    signals_of_a_message.clear()
-                    for this_list in list_of_lists_by_byte:
-                        for element in this_list:
-                            signal_name3 = list(element.keys())[0]
-                            signal_object3 = list(element.values())[0]
-                            signals_of_a_message.append({signal_name3 : \
-                                                         signal_object3})    
-                    # ------------------------
-                    
-                    # 3) Append list to the parent's list
-                    list_of_list_of_signals.append(signals_of_a_message.copy())
-                if post_add_signal:
-                    # Start the list of the new message
-                    current_message = signal_object.message
-                    signals_of_a_message.clear()
-                    signals_of_a_message.append({signal_name : signal_object})
-                    
-                if append_directly:
-                    # Append list to the parent's list
-                    list_of_list_of_signals.append(signals_of_a_message.copy())
-            
-
-            
-            if grouped_by_message is False:
-                #"flatten" the list to be ready to be returned. This list will
-                # contain each signal ordered by message and by layour (start 
-                # byte, start bit)
-                for this_list in list_of_list_of_signals:
-                    for element in this_list:
-                        signal_name = list(element.keys())[0]
-                        signal_object = list(element.values())[0]
-                        return_list.update({signal_name : signal_object})
-            else:
-                # Return list will contain a list for each found message
-                # each of these lists is indeed another list with the
-                # signals of that message ordered by layout.
-                return_list = list_of_list_of_signals
-            
-            return return_list
+    #===============================================================================================
+    def clear_sorted_signals(self):
+        """ Discards the sorting of signals kept by get_sorted_signals_by_layout. Shall be called
+        whenever signals are added or removed or their layout changes. """
+        self.sorted_signals = None
                 
     #===============================================================================================
     def sort_signals_by_layout(self):     
@@ -1338,6 +1284,7 @@ class Network_CAN:
         if len(sorted_signals) > 0:
             self.signals.clear()
             self.signals = sorted_signals.copy()
+            self.update_indexes()
     
     #===============================================================================================
     def signal_layout_is_cannonical(self, signal_name):
@@ -1362,255 +1309,304 @@ class Network_CAN:
 
     #===============================================================================================                
     def get_signal_abstract_read(self, signal_name):
-        """ Gets an abstract access to the signal for code generation. """
-        return_value = None
-        
-        if signal_name in self.signals:
-            signal = self.signals[signal_name]
-            
-            signal_access = Network_CAN.SignalAccess(signal_name, signal.len)
+        """ Gets an abstract access to the signal for code generation (see get_signal_access).
+        """
+        return self.get_signal_access(signal_name, READ)
+    
+    #===============================================================================================
+    @staticmethod
+    def gen_signal_access_read(signal):
+        """ Generates the abstract read access (SignalAccess object) of the given signal. """
+        signal_access = Network_CAN.SignalAccess(signal.name, signal.len)
+        
+        base_len = cg.calculate_base_type_len(signal.len)
+        
+        if base_len == 8:
+            # A single piece is enough for this signal
+            signal_piece = Network_CAN.SignalAccess.PieceAccess()
+            # Inner shifting (left shifting) is equal to the signal's start bit
+            if signal.start_bit > 0:
+                signal_piece.shift_inner = signal.start_bit
+            signal_piece.len = base_len
+            # Generate mask if required for removing most-significant bits
+            # not belonging to the signal.
+            if signal.len < 8:
+                mask_msb = int(255 << signal.len).to_bytes(8,'big')
+                mask_msb = hex(mask_msb[-1] ^ 255)
+                signal_piece.mask_outer =  mask_msb
+            # No outer shifting / inner masking is required in this case
+            signal_piece.abs_byte = signal.start_byte
+            signal_access.pieces.append(signal_piece)
             
-            base_len = cg.calculate_base_type_len(signal.len)
+        elif base_len <= cg.Compiler_max_size:
+            abs_start_bit = (signal.start_byte*8)  + signal.start_bit
+            abs_end_bit = abs_start_bit + signal.len - 1
+
+            abs_start_byte = signal.start_byte
+            abs_end_byte = int(math.floor(abs_end_bit / 8))
+
+            bytes_remaining = abs_end_byte - abs_start_byte + 1
+            bits_remaining = signal.len
+
+            current_byte = abs_start_byte
             
-            if base_len == 8:
-                # A single piece is enough for this signal
+            part_base_len = cg.calculate_base_type_len(bytes_remaining*8)
+            shifting_bits = 0
+            first_chunk = True
+
+            while (part_base_len / 8) > bytes_remaining:
+                # Signal doesn't fit in a single data type so multiple
+                # parts for accessing it are needed.
                 signal_piece = Network_CAN.SignalAccess.PieceAccess()
-                # Inner shifting (left shifting) is equal to the signal's start bit
-                if signal.start_bit > 0:
+                # Get next signal piece with a smaller data size than previously
+                part_base_len = int(part_base_len / 2)
+                # TODO: Is it ensured that reduced_type_len is never
+                # less than 8?
+                signal_piece.abs_byte = current_byte
+                signal_piece.len = part_base_len
+
+                if first_chunk is True and signal.start_bit > 0:
+                    # If signal doesn't start at bit zero then
+                    # right shifting is required.
                     signal_piece.shift_inner = signal.start_bit
-                signal_piece.len = base_len
-                # Generate mask if required for removing most-significant bits
-                # not belonging to the signal.
-                if signal.len < 8:
-                    mask_msb = int(255 << signal.len).to_bytes(8,'big')
-                    mask_msb = hex(mask_msb[-1] ^ 255)
-                    signal_piece.mask_outer =  mask_msb
-                # No outer shifting / inner masking is required in this case
-                signal_piece.abs_byte = signal.start_byte
-                signal_access.pieces.append(signal_piece)
-                
-            elif base_len <= cg.Compiler_max_size:
-                abs_start_bit = (signal.start_byte*8)  + signal.start_bit
-                abs_end_bit = abs_start_bit + signal.len - 1
-    
-                abs_start_byte = signal.start_byte
-                abs_end_byte = int(math.floor(abs_end_bit / 8))
-    
-                bytes_remaining = abs_end_byte - abs_start_byte + 1
-                bits_remaining = signal.len
-    
-                current_byte = abs_start_byte
-                
-                part_base_len = cg.calculate_base_type_len(bytes_remaining*8)
-                shifting_bits = 0
-                first_chunk = True
-
-                while (part_base_len / 8) > bytes_remaining:
-                    # Signal doesn't fit in a single data type so multiple
-                    # parts for accessing it are needed.
-                    signal_piece = Network_CAN.SignalAccess.PieceAccess()
-                    # Get next signal piece with a smaller data size than previously
-                    part_base_len = int(part_base_len / 2)
-                    # TODO: Is it ensured that reduced_type_len is never
-                    # less than 8?
-                    signal_piece.abs_byte = current_byte
-                    signal_piece.len = part_base_len
-
-                    if first_chunk is True and signal.start_bit > 0:
-                        # If signal doesn't start at bit zero then
-                        # right shifting is required.
-                        signal_piece.shift_inner = signal.start_bit
 
-                    if shifting_bits > 0:
-                        signal_piece.shift_outer = shifting_bits
+                if shifting_bits > 0:
+                    signal_piece.shift_outer = shifting_bits
 
-                    signal_access.pieces.append(signal_piece)
+                signal_access.pieces.append(signal_piece)
 
-                    current_byte += int(part_base_len/8)
-                    bytes_remaining -= int(part_base_len/8)
+                current_byte += int(part_base_len/8)
+                bytes_remaining -= int(part_base_len/8)
 
-                    bits_remaining -= part_base_len
-                    if first_chunk is True:
-                        # For first chunk, bits before start_bit don't
-                        # contribute to the remaining bits so need to be
-                        # added back.
-                        bits_remaining += signal.start_bit
+                bits_remaining -= part_base_len
+                if first_chunk is True:
+                    # For first chunk, bits before start_bit don't
+                    # contribute to the remaining bits so need to be
+                    # added back.
+                    bits_remaining += signal.start_bit
 
-                    shifting_bits += (part_base_len - signal.start_bit)
+                shifting_bits += (part_base_len - signal.start_bit)
 
-                    part_base_len = \
-                        cg.calculate_base_type_len(bytes_remaining * 8)
+                part_base_len = \
+                    cg.calculate_base_type_len(bytes_remaining * 8)
 
-                    first_chunk = False
-                else:
-                    signal_piece = Network_CAN.SignalAccess.PieceAccess()
-                    
-                    signal_piece.abs_byte = current_byte
-                    signal_piece.len = part_base_len
+                first_chunk = False
+            else:
+                signal_piece = Network_CAN.SignalAccess.PieceAccess()
+                
+                signal_piece.abs_byte = current_byte
+                signal_piece.len = part_base_len
 
-                    if first_chunk is True and signal.start_bit > 0:
-                        # If signal doesn't start at bit zero then
-                        # right shifting is required.
-                        signal_piece.shift_inner = signal.start_bit
+                if first_chunk is True and signal.start_bit > 0:
+                    # If signal doesn't start at bit zero then
+                    # right shifting is required.
+                    signal_piece.shift_inner = signal.start_bit
 
-                    if shifting_bits > 0:
-                        signal_piece.shift_outer = shifting_bits
+                if shifting_bits > 0:
+                    signal_piece.shift_outer = shifting_bits
 
-                    mask_bits = bits_remaining
-                    if mask_bits < part_base_len:
-                        # Some most-significant bits need to be masked-out
-                        mask_msb = 0
-                        for i in range(mask_bits):
-                            mask_msb = mask_msb | (1 << i)
-                        signal_piece.mask_outer =  mask_msb
-                    
-                    signal_access.pieces.append(signal_piece)            
-            else:
-                # Signal length exceeds maximum compiler data type
-                log_warn(("Length of scalar signal '" + signal_name \
-                          + "' exceeds maximum compiler data size. " +
-                         " Consider defining the signal as an array instead."))
+                mask_bits = bits_remaining
+                if mask_bits < part_base_len:
+                    # Some most-significant bits need to be masked-out
+                    signal_piece.mask_outer = (1 << mask_bits) - 1 if mask_bits > 0 else 0
                 
-            return_value = signal_access
+                signal_access.pieces.append(signal_piece)            
             
+        return signal_access
+    
+    #===============================================================================================
+    def get_signal_access(self, signal_name, access):
+        """ Returns the abstract access (SignalAccess object) of the given signal.
+        
+        Access plans are cached per access type (READ or WRITE), signal layout (length, start
+        byte and start bit) and compiler settings (Compiler_max_size and endianness), signals
+        with the same layout share the pieces of their plan. Plans are looked up with the current
+        layout of the signal, so a layout change doesn't return stale plans. Plans are
+        precomputed for all the mapped signals once the network is parsed (see
+        update_signal_access_plans).
+        
+        The returned object is cached and shall be taken as read-only. If the signal length
+        exceeds the maximum compiler data size an access without pieces is returned and a warning
+        is logged on each call.
+        
+        Parameters
+        ----------
+            signal_name : str
+                Name of the signal.
+            access : int
+                READ or WRITE.
+        """
+        return_value = None
+        
+        if signal_name in self.signals:
+            signal = self.signals[signal_name]
+            key = (access, signal.len, signal.start_byte, signal.start_bit, \
+                   cg.Compiler_max_size, cg.little_endian)
+            signal_access = self.signals_access.get((access, signal_name), None)
+            if signal.len > cg.Compiler_max_size:
+                # Signal length exceeds maximum compiler data type, access without pieces
+                if access == READ:
+                    log_warn(("Length of scalar signal '" + signal_name \
+                              + "' exceeds maximum compiler data size. " +
+                             " Consider defining the signal as an array instead."))
+                else:
+                    log_warn(("Length of scalar signal '" + signal_name \
+                              + "' exceeds maximum compiler data size '" \
+                              + str(cg.Compiler_max_size) \
+                              + "'. Consider defining the signal as an array instead."))
+                return_value = Network_CAN.SignalAccess(signal_name, signal.len)
+            elif signal_access is not None and signal_access[0] == key:
+                return_value = signal_access[1]
+            else:
+                if key not in self.signal_access_plans:
+                    if access == READ:
+                        signal_access = self.gen_signal_access_read(signal)
+                    else:
+                        signal_access = self.gen_signal_access_write(signal)
+                    self.signal_access_plans.update({key : signal_access})
+                return_value = copy.copy(self.signal_access_plans[key])
+                return_value.signal_name = signal_name
+                self.signals_access.update({(access, signal_name) : (key, return_value)})
         else:
             log_warn("Signal '%s' is not defined." % signal_name)
         
         return return_value
     
+    #===============================================================================================
+    def update_signal_access_plans(self):
+        """ Computes the read and write access plans of all the mapped scalar signals (see
+        get_signal_access). """
+        for signal in self.signals.values():
+            if signal.message is not None and signal.start_byte is not None \
+            and signal.is_array() is False and signal.len <= cg.Compiler_max_size:
+                self.get_signal_access(signal.name, READ)
+                self.get_signal_access(signal.name, WRITE)
+    
     #===============================================================================================                
     def get_signal_abstract_write(self, signal_name):
-        """ Gets an abstract access to the signal for code generation. """
-        return_value = None
+        """ Gets an abstract access to the signal for code generation (see get_signal_access).
+        """
+        return self.get_signal_access(signal_name, WRITE)
+    
+    #===============================================================================================
+    @staticmethod
+    def gen_signal_access_write(signal):
+        """ Generates the abstract write access (SignalAccess object) of the given signal. """
+        signal_access = Network_CAN.SignalAccess(signal.name, signal.len)
         
-        if signal_name in self.signals:
-            signal = self.signals[signal_name]
-            
-            signal_access = Network_CAN.SignalAccess(signal_name, signal.len)
-            
-            base_len = cg.calculate_base_type_len(signal.len)
+        base_len = cg.calculate_base_type_len(signal.len)
+        
+        if base_len <= cg.Compiler_max_size:
+            abs_start_bit = (signal.start_byte*8)  + signal.start_bit
+            abs_end_bit = abs_start_bit + signal.len - 1
+
+            abs_start_byte = signal.start_byte
+            abs_end_byte = int(math.floor(abs_end_bit / 8))
+
+            bytes_remaining = abs_end_byte - abs_start_byte + 1
+            bits_remaining = signal.len
+
+            current_byte = abs_start_byte
             
-            if base_len <= cg.Compiler_max_size:
-                abs_start_bit = (signal.start_byte*8)  + signal.start_bit
-                abs_end_bit = abs_start_bit + signal.len - 1
-    
-                abs_start_byte = signal.start_byte
-                abs_end_byte = int(math.floor(abs_end_bit / 8))
-    
-                bytes_remaining = abs_end_byte - abs_start_byte + 1
-                bits_remaining = signal.len
-    
-                current_byte = abs_start_byte
+            part_base_len = cg.calculate_base_type_len(bytes_remaining*8)
+            first_chunk = True
+
+            while (part_base_len / 8) > bytes_remaining:
+                # Signal doesn't fit in a single data type so multiple
+                # parts for accessing it are needed.
+                signal_piece = Network_CAN.SignalAccess.PieceAccess()
+                # Get next signal piece with a smaller data size than previously
+                part_base_len = int(part_base_len / 2)
+                # TODO: Is it ensured that reduced_type_len is never
+                # less than 8?
+                signal_piece.abs_byte = current_byte
+                signal_piece.len = part_base_len  
                 
-                part_base_len = cg.calculate_base_type_len(bytes_remaining*8)
-                first_chunk = True
-
-                while (part_base_len / 8) > bytes_remaining:
-                    # Signal doesn't fit in a single data type so multiple
-                    # parts for accessing it are needed.
-                    signal_piece = Network_CAN.SignalAccess.PieceAccess()
-                    # Get next signal piece with a smaller data size than previously
-                    part_base_len = int(part_base_len / 2)
-                    # TODO: Is it ensured that reduced_type_len is never
-                    # less than 8?
-                    signal_piece.abs_byte = current_byte
-                    signal_piece.len = part_base_len  
-                    
-                    if first_chunk is True:
-                        # Calculate clearing mask and shifting bits for first chunk...
-                        if signal.start_bit > 0:
-                            # Shifting is not required if start_bit is zero.
-                            signal_piece.shift_inner = signal.start_bit
-                            # Masking is not required if start_bit is zero since all bits
-                            # of the buffer need to be overwritten
-                            signal_piece.mask_inner = \
-                                cg.get_bit_mask(part_base_len - signal.start_bit, \
-                                                signal.start_bit, True, part_base_len)
-                        # Calculate data bits mask for first chunk
-                        signal_piece.mask_outer = \
+                if first_chunk is True:
+                    # Calculate clearing mask and shifting bits for first chunk...
+                    if signal.start_bit > 0:
+                        # Shifting is not required if start_bit is zero.
+                        signal_piece.shift_inner = signal.start_bit
+                        # Masking is not required if start_bit is zero since all bits
+                        # of the buffer need to be overwritten
+                        signal_piece.mask_inner = \
                             cg.get_bit_mask(part_base_len - signal.start_bit, \
-                                            signal.start_bit, False, part_base_len)
-                    else:
-                        # For subsequent chunks (except last one that will be treated in the
-                        # "else" statement of this while statement). Shifting will be right
-                        # shifting and mask should be of part_base_len.
-                        # shift_bits = signal.len - bits_remaining
-                        # Consume the bits from the input data (right shifting of consumed bits).
-                        signal_piece.shift_inner = signal.len - bits_remaining
-                        # Mask out bits not belonging to this piece
-                        signal_piece.mask_outer = \
-                            cg.get_bit_mask(part_base_len, 0, False, part_base_len)
-
-                    bits_remaining -= part_base_len
-                    if first_chunk is True:
-                        # For first chunk, bits before start_bit don't
-                        # contribute to the remaining bits so need to be
-                        # added back.
-                        bits_remaining += signal.start_bit
-                        
+                                            signal.start_bit, True, part_base_len)
+                    # Calculate data bits mask for first chunk
+                    signal_piece.mask_outer = \
+                        cg.get_bit_mask(part_base_len - signal.start_bit, \
+                                        signal.start_bit, False, part_base_len)
+                else:
+                    # For subsequent chunks (except last one that will be treated in the
+                    # "else" statement of this while statement). Shifting will be right
+                    # shifting and mask should be of part_base_len.
+                    # shift_bits = signal.len - bits_remaining
+                    # Consume the bits from the input data (right shifting of consumed bits).
+                    signal_piece.shift_inner = signal.len - bits_remaining
+                    # Mask out bits not belonging to this piece
+                    signal_piece.mask_outer = \
+                        cg.get_bit_mask(part_base_len, 0, False, part_base_len)
 
-                    signal_access.pieces.append(signal_piece)
+                bits_remaining -= part_base_len
+                if first_chunk is True:
+                    # For first chunk, bits before start_bit don't
+                    # contribute to the remaining bits so need to be
+                    # added back.
+                    bits_remaining += signal.start_bit
+                    
+
+                signal_access.pieces.append(signal_piece)
 
-                    current_byte += int(part_base_len/8)
-                    bytes_remaining -= int(part_base_len/8)
+                current_byte += int(part_base_len/8)
+                bytes_remaining -= int(part_base_len/8)
 
-                    part_base_len = \
-                        cg.calculate_base_type_len(bytes_remaining * 8)
+                part_base_len = \
+                    cg.calculate_base_type_len(bytes_remaining * 8)
 
+                first_chunk = False
+            else:
+                # Flow goes here in two cases. If first_chunk is True in here it means that
+                # only one piece is required for this signal, if first_chunk is False here
+                # it means it is the last piece of a multi-piece signal.
+                signal_piece = Network_CAN.SignalAccess.PieceAccess()
+                
+                signal_piece.abs_byte = current_byte
+                signal_piece.len = part_base_len
+                
+                if first_chunk is True:
                     first_chunk = False
-                else:
-                    # Flow goes here in two cases. If first_chunk is True in here it means that
-                    # only one piece is required for this signal, if first_chunk is False here
-                    # it means it is the last piece of a multi-piece signal.
-                    signal_piece = Network_CAN.SignalAccess.PieceAccess()
-                    
-                    signal_piece.abs_byte = current_byte
-                    signal_piece.len = part_base_len
-                    
-                    if first_chunk is True:
-                        first_chunk = False
-                        # Calculate shifting for first chunk (left shifting)
-                        if signal.start_bit > 0:
-                            signal_piece.shift_inner = signal.start_bit
-                        # Calculate clearing bits mask for first chunk
-                        if signal.len < part_base_len:
-                            # Masks make sense if the signal len is smaller than the part_base_len
-                            # otherwise mask of all zeros and all ones will be generated which is
-                            # not optimal.
-                            signal_piece.mask_inner = \
-                                cg.get_bit_mask(signal.len, signal.start_bit, \
-                                                True, part_base_len)
-                            # Calculate data bits mask for first chunk
-                            signal_piece.mask_outer = \
-                                cg.get_bit_mask(signal.len, signal.start_bit, \
-                                                False, part_base_len)
-                    else:
-                        # For last chunk (in a multi-chunk data) shifting will be right
-                        # shifting and mask should be of bits_remaining.
-                        # Consume the bits from the input data (right shifting of consumed bits).
-                        if signal.len - bits_remaining > 0:
-                            signal_piece.shift_inner = signal.len - bits_remaining
-                        # Calculate mask for clearing bits in target location
-                        if bits_remaining < part_base_len:
-                            signal_piece.mask_inner = \
-                                cg.get_bit_mask(bits_remaining, 0, True, part_base_len)
-                        # Mask out bits not belonging to this piece
+                    # Calculate shifting for first chunk (left shifting)
+                    if signal.start_bit > 0:
+                        signal_piece.shift_inner = signal.start_bit
+                    # Calculate clearing bits mask for first chunk
+                    if signal.len < part_base_len:
+                        # Masks make sense if the signal len is smaller than the part_base_len
+                        # otherwise mask of all zeros and all ones will be generated which is
+                        # not optimal.
+                        signal_piece.mask_inner = \
+                            cg.get_bit_mask(signal.len, signal.start_bit, \
+                                            True, part_base_len)
+                        # Calculate data bits mask for first chunk
                         signal_piece.mask_outer = \
-                            cg.get_bit_mask(bits_remaining, 0, False, part_base_len)         
-                    
-                    signal_access.pieces.append(signal_piece)            
-            else:
-                # Signal length exceeds maximum compiler data type
-                log_warn(("Length of scalar signal '" + signal_name \
-                          + "' exceeds maximum compiler data size '" + cg.Compiler_max_size \
-                         + "'. Consider defining the signal as an array instead."))
-            
-            return_value = signal_access
+                            cg.get_bit_mask(signal.len, signal.start_bit, \
+                                            False, part_base_len)
+                else:
+                    # For last chunk (in a multi-chunk data) shifting will be right
+                    # shifting and mask should be of bits_remaining.
+                    # Consume the bits from the input data (right shifting of consumed bits).
+                    if signal.len - bits_remaining > 0:
+                        signal_piece.shift_inner = signal.len - bits_remaining
+                    # Calculate mask for clearing bits in target location
+                    if bits_remaining < part_base_len:
+                        signal_piece.mask_inner = \
+                            cg.get_bit_mask(bits_remaining, 0, True, part_base_len)
+                    # Mask out bits not belonging to this piece
+                    signal_piece.mask_outer = \
+                        cg.get_bit_mask(bits_remaining, 0, False, part_base_len)         
+                
+                signal_access.pieces.append(signal_piece)            
             
-        else:
-            log_warn("Signal '%s' is not defined." % signal_name)
-        
-        return return_value
+        return signal_access
             
     #=============================================================================================== 
     #TODO: check usage and implementation of function "fragment_signal"
@@ -1660,6 +1656,8 @@ class Network_CAN:
     def gen_XML(self, output_file = None, gen_types = True, gen_nodes = True, \
                  gen_messages = True, gen_signals = True):
         """ Generates an XML describing the Network modeled by this object. """
+        from lxml import etree as ET
+        import xml.dom.minidom
         
         #GEnerate Network root node and its information
         XML_root = ET.Element("Network")
@@ -1685,6 +1683,19 @@ class Network_CAN:
         XML_level_1.text = str(self.date)
         XML_root.append(XML_level_1)
         
+        #Generate user parameters (if any)
+        if len(self.simple_params) > 0:
+            XML_level_1 = ET.Element("Params")
+            for param in self.simple_params.values():
+                XML_level_2 = ET.SubElement(XML_level_1, "Param")
+                XML_level_2.set("id", param.param_id)
+                XML_level_2.set("type", str(param.param_type))
+                if param.param_type == "str" or param.param_type == "path":
+                    XML_level_2.text = str(param.param_value)
+                else:
+                    XML_level_2.text = json.dumps(param.param_value)
+            XML_root.append(XML_level_1)
+        
         if gen_types is True:
             #Generate nodes
             XML_level_1 = ET.Element("Nodes")
@@ -1712,14 +1723,12 @@ class Network_CAN:
                     XML_level_3.append(XML_level_4)
                     
                 #Generate Tx Messages
-                for message in self.messages.values():
-                    #Check if this node is publisher of this message
-                    if message.publisher == node.name:
-                        XML_level_4 = ET.Element("NodeMessage")
-                        XML_level_4.set("dir","Tx")
-                        XML_level_4.set("timeout_ms","") 
-                        XML_level_4.text = message.name
-                        XML_level_3.append(XML_level_4)
+                for message_name in self.nodes_tx_messages.get(node.name, []):
+                    XML_level_4 = ET.Element("NodeMessage")
+                    XML_level_4.set("dir","Tx")
+                    XML_level_4.set("timeout_ms","") 
+                    XML_level_4.text = message_name
+                    XML_level_3.append(XML_level_4)
                 
                 XML_level_2.append(XML_level_3)
                 
@@ -1889,8 +1898,7 @@ class Network_CAN:
         if output_file is None:
             print(XML_string)
         else:
-            myfile = open(output_file, "w")
-            myfile.write(XML_string)
+            ctpl.write_output(output_file, XML_string, None)
         print("INFO: XML generation done")
         #TODO: save XML to file if output_file is different than None
 
@@ -2066,9 +2074,23 @@ class Network_CAN:
         return cog_output_file
         
     #===============================================================================================    
-    def cog_generator(self, source_obj, project_pickle_file, \
-                             comp_pickle_file = None, variables = None):
+    def cog_generator(self, source_obj, model_variables, variables = None, render_jobs = None):
         """ Invoke cog generator for the specified file.
+        
+        Parameters
+        ----------
+            source_obj : CogSrc
+                Cog source to be generated.
+            model_variables : dict
+                Template variables handing over the project and network models, either the live
+                objects (cog_proj_obj, cog_network_obj) or the paths of their pickle files
+                (cog_proj_pickle_file, cog_pickle_file).
+            variables : dict
+                Additional template variables.
+            render_jobs : list
+                If provided, generation is not invoked but a render job (template file, output
+                file, variables) is appended to this list. Model variables are not included in
+                the job since they are common to all jobs. See cogtemplates.render_templates.
         """
         # Setup input and output files
         # ----------------------------
@@ -2090,28 +2112,29 @@ class Network_CAN:
                 
         # Invoke code generation
         # ----------------------           
-        cog_arguments = ['dummy_argument', \
-                   '-d', \
-                   '-D', 'input_worksheet=' + self.metadata_gen_source_file, \
-                   '-D', 'project_working_dir=' + str(work_dir), \
-                   '-D', 'cog_proj_pickle_file=' + str(project_pickle_file), \
-                   '-D', 'cog_pickle_file=' + str(comp_pickle_file), \
-                   '-D', 'cog_output_file=' + str(cog_output_file)]
+        cog_variables = {"input_worksheet" : self.metadata_gen_source_file, \
+                         "project_working_dir" : str(work_dir), \
+                         "cog_output_file" : str(cog_output_file)}
         
         # Append additional variables if required
         if variables is not None:
             for variable, variable_val in variables.items():
-                variable_str = str(variable) + "=" +str(variable_val)
-                cog_arguments.append('-D')
-                cog_arguments.append(variable_str)
-
-        cog_arguments.append('-o')
-        cog_arguments.append(str(comgen_CAN_cog_output_file))
-        cog_arguments.append(str(comgen_CAN_cog_input_file))
+                cog_variables.update({str(variable) : str(variable_val)})
         
-                
-        # Call cogapp engine
-        cog_return = cog.Cog().main(cog_arguments)
+        if render_jobs is not None:
+            # Defer generation
+            render_jobs.append((comgen_CAN_cog_input_file, comgen_CAN_cog_output_file, \
+                                cog_variables))
+        else:
+            # Render compiled template
+            cog_variables.update(model_variables)
+            cog_return = ctpl.render_template(comgen_CAN_cog_input_file, \
+                                              comgen_CAN_cog_output_file, cog_variables)
+            self.log_cog_result(comgen_CAN_cog_output_file, cog_return)
+    
+    #===============================================================================================
+    def log_cog_result(self, comgen_CAN_cog_output_file, cog_return):
+        """ Logs the result of the generation of the given output file. """
         if cog_return == 0:
             log_info("Code generation successful: '%s'" % comgen_CAN_cog_output_file)
             print("INFO: code generation successful: ",comgen_CAN_cog_output_file)
@@ -2150,10 +2173,6 @@ class Network_CAN:
         elif len(node_lst) > 1:
             multiple_nodes = True
   
-        # Get project pickle full file name  
-        project_pickle = self.project_obj.get_work_file_path("common.project", \
-                                                                         "project_pickle")
-         
         # Create subnetwork will all involved nodes    
         subnetwork = self.get_subnetwork(node_lst)
         
@@ -2161,24 +2180,68 @@ class Network_CAN:
             # Update cog output files names (replace network id wildcard)
             wildcards = {"NWID" : NWID_wildcard}
             self.update_cog_out_sources_names(cog_sources, wildcards)
-            # Create temporal file with subnetwork object pickle.
-            cog_pickle_file_name = "comgen_CAN_network_obj.pickle"
-            work_dir = self.project_obj.get_simple_param_val("common.project", \
-                                                             "project_path_working")
-            cog_serialized_network_file = work_dir / cog_pickle_file_name 
-            try:
-                with open(cog_serialized_network_file, 'wb') as f:
-                    pickle.dump(subnetwork, f, pickle.HIGHEST_PROTOCOL)
-            except Exception as e:
-                    print('Failed to create pickle file %s. Reason: %s' \
-                          % (cog_serialized_network_file, e))
+            # Build the node views before handing over the subnetwork so that they are computed
+            # only once (also when the subnetwork is pickled for the templates).
+            for node in subnetwork.nodes.values():
+                if len(self.get_messages_of_node(node.name)) > 0:
+                    subnetwork.get_node_view(node.name)
+            # Hand over project and subnetwork objects to the templates
+            model_variables = self.project_obj.get_cog_project_variables()
+            cog_serialized_network_file = None
+            if self.project_obj.pickle_models() is True:
+                # Create temporal file with subnetwork object pickle. Named per network since
+                # networks may be generated concurrently.
+                cog_pickle_file_name = "comgen_CAN_%s_network_obj.pickle" % self.id_string
+                work_dir = self.project_obj.get_simple_param_val("common.project", \
+                                                                 "project_path_working")
+                cog_serialized_network_file = work_dir / cog_pickle_file_name 
+                try:
+                    with open(cog_serialized_network_file, 'wb') as f:
+                        pickle.dump(subnetwork, f, pickle.HIGHEST_PROTOCOL)
+                except Exception as e:
+                        print('Failed to create pickle file %s. Reason: %s' \
+                              % (cog_serialized_network_file, e))
+                model_variables.update({"cog_pickle_file" : str(cog_serialized_network_file)})
+            else:
+                model_variables.update({"cog_network_obj" : subnetwork})
+            
+            # If more than one job is requested, files are rendered at the end across a pool of
+            # worker processes.
+            jobs = self.project_obj.get_simple_param_val("common.project", "project_jobs", 1)
+            if jobs is not None and jobs > 1:
+                render_jobs = []
+            else:
+                render_jobs = None
             
             # Generate common source file(s)
             # ------------------------------
+            # Common files are shared by all networks of the project. Since networks may be
+            # generated concurrently (see Project.process_components_concurrently), only the last
+            # network generates them (its files prevail when networks are generated in sequence).
+            gen_common = True
+            for component in reversed(self.project_obj.components):
+                if component.type == self.module and component.failed is not True:
+                    gen_common = component.component_object is self
+                    break
+            if gen_common is True:
+                # Timer wheel code is generated only if a node of the networks uses it. Networks
+                # not loaded in this process (e.g., generated by other worker processes) are
+                # assumed to use it.
+                rx_timer_wheel = False
+                for component in self.project_obj.components:
+                    if component.type == self.module and component.failed is not True:
+                        if component.component_object is self:
+                            rx_timer_wheel = subnetwork.uses_rx_timer_wheel()
+                        elif isinstance(component.component_object, Network_CAN):
+                            rx_timer_wheel = component.component_object.uses_rx_timer_wheel()
+                        else:
+                            rx_timer_wheel = True
+                        if rx_timer_wheel is True:
+                            break
             for cog_source in cog_sources.sources.values():
                 if "category" in cog_source.dparams \
                 and cog_source.dparams["category"] == "common" \
-                and cog_source.generated == False:
+                and cog_source.generated == False and gen_common is True:
                     # Generate includes variable if needed
                     log_debug("Generating common network file '%s'..." % cog_source.cog_out_file)
                     variables = {}
@@ -2186,9 +2249,9 @@ class Network_CAN:
                     if len(includes_lst) > 0:
                         include_var = json.dumps(includes_lst)
                         variables.update({"include_var" : include_var})
+                    variables.update({"rx_timer_wheel_var" : json.dumps(rx_timer_wheel)})
                          
-                    self.cog_generator(cog_source, project_pickle, cog_serialized_network_file, \
-                                       variables)
+                    self.cog_generator(cog_source, model_variables, variables, render_jobs)
             
             # Generate network source file(s)
             # -------------------------------
@@ -2228,8 +2291,7 @@ class Network_CAN:
                     NODEID_names_var = json.dumps(NODEID_names)
                     variables.update({"NODEID_names_var" : NODEID_names_var})
                             
-                    self.cog_generator(cog_source, project_pickle, cog_serialized_network_file, \
-                                       variables)
+                    self.cog_generator(cog_source, model_variables, variables, render_jobs)
             
             # Generate Node specific source file(s)
             # -------------------------------------
@@ -2260,14 +2322,22 @@ class Network_CAN:
                             # Add variable containing current's node name
                             variables.update({"node_name" : str(node.name)})
                                  
-                            self.cog_generator(cog_source, project_pickle, \
-                                               cog_serialized_network_file, variables)
+                            self.cog_generator(cog_source, model_variables, variables, render_jobs)
                 else:
                     log_warn("No messages found for node '%s'. No C-code generated for the node." \
                              % node.name)
             
+            # Render deferred files (if any)
+            if render_jobs is not None and len(render_jobs) > 0:
+                log_info("Rendering %s file(s) with up to %s worker processes." \
+                         % (len(render_jobs), jobs))
+                ctpl.render_templates(render_jobs, jobs, model_variables, \
+                    lambda job_idx, cog_return: \
+                        self.log_cog_result(render_jobs[job_idx][1], cog_return))
+            
             # Delete pickle file
-            cg.delete_file(cog_serialized_network_file)
+            if cog_serialized_network_file is not None:
+                cg.delete_file(cog_serialized_network_file)
         else:
             log_warn(("No nodes/messages found for the selected subnetwork '%s', node list: '%s'."
                      + " No C-code generated.") % (self.id_string, str(node_lst)))
@@ -2284,13 +2354,36 @@ class Network_CAN:
     
     #===============================================================================================
     def get_subnetwork(self, nodes_list):
-        """ Returns a network only with data of the passed nodes. """
+        """ Returns a network only with data of the passed nodes.
         
+        The returned network is a read-only view of this network: nodes, messages, signals and
+        enum types objects as well as the project are shared with this network (no copies are
+        made), only the dictionaries holding them (and their indexes) are new. Parameters (gP and
+        simple_params) are copied and the per-network caches (sorted signals and signal access)
+        start empty, so the view and this network don't affect each other through them.
+        
+        Subnetworks of a subnetwork view are cached per list of nodes (e.g., templates get the
+        subnetwork of their node from the subnetwork being generated), since a view is not
+        modified the cached subnetworks are always up to date.
+        """
         if type(nodes_list) is list and len(nodes_list) > 0:
-            subnetwork = copy.deepcopy(self)
+            nodes_key = tuple(nodes_list)
+            if self.is_subnetwork is True and nodes_key in self.subnetworks:
+                return self.subnetworks[nodes_key]
+            
+            subnetwork = copy.copy(self)
+            subnetwork.is_subnetwork = True
+            subnetwork.subnetworks = {}
+            subnetwork.node_views = {}
+            # Own parameters and caches (not shared with this network)
+            subnetwork.gP = copy.deepcopy(self.gP)
+            subnetwork.simple_params = copy.deepcopy(self.simple_params)
+            subnetwork.signal_access_plans = {}
+            subnetwork.signals_access = {}
+            subnetwork.sorted_signals = None
     
-            # Clean nodes
-            subnetwork.nodes.clear()
+            # Keep nodes
+            subnetwork.nodes = {}
             for node_str in nodes_list:
                 # Only keep valid nodes
                 if node_str in self.nodes:
@@ -2298,49 +2391,128 @@ class Network_CAN:
                 else:
                     log_warn("Node '%s' not found in Network '%s'." % (node_str, self.id_string))
                     
-            # Clean messages
-            subnetwork.messages.clear()
-            for message in self.messages.values():
-                # Only keep messages related to the specified nodes
-                keep_message = False
-                # See if message is subscribed or published by any of the specified nodes
-                for subnet_node in subnetwork.nodes.values():
-                    if message.name in subnet_node.subscribed_messages:
-                        keep_message = True
-                        break
-                    elif message.publisher == subnet_node.name:
-                        keep_message = True
-                        break
-                
-                if keep_message is True:
-                    subnetwork.messages.update({message.name : message})
+            # Keep messages related to the specified nodes (subscribed or published by them)
+            node_messages = set()
+            for subnet_node in subnetwork.nodes.values():
+                node_messages.update(subnet_node.subscribed_messages)
+                node_messages.update(self.nodes_tx_messages.get(subnet_node.name, []))
+            subnetwork.messages = {message_name : message for message_name, message \
+                                   in self.messages.items() if message_name in node_messages}
     
-            # Clean signals
-            subnetwork.signals.clear()
-            for signal in self.signals.values():
-                if signal.message in subnetwork.messages:
-                    subnetwork.signals.update({signal.name : signal})
+            # Keep signals of the kept messages
+            subnetwork.signals = {signal_name : signal for signal_name, signal \
+                                  in self.signals.items() if signal.message in subnetwork.messages}
             
-            # Clean types
-            subnetwork.enum_types.clear()
-            for enum_type in self.enum_types.values():
-                keep_type = False
-                for signal in subnetwork.signals.values():
-                    if enum_type.name == signal.data_type:
-                        keep_type = True
-                        break;
-                if keep_type is True:
-                    subnetwork.enum_types.update({enum_type.name : enum_type})
+            # Keep types used by the kept signals
+            signal_types = set(signal.data_type for signal in subnetwork.signals.values())
+            subnetwork.enum_types = {type_name : enum_type for type_name, enum_type \
+                                     in self.enum_types.items() \
+                                     if enum_type.name in signal_types}
+            
+            subnetwork.update_indexes()
+            
+            if self.is_subnetwork is True:
+                self.subnetworks.update({nodes_key : subnetwork})
         else:
             log_warn("Provided nodes shall be a list greater than zero. Returned 'None'.")
             subnetwork = None
             
         return subnetwork
+    
+    #===============================================================================================
+    def get_node_view(self, node_name):
+        """ Returns the NodeView object (derived tables for code generation) of the given node.
         
+        Node views of a subnetwork view are cached per node (the node templates get the view of
+        their node from the subnetwork being generated, see gen_code), views of a network which
+        is not a subnetwork view are built on each call since the network may change.
+        
+        Returns None if the node doesn't exist in this network.
+        """
+        if node_name in self.node_views:
+            return self.node_views[node_name]
+        
+        if node_name in self.nodes:
+            node_view = self.NodeView(self.get_subnetwork([node_name]), node_name)
+            if self.is_subnetwork is True:
+                self.node_views.update({node_name : node_view})
+        else:
+            log_warn("Node '%s' not found in Network '%s'." % (node_name, self.id_string))
+            node_view = None
+        
+        return node_view
+        
+    #===============================================================================================
+    def uses_rx_timer_wheel(self):
+        """ Returns True if the RX timeouts of some node of this network are supervised by a
+        timer wheel (see NodeView.set_rx_timeouts). """
+        return_value = False
+        if self.get_simple_param("CAN_rx_timeout_supervision") == RX_TIMEOUT_TIMER_WHEEL:
+            for node_name in self.nodes:
+                if self.get_node_view(node_name).rx_timeout_supervision \
+                == RX_TIMEOUT_TIMER_WHEEL:
+                    return_value = True
+                    break
+        
+        return return_value
+    
+    #===============================================================================================
+    def set_user_param(self, param_id, param_value):
+        """ Sets the user value of a parameter of this network (e.g., from the Config sheet of
+        the network spreadsheet). Empty values are ignored. """
+        if param_id != "" \
+        and self.project_obj.simple_param_exists(self.module, param_id) is True:
+            read_only = self.project_obj.simple_param_is_read_only(self.module, param_id)
+            if read_only is False and param_value != "":
+                # Add parameter user's value to this object
+                param_type = self.project_obj.get_simple_param_type(self.module, param_id)
+                # Force read value from ODS to be a string and substitute quotes characters
+                # out of utf-8 if present.
+                param_value = str(param_value)
+                param_value = param_value.encode(encoding='utf-8')
+                param_value = param_value.replace(b'\xe2\x80\x9c', b'\"')
+                param_value = param_value.replace(b'\xe2\x80\x9d', b'\"')
+                param_value = param_value.decode('utf-8')
+                log_debug("Processing parameter '%s' with value '%s'..." \
+                          % (param_id, param_value))
+                param_value = grl.process_simple_param(param_type, param_value)
+                
+                # Check if validation is required
+                validator = \
+                    self.project_obj.get_simple_param_validator(self.module, param_id)
+                if validator is not None:
+                    # Validate parameter
+                    valid = self.project_obj.validate_simple_param(self.module, param_id, \
+                                                                   validator[0], \
+                                                                   validator[1])
+                else:
+                    # If no validator is defined assume data is valid.
+                    valid = True
+                
+                if valid is True:
+                    param_obj = grl.SimpleParam(param_id, param_type, param_value)
+                    self.simple_params.update({param_id: param_obj})
+                    log_debug("Added CAN user parameter '%s', type '%s' with value '%s'" \
+                              % (param_id, param_type, param_value))
+                else:
+                    log_warn(("Parameter '%s:%s' is invalid as per its " \
+                             + "validator '%s:%s''. Parameter ignored.") \
+                             % (self.module, param_id, validator[0], validator[1]))
+            elif param_value != "":
+                log_warn("Parameter '%s' is read-only. Ignored user value." % param_id)
+            else:
+                pass
+        elif param_id != "":
+            log_warn("Parameter '%s' is meaningless for component '%s'. Parameter ignored." \
+                     % (param_id, self.module))
+        else:
+            pass
+
     #===============================================================================================    
     def parse_spreadsheet_ods(self,input_file):
         """ parses an spreadsheet (ods format) to generate this network. """
-        book = pe.get_book(file_name=str(input_file))
+        book = ods.get_book(input_file, ["Config", "Network_and_Nodes", "Data_Types", \
+                                         "Messages", "Signals"])
         self.metadata_gen_source_file = str(input_file)
         
         self.input_file = cg.string_to_path(input_file)
@@ -2354,59 +2526,12 @@ class Network_CAN:
         CONFIG_TITLE_ROW = 1 # Row number with titles
         working_sheet = book["Config"]
         working_sheet.name_columns_by_row(CONFIG_TITLE_ROW)
+        columns = working_sheet.column_indexes
         
         for idx, row in enumerate(working_sheet):
             # Ignore rows that are before the "config's" title row
             if idx >= CONFIG_TITLE_ROW:
-                param_id = row[working_sheet.colnames.index("Parameter")]
-                param_value = row[working_sheet.colnames.index("User Value")]
-                if param_id != "" \
-                and self.project_obj.simple_param_exists(self.module, param_id) is True:
-                    read_only = self.project_obj.simple_param_is_read_only(self.module, param_id)
-                    if read_only is False and param_value != "":
-                        # Add parameter user's value to this object
-                        param_type = self.project_obj.get_simple_param_type(self.module, param_id)
-                        # Force read value from ODS to be a string and substitute quotes characters
-                        # out of utf-8 if present.
-                        param_value = str(param_value)
-                        param_value = param_value.encode(encoding='utf-8')
-                        param_value = param_value.replace(b'\xe2\x80\x9c', b'\"')
-                        param_value = param_value.replace(b'\xe2\x80\x9d', b'\"')
-                        param_value = param_value.decode('utf-8')
-                        log_debug("Processing parameter '%s' with value '%s'..." \
-                                  % (param_id, param_value))
-                        param_value = grl.process_simple_param(param_type, param_value)
-                        
-                        # Check if validation is required
-                        validator = \
-                            self.project_obj.get_simple_param_validator(self.module, param_id)
-                        if validator is not None:
-                            # Validate parameter
-                            valid = self.project_obj.validate_simple_param(self.module, param_id, \
-                                                                           validator[0], \
-                                                                           validator[1])
-                        else:
-                            # If no validator is defined assume data is valid.
-                            valid = True
-                        
-                        if valid is True:
-                            param_obj = grl.SimpleParam(param_id, param_type, param_value)
-                            self.simple_params.update({param_id: param_obj})
-                            log_debug("Added CAN user parameter '%s', type '%s' with value '%s'" \
-                                      % (param_id, param_type, param_value))
-                        else:
-                            log_warn(("Parameter '%s:%s' is invalid as per its " \
-                                     + "validator '%s:%s''. Parameter ignored.") \
-                                     % (self.module, param_id, validator[0], validator[1]))
-                    elif param_value != "":
-                        log_warn("Parameter '%s' is read-only. Ignored user value." % param_id)
-                    else:
-                        pass
-                elif param_id != "":
-                    log_warn("Parameter '%s' is meaningless for component '%s'. Parameter ignored." \
-                             % (param_id, self.module))
-                else:
-                    pass
+                self.set_user_param(row[columns["Parameter"]], row[columns["User Value"]])
                 
         # -----------------------
         # Parse Network Data
@@ -2426,14 +2551,15 @@ class Network_CAN:
         log_debug("Parsing nodes data.")
         NODES_TITLE_ROW = 6 # Row where the node's titles are located
         working_sheet.name_columns_by_row(NODES_TITLE_ROW)
+        columns = working_sheet.column_indexes
         
         for idx, row in enumerate(working_sheet):
             # Ignore rows that are before the "node's" title row
             if idx >= NODES_TITLE_ROW:
-                name = row[working_sheet.colnames.index("Node Name")]
+                name = row[columns["Node Name"]]
                 # Skip rows with no node defined
                 if str(name) != "": 
-                    description = row[working_sheet.colnames.index("Description")]
+                    description = row[columns["Description"]]
                     self.add_node(name, description)  
         
         # -----------------------
@@ -2442,12 +2568,13 @@ class Network_CAN:
         log_debug("Parsing enums type data.")
         working_sheet = book["Data_Types"]
         working_sheet.name_columns_by_row(0)
+        columns = working_sheet.column_indexes
         
         for row in working_sheet:
-            name = row[working_sheet.colnames.index("Type Name")]
+            name = row[columns["Type Name"]]
             #Skip rows with no type defined
             if cg.is_valid_identifier(str(name)):
-                enum_string = row[working_sheet.colnames.index("Enum Values")]
+                enum_string = row[columns["Enum Values"]]
                 self.add_enum_type(name, enum_string)
         
         # -----------------------
@@ -2456,21 +2583,21 @@ class Network_CAN:
         log_debug("Parsing messages data.")
         working_sheet = book["Messages"]
         working_sheet.name_columns_by_row(0)
+        columns = working_sheet.column_indexes
         
         for row in working_sheet:
-            message_name = row[working_sheet.colnames.index("Message Name")]
+            message_name = row[columns["Message Name"]]
             #Skip rows with no message defined
             if cg.is_valid_identifier(str(message_name)):  
-                message_id = row[working_sheet.colnames.index("Message ID")]
-                message_extended = row[working_sheet.colnames.index("Extended Frame?")]
-                message_lenght = row[working_sheet.colnames.index("Data Length (bytes)")]
-                message_desc = row[working_sheet.colnames.index("Description")]
-                message_publisher = row[working_sheet.colnames.index("Publisher")]
-                message_subscribers = row[working_sheet.colnames.index("Subscribers")]
-                message_tx_type = row[working_sheet.colnames.index("Tx Type")]
-                message_period = row[working_sheet.colnames.index("Period (ms)")]
-                message_repetitions = \
-                    row[working_sheet.colnames.index("Repetitions (only for BAF)")]
+                message_id = row[columns["Message ID"]]
+                message_extended = row[columns["Extended Frame?"]]
+                message_lenght = row[columns["Data Length (bytes)"]]
+                message_desc = row[columns["Description"]]
+                message_publisher = row[columns["Publisher"]]
+                message_subscribers = row[columns["Subscribers"]]
+                message_tx_type = row[columns["Tx Type"]]
+                message_period = row[columns["Period (ms)"]]
+                message_repetitions = row[columns["Repetitions (only for BAF)"]]
                 
                 self.add_message(message_name, message_id, message_lenght, \
                                     message_extended, message_tx_type, message_period, \
@@ -2494,22 +2621,23 @@ class Network_CAN:
         log_debug("Parsing signals data.")
         working_sheet = book["Signals"]
         working_sheet.name_columns_by_row(0)
+        columns = working_sheet.column_indexes
         
         for row in working_sheet:
-            signal_name = row[working_sheet.colnames.index("Signal Name")]   
+            signal_name = row[columns["Signal Name"]]   
             #Skip rows with no signal defined
             if  cg.is_valid_identifier(str(signal_name)):
-                signal_len = row[working_sheet.colnames.index("Lenght (bits)")]
-                signal_type = row[working_sheet.colnames.index("Data Type")]
-                signal_desc = row[working_sheet.colnames.index("Description")]
-                signal_conv_msg = row[working_sheet.colnames.index("Conveyor Message")]
-                signal_start_byte = row[working_sheet.colnames.index("Start Byte")]
-                signal_start_bit = row[working_sheet.colnames.index("Start Bit")]
-                signal_init_val = row[working_sheet.colnames.index("Initial Value")]
-                signal_fail_val = row[working_sheet.colnames.index("Fail Safe Value")]
-                signal_offset = row[working_sheet.colnames.index("Offset")]
-                signal_resolution = row[working_sheet.colnames.index("Resolution")]
-                signal_unit = row[working_sheet.colnames.index("Unit")]
+                signal_len = row[columns["Lenght (bits)"]]
+                signal_type = row[columns["Data Type"]]
+                signal_desc = row[columns["Description"]]
+                signal_conv_msg = row[columns["Conveyor Message"]]
+                signal_start_byte = row[columns["Start Byte"]]
+                signal_start_bit = row[columns["Start Bit"]]
+                signal_init_val = row[columns["Initial Value"]]
+                signal_fail_val = row[columns["Fail Safe Value"]]
+                signal_offset = row[columns["Offset"]]
+                signal_resolution = row[columns["Resolution"]]
+                signal_unit = row[columns["Unit"]]
                 #Add signal object to the network
                 self.add_signal(signal_name, signal_len, signal_desc)
                 #Add data type to the signal
@@ -2546,7 +2674,390 @@ class Network_CAN:
                 if str(signal_unit) != "":
                     self.signals[signal_name].fail_value = signal_unit
 
-    #===============================================================================================        
+    #===============================================================================================
+    @staticmethod
+    def get_xml_value(text):
+        """ Returns the value of an XML element text the way it is read from a spreadsheet cell:
+        "" if empty, int or float if it is a decimal number, the text itself otherwise. """
+        return_value = ""
+        if text is not None:
+            return_value = text.strip()
+            if re.fullmatch(r"-?\d+", return_value) is not None:
+                return_value = int(return_value)
+            elif re.fullmatch(r"-?\d+\.\d*", return_value) is not None:
+                return_value = float(return_value)
+        
+        return return_value
+    
+    #===============================================================================================
+    def parse_xml(self, input_file):
+        """ Parses an XML network description (as generated by gen_XML) to generate this
+        network.
+        
+        The file is read in a single incremental pass (lxml iterparse), each node, message,
+        signal and type element is converted into plain data and discarded once read. Data is
+        then added in the same order and with the same validations than parse_spreadsheet_ods.
+        """
+        from lxml import etree as ET
+        
+        self.metadata_gen_source_file = str(input_file)
+        
+        self.input_file = cg.string_to_path(input_file)
+        
+        log_debug("Loading CAN information from XML file: '%s'..." % input_file)
+        
+        get_value = self.get_xml_value
+        network_data = {}
+        params = [] # [(param id, param value), ...]
+        nodes = [] # [(name, description, [(direction, message name, timeout), ...]), ...]
+        enum_types = [] # [(name, enum string, description), ...]
+        messages = [] # [(name, id, extended, length, description, tx type, period, repeats)]
+        signals = [] # [(name, length, description, type, conveyor message, start byte,
+                     #   start bit, init value, fail value, offset, resolution, unit), ...]
+        
+        for _, element in ET.iterparse(str(input_file), events = ("end",), \
+                                       tag = ("Name", "Id", "Desc", "Version", "Date", "Param", \
+                                              "Node", "Message", "Signal", "Type")):
+            parent = element.getparent()
+            if parent is None:
+                continue
+            if parent.getparent() is None:
+                # Network data (children of the root element)
+                network_data.update({element.tag : get_value(element.text)})
+                continue
+            elif element.tag == "Param" and parent.tag == "Params":
+                params.append((element.get("id", ""), element.text or ""))
+            elif element.tag == "Node" and parent.tag == "Nodes":
+                node_messages = []
+                for node_message in element.iterfind("NodeMessages/NodeMessage"):
+                    timeout_ms = node_message.get("timeout_ms", "")
+                    if timeout_ms == "":
+                        timeout_ms = None
+                    node_messages.append((node_message.get("dir", ""), \
+                                          (node_message.text or "").strip(), timeout_ms))
+                nodes.append((get_value(element.findtext("Name")), \
+                              get_value(element.findtext("Desc")), node_messages))
+            elif element.tag == "Message" and parent.tag == "Messages":
+                message_id = element.find("Id")
+                transmission = element.find("Transmission")
+                if message_id is None or transmission is None:
+                    log_warn("Incomplete message '%s' ignored." % element.findtext("Name"))
+                else:
+                    messages.append((get_value(element.findtext("Name")), \
+                                     get_value(message_id.text), \
+                                     message_id.get("extended", "no"), \
+                                     get_value(element.findtext("Len")), \
+                                     get_value(element.findtext("Desc")), \
+                                     transmission.get("type", None), \
+                                     get_value(transmission.findtext("Period_ms")), \
+                                     get_value(transmission.findtext("BafRepeats"))))
+            elif element.tag == "Signal" and parent.tag == "Signals":
+                signals.append((get_value(element.findtext("Name")), \
+                                get_value(element.findtext("Len")), \
+                                get_value(element.findtext("Desc")), \
+                                get_value(element.findtext("Data/Type")), \
+                                get_value(element.findtext("Layout/ConveyorMsg")), \
+                                get_value(element.findtext("Layout/StartByte")), \
+                                get_value(element.findtext("Layout/StartBit")), \
+                                get_value(element.findtext("Data/InitValue")), \
+                                get_value(element.findtext("Data/FailSafeValue")), \
+                                get_value(element.findtext("Data/Offset")), \
+                                get_value(element.findtext("Data/Resolution")), \
+                                get_value(element.findtext("Data/Unit"))))
+            elif element.tag == "Type" and parent.tag == "Typedefs":
+                # Only enumerated types are user defined
+                if element.get("enumerated", "no") == "yes":
+                    enum_entries = []
+                    for enum_value in element.iterfind("Value"):
+                        enum_entry = (enum_value.text or "").strip()
+                        if enum_value.get("number", "") != "":
+                            enum_entry += " (%s)" % enum_value.get("number")
+                        enum_entries.append(enum_entry)
+                    enum_types.append((get_value(element.findtext("Name")), \
+                                       ", ".join(enum_entries), \
+                                       get_value(element.findtext("Desc"))))
+            else:
+                # Nested elements are processed together with their parent element
+                continue
+            # Free the memory of the processed element
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+        
+        # -----------------------
+        # Network Data and Parameters
+        # -----------------------
+        for param_id, param_value in params:
+            self.set_user_param(param_id, param_value)
+        
+        self.name = network_data.get("Name", "")
+        self.id_string = network_data.get("Id", "")
+        self.description = network_data.get("Desc", "")
+        self.version = network_data.get("Version", "")
+        self.date = network_data.get("Date", "")
+        
+        # -----------------------
+        # Nodes and Enum Types
+        # -----------------------
+        for name, description, _ in nodes:
+            self.add_node(name, description)
+        
+        for name, enum_string, description in enum_types:
+            self.add_enum_type(name, enum_string)
+            if name in self.enum_types:
+                self.enum_types[name].description = description
+        
+        # -----------------------
+        # Messages
+        # -----------------------
+        publishers = {}
+        subscribers = {} # {message name : [(node name, timeout), ...]}
+        for node_name, _, node_messages in nodes:
+            for direction, message_name, timeout_ms in node_messages:
+                if direction == "Tx":
+                    publishers.setdefault(message_name, node_name)
+                elif direction == "Rx":
+                    subscribers.setdefault(message_name, []).append((node_name, timeout_ms))
+        
+        for name, msg_id, extended, length, description, tx_type, period, repeats in messages:
+            self.add_message(name, msg_id, length, extended, tx_type, period, repeats, \
+                             description)
+            if name in publishers:
+                self.add_tx_message_to_node(publishers[name], name)
+            else:
+                log_warn(("Message \"" + str(name) + "\" doesn't have a defined publisher."))
+        
+        for node_name, _, node_messages in nodes:
+            for direction, message_name, timeout_ms in node_messages:
+                if direction == "Rx":
+                    if message_name in self.messages \
+                    and self.messages[message_name].publisher == node_name:
+                        log_warn(("Message \"" + message_name + "\" already published by node \"" \
+                                  + node_name + "\", message can't be published " \
+                                  + "and subscribed by same node."))
+                    else:
+                        self.add_rx_messages_to_node(node_name, message_name, timeout_ms)
+        for name, _, _, _, _, _, _, _ in messages:
+            if name not in subscribers:
+                log_warn(("Message \"" + str(name) + "\" doesn't have subscribers."))
+        
+        # -----------------------
+        # Signals
+        # -----------------------
+        for name, length, description, signal_type, conveyor_message, start_byte, start_bit, \
+            init_value, fail_value, offset, resolution, unit in signals:
+            self.add_signal(name, length, description)
+            if name not in self.signals:
+                continue
+            if signal_type != "":
+                self.set_signal_data_type(name, signal_type)
+            else:
+                log_info(("Signal \"" + name + "\" doesn't have a defined data type."))
+            if conveyor_message != "" and conveyor_message != "None":
+                self.add_signal_to_message(conveyor_message, name, start_byte, start_bit)
+            else:
+                log_warn(("Signal \"" + name + "\" doesn't have a defined coveyor message."))
+            signal = self.signals[name]
+            for attribute, value in (("init_value", init_value), ("fail_value", fail_value), \
+                                     ("offset", offset), ("resolution", resolution), \
+                                     ("unit", unit)):
+                if str(value) != "":
+                    setattr(signal, attribute, value)
+
+    #===============================================================================================
+    @staticmethod
+    def get_dbc_enum_string(type_name, values):
+        """ Returns the enum string (see add_enum_type) for the given DBC value descriptions
+        [(value, description), ...]. Symbols are formed from the type name and the description
+        so they are unique across types. Negative values are not supported and are ignored. """
+        import calvos.comgen.dbc as dbc
+
+        enum_entries = []
+        symbols = set()
+        for value, description in values:
+            if isinstance(value, int) is False or value < 0:
+                log_warn(("Value %s (\"%s\") of type \"%s\" ignored. Only non-negative integer " \
+                          + "values are supported.") % (value, description, type_name))
+                continue
+            symbol = type_name + "_" + dbc.get_identifier(description, str(value))
+            if symbol in symbols:
+                symbol = "%s_%s" % (symbol, value)
+            symbols.add(symbol)
+            enum_entries.append("%s (%s)" % (symbol, value))
+
+        return ", ".join(enum_entries)
+
+    #===============================================================================================
+    def parse_dbc(self, input_file):
+        """ Parses a CAN database (DBC format) to generate this network.
+
+        The database is read in a single pass (see comgen.dbc) and then added to the network
+        with the same validations than parse_spreadsheet_ods:
+            - BU_ nodes are the network nodes (the Vector__XXX pseudo-node is ignored).
+            - BO_ messages are the network messages published by their transmitter and
+              subscribed by the receivers of their signals. Tx type is taken from the
+              GenMsgSendType attribute (or assumed cyclic if the message has a
+              GenMsgCycleTime), Tx period from the GenMsgCycleTime attribute.
+            - VAL_TABLE_ value tables and VAL_ signal values are enumerated types (a signal
+              whose values are the ones of a value table uses the value table type).
+            - SG_ signals are the network signals. Layout is given for little endian signals
+              and for big endian signals contained in one byte, other big endian signals and
+              multiplexed signals are added without conveyor message. Initial value is taken
+              from the GenSigStartValue attribute. Signed signals are not supported, they are
+              handled as unsigned ones (a warning is logged).
+        """
+        import calvos.comgen.dbc as dbc
+
+        self.metadata_gen_source_file = str(input_file)
+
+        self.input_file = cg.string_to_path(input_file)
+
+        log_debug("Loading CAN information from DBC file: '%s'..." % input_file)
+
+        database = dbc.parse_dbc(input_file)
+
+        # -----------------------
+        # Network Data
+        # -----------------------
+        db_name = database.get_attribute(database.attributes, "DBName", "")
+        if str(db_name) == "":
+            db_name = self.input_file.stem
+        self.name = str(db_name)
+        self.id_string = dbc.get_identifier(db_name, "CAN")
+        self.description = database.comment
+        self.version = database.version
+
+        # -----------------------
+        # Nodes
+        # -----------------------
+        log_debug("Adding nodes data.")
+        for name, comment in database.nodes.items():
+            if name != dbc.DUMMY_NODE:
+                self.add_node(name, comment)
+
+        # -----------------------
+        # Enum Types
+        # -----------------------
+        log_debug("Adding enums type data.")
+        value_tables = {} # {tuple of values : type name}
+        for name, values in database.value_tables.items():
+            self.add_enum_type(name, self.get_dbc_enum_string(name, values))
+            if name in self.enum_types:
+                self.enum_types[name].description = "Value table %s." % name
+                value_tables.setdefault(tuple(values), name)
+
+        signal_types = {} # {signal object : type name}
+        for message in database.messages.values():
+            for signal in message.signals.values():
+                if len(signal.values) > 0:
+                    type_name = value_tables.get(tuple(signal.values), None)
+                    if type_name is None:
+                        type_name = signal.name
+                        suffix = 0
+                        while type_name in self.enum_types:
+                            suffix += 1
+                            type_name = "%s_%s" % (signal.name, suffix)
+                        self.add_enum_type(type_name, \
+                                           self.get_dbc_enum_string(type_name, signal.values))
+                        if type_name in self.enum_types:
+                            self.enum_types[type_name].description = \
+                                "Values of signal %s." % signal.name
+                    if type_name in self.enum_types:
+                        signal_types.update({signal : type_name})
+
+        # -----------------------
+        # Messages
+        # -----------------------
+        log_debug("Adding messages data.")
+        messages = [message for message in database.messages.values() \
+                    if message.name != dbc.INDEPENDENT_SIGNALS_MESSAGE]
+        for message in messages:
+            cycle_time = database.get_attribute(message.attributes, "GenMsgCycleTime", 0)
+            if isinstance(cycle_time, (int, float)) is False or cycle_time <= 0:
+                cycle_time = ""
+            send_type = str(database.get_attribute(message.attributes, "GenMsgSendType", \
+                                                   "")).lower()
+            spontaneous = "spontan" in send_type or "event" in send_type
+            if "cyclic" in send_type and spontaneous:
+                tx_type = tx_type_list[CYCLIC_SPONTAN]
+            elif spontaneous is False and cycle_time != "":
+                tx_type = tx_type_list[CYCLIC]
+            else:
+                tx_type = tx_type_list[SPONTAN]
+
+            self.add_message(message.name, message.id, message.len, message.extended_id, \
+                             tx_type, cycle_time, "", message.comment)
+            if message.name not in self.messages:
+                continue
+
+            if message.transmitter in self.nodes:
+                self.add_tx_message_to_node(message.transmitter, message.name)
+            else:
+                log_warn(("Message \"" + message.name + "\" doesn't have a defined publisher."))
+
+            subscribers = []
+            for signal in message.signals.values():
+                for receiver in signal.receivers:
+                    if receiver != dbc.DUMMY_NODE and receiver not in subscribers:
+                        subscribers.append(receiver)
+            for node_name in subscribers:
+                if node_name == message.transmitter:
+                    log_warn(("Message \"" + message.name + "\" already published by node \"" \
+                              + node_name + "\", message can't be published " \
+                              + "and subscribed by same node."))
+                else:
+                    self.add_rx_messages_to_node(node_name, message.name, None)
+            if len(subscribers) == 0:
+                log_warn(("Message \"" + message.name + "\" doesn't have subscribers."))
+
+        # -----------------------
+        # Signals
+        # -----------------------
+        log_debug("Adding signals data.")
+        for message in messages:
+            for signal in message.signals.values():
+                if signal.name in self.signals:
+                    log_warn(("Duplicated Signal: \"" + signal.name + "\" of message \"" \
+                              + message.name + "\" not added to the network."))
+                    continue
+                self.add_signal(signal.name, signal.len, signal.comment)
+                if signal.name not in self.signals:
+                    continue
+                self.set_signal_data_type(signal.name, \
+                                          signal_types.get(signal, data_types_list[SCALAR]))
+                if signal.signed is True:
+                    log_warn(("Signal \"" + signal.name + "\" is signed, signed signals are " \
+                              + "not supported. Signal handled as unsigned."))
+
+                # Layout (absolute start bit of the least significant bit)
+                start_bit = None
+                if signal.multiplex is not None and signal.multiplex != "M":
+                    log_warn(("Signal \"" + signal.name + "\" is multiplexed, multiplexed " \
+                              + "signals are not supported. Signal added without layout."))
+                elif signal.little_endian is True:
+                    start_bit = signal.start_bit
+                elif (signal.start_bit % 8) - signal.len + 1 >= 0:
+                    start_bit = signal.start_bit - signal.len + 1
+                else:
+                    log_warn(("Signal \"" + signal.name + "\" is big endian and spans more " \
+                              + "than one byte, which is not supported. Signal added without " \
+                              + "layout."))
+                if start_bit is not None and message.name in self.messages:
+                    self.add_signal_to_message(message.name, signal.name, start_bit // 8, \
+                                               start_bit % 8)
+                elif start_bit is not None:
+                    log_warn(("Signal \"" + signal.name \
+                              + "\" doesn't have a defined coveyor message."))
+
+                init_value = database.get_attribute(signal.attributes, "GenSigStartValue", "")
+                for attribute, value in (("init_value", init_value), \
+                                         ("offset", signal.offset), \
+                                         ("resolution", signal.factor), \
+                                         ("unit", signal.unit)):
+                    if str(value) != "":
+                        setattr(self.signals[signal.name], attribute, value)
+
+    #===============================================================================================
     class EnumType:
         """ Class to model an enumerated data type. """
         def __init__(self, name, enum_string, description = ""):
@@ -2792,13 +3303,417 @@ class Network_CAN:
                 
             return return_value
 
+    #===============================================================================================
+    class NodeView():
+        """ Class to model the tables derived from a network for one of its nodes.
+        
+        Built once per node (see Network_CAN.get_node_view) and shared by all the node templates.
+        Lists and dictionaries of this object shall be taken as read-only.
+        
+        Attributes
+        ----------
+            name : str
+                Name of the node.
+            network : Network_CAN
+                Subnetwork view with only the data of the node.
+            tx_messages : list
+                Names of the messages transmitted by the node, in network order.
+            rx_messages : list
+                Names of the messages received by the node, in network order.
+            sorted_rx_messages : list
+                Names of the messages received by the node, sorted by message ID (order of the
+                RX messages indexes and of the RX static data array).
+            messages_signals : dict
+                Signals of each message of the node {message name : [signal object, ...]}.
+            rx_data_idx : dict
+                Index of each RX message in the RX data buffer {message name : byte index}.
+            rx_data_len : int
+                Total length in bytes of the RX data buffer.
+            tx_data_idx : dict
+                Index of each TX message in the TX data buffer {message name : byte index}.
+            tx_data_len : int
+                Total length in bytes of the TX data buffer.
+            rx_avlbl_flags_idx : dict
+                Index of the available flag of each RX signal within the flags of its message
+                {signal name : bit index}.
+            rx_avlbl_buffer_idx : dict
+                Index of the available flags of each RX message in the available flags buffer
+                {message name : byte index}.
+            rx_avlbl_slot_len : dict
+                Length of the available flags of each RX message {message name : bytes}.
+            rx_avlbl_buffer_len : int
+                Total length in bytes of the available flags buffer.
+            rx_search_tree : list
+                Binary search tree of the sorted RX messages, one entry per sorted RX message:
+                [index, previous index|None, next index|None].
+            rx_search_start_idx : int|None
+                Index of the root of the RX search tree (None if there are no RX messages).
+            rx_lookup : str|None
+                Form of the lookup of RX messages by ID (one of rx_lookup_list), see
+                set_rx_lookup. None if there are no RX messages.
+            rx_lookup_probes : int
+                Worst-case number of probes (table reads or ID comparisons) of the RX lookup.
+            rx_lookup_min_id : int
+                Smallest RX message ID (offset of the direct index table).
+            rx_lookup_table : list
+                Direct index table (one entry per ID from rx_lookup_min_id) or perfect hash table
+                (one entry per slot). Entries are the index in sorted_rx_messages plus one, 0 for
+                no message.
+            rx_lookup_hash : cg.PerfectHash|None
+                Perfect hash of the RX message IDs if rx_lookup is RX_LOOKUP_HASH.
+            rx_filters : list
+                Hardware acceptance filters for the RX messages, see set_rx_filters. Filters
+                for standard IDs first, then for extended IDs. Each filter is
+                [filter ID, mask, is extended, [index in sorted_rx_messages, ...]].
+            rx_filters_msg : list
+                Index in sorted_rx_messages of the message accepted by each filter of rx_filters,
+                None if the filter accepts more than one ID or more than one message.
+            rx_filters_false_ids : dict
+                Number of IDs accepted by the filters which are not RX messages of the node
+                {False : standard IDs, True : extended IDs}.
+            rx_timeout_ticks : dict
+                Timeout of each RX message in ticks of the RX task {message name : ticks}, 0 if
+                the message has no timeout.
+            rx_timeout_supervision : str|None
+                Form of the supervision of RX timeouts (one of rx_timeout_supervision_list), see
+                set_rx_timeouts. None if there are no RX messages.
+            rx_timeout_wheel_msgs : list
+                Index in sorted_rx_messages of each message tracked by the timer wheel (messages
+                with a timeout), empty if rx_timeout_supervision is not RX_TIMEOUT_TIMER_WHEEL.
+            rx_timeout_wheel_slots : int
+                Number of slots of the timer wheel, power of two greater than the longest timeout
+                in ticks (0 if there is no timer wheel).
+            tx_schedule : list
+                Cyclic TX messages grouped by period, see set_tx_schedule. One entry per period
+                in ticks of the TX task, by increasing period:
+                [period, [[phase offset, [message name, ...]], ...]], by increasing phase.
+            tx_mailboxes : int
+                Number of HAL TX mailboxes (parameter CAN_tx_mailboxes). With 1 a single message
+                is in transmission at a time and the HAL functions take no mailbox index.
+        """
+        def __init__(self, network, node_name):
+            self.name = node_name
+            self.network = network
+            
+            self.tx_messages = []
+            self.rx_messages = []
+            for message_name in network.messages:
+                direction = network.get_message_direction(node_name, message_name)
+                if direction == CAN_TX:
+                    self.tx_messages.append(message_name)
+                elif direction == CAN_RX:
+                    self.rx_messages.append(message_name)
+                else:
+                    log_warn(("Message '%s' direction not determined for node '%s' " \
+                              + "in network '%s'.") % (message_name, node_name, network.id_string))
+            
+            # Stable sort, messages with same ID keep network order
+            self.sorted_rx_messages = sorted(self.rx_messages, \
+                                             key = lambda name: network.messages[name].id)
+            
+            self.messages_signals = {}
+            for message_name in network.messages:
+                self.messages_signals.update( \
+                    {message_name : network.get_signals_of_message(message_name)})
+            
+            # Data buffers
+            self.rx_data_idx = {}
+            self.rx_data_len = 0
+            for message_name in self.sorted_rx_messages:
+                self.rx_data_idx.update({message_name : self.rx_data_len})
+                self.rx_data_len += network.messages[message_name].len
+            
+            self.tx_data_idx = {}
+            self.tx_data_len = 0
+            for message_name in self.tx_messages:
+                self.tx_data_idx.update({message_name : self.tx_data_len})
+                self.tx_data_len += network.messages[message_name].len
+                
+            # Available flags
+            self.rx_avlbl_flags_idx = {}
+            self.rx_avlbl_buffer_idx = {}
+            self.rx_avlbl_slot_len = {}
+            self.rx_avlbl_buffer_len = 0
+            for message_name in self.rx_messages:
+                message_signals = self.messages_signals[message_name]
+                for index, signal in enumerate(message_signals):
+                    self.rx_avlbl_flags_idx.update({signal.name : index})
+                slot_len = int(cg.calculate_base_type_len(len(message_signals))/8)
+                self.rx_avlbl_buffer_idx.update({message_name : self.rx_avlbl_buffer_len})
+                self.rx_avlbl_slot_len.update({message_name : slot_len})
+                self.rx_avlbl_buffer_len += slot_len
+            
+            # RX search tree
+            self.rx_search_tree = []
+            self.rx_search_start_idx = None
+            if len(self.rx_messages) > 0:
+                root = cg.formTree([*range(len(self.rx_messages))])
+                cg.inorderTree(root, self.rx_search_tree)
+                self.rx_search_start_idx = math.floor(len(self.rx_messages)/2)
+            
+            # RX lookup
+            self.rx_lookup = None
+            self.rx_lookup_probes = 0
+            self.rx_lookup_min_id = 0
+            self.rx_lookup_table = []
+            self.rx_lookup_hash = None
+            if len(self.rx_messages) > 0:
+                self.set_rx_lookup(network.get_simple_param("CAN_msg_search_algorithm"), \
+                                   network.get_simple_param("CAN_msg_search_algorithm_param1"))
+            
+            # RX acceptance filters
+            self.rx_filters = []
+            self.rx_filters_msg = []
+            self.rx_filters_false_ids = {False : 0, True : 0}
+            if len(self.rx_messages) > 0:
+                self.set_rx_filters(network.get_simple_param("CAN_rx_filters_std"), \
+                                    network.get_simple_param("CAN_rx_filters_ext"))
+            
+            # RX timeouts supervision
+            self.rx_timeout_ticks = {}
+            self.rx_timeout_supervision = None
+            self.rx_timeout_wheel_msgs = []
+            self.rx_timeout_wheel_slots = 0
+            if len(self.rx_messages) > 0:
+                self.set_rx_timeouts(network.get_simple_param("CAN_rx_timeout_supervision"), \
+                                     network.get_simple_param("CAN_rx_task_period"))
+            
+            # TX schedule of cyclic messages
+            self.tx_schedule = []
+            if len(self.tx_messages) > 0:
+                self.set_tx_schedule(network.get_simple_param("CAN_tx_task_period"))
+            
+            # TX mailboxes
+            self.tx_mailboxes = 1
+            tx_mailboxes = network.get_simple_param("CAN_tx_mailboxes")
+            if tx_mailboxes is not None and 1 <= tx_mailboxes <= 255:
+                self.tx_mailboxes = tx_mailboxes
+            elif len(self.tx_messages) > 0:
+                log_warn("Config parameter 'CAN_tx_mailboxes' wrong value '%s'. Assumed 1." \
+                         % str(tx_mailboxes))
+        
+        def set_rx_lookup(self, algorithm, direct_factor):
+            """ Selects the form of the lookup of RX messages by ID and builds its tables.
+            
+            Candidate forms (IDs shall be unique, otherwise the search tree is used):
+                - RX_LOOKUP_DIRECT: table indexed by the ID minus the smallest ID, 1 probe. Only
+                  if the table has at most direct_factor entries per RX message.
+                - RX_LOOKUP_HASH: perfect hash table plus verification of the ID, 2 probes (3 if
+                  a table of displacements is needed).
+                - RX_LOOKUP_SWITCH: switch statement on the IDs, compiled as a binary decision
+                  of up to log2(n+1) comparisons (no tables).
+                - RX_LOOKUP_SEARCH_TREE: traversal of the RX search tree (no tables).
+            
+            The cheapest form is selected: fewest worst-case probes, then fewest table bytes, then
+            order of rx_lookup_list. A forced algorithm is used if it is possible for the node, if
+            the search tree is forced (default) the other forms are not evaluated.
+            
+            Parameters
+            ----------
+                algorithm : str
+                    Value of parameter CAN_msg_search_algorithm ("auto" or a lookup form).
+                direct_factor : int
+                    Maximum number of entries of the direct index table per RX message.
+            """
+            msg_ids = [self.network.messages[message_name].id \
+                       for message_name in self.sorted_rx_messages]
+            rx_count = len(msg_ids)
+            index_size = cg.calculate_base_type_len(rx_count.bit_length()) // 8
+            
+            # Candidates {form : (probes, table bytes)}
+            candidates = {RX_LOOKUP_SEARCH_TREE : (rx_count.bit_length(), 0)}
+            hash_obj = None
+            if algorithm == RX_LOOKUP_SEARCH_TREE:
+                # Search tree is forced, other forms are not evaluated
+                pass
+            elif len(set(msg_ids)) == rx_count:
+                candidates.update({RX_LOOKUP_SWITCH : (rx_count.bit_length(), 0)})
+                span = msg_ids[-1] - msg_ids[0] + 1
+                if direct_factor is not None and span <= direct_factor * rx_count:
+                    candidates.update({RX_LOOKUP_DIRECT : (1, span * index_size)})
+                hash_obj = cg.get_perfect_hash(msg_ids)
+                if hash_obj is not None:
+                    hash_bytes = len(hash_obj.slots) * index_size
+                    hash_probes = 2
+                    if hash_obj.bucket_bits > 0:
+                        hash_bytes += len(hash_obj.displacements) \
+                            * (cg.calculate_base_type_len(hash_obj.slot_bits) // 8)
+                        hash_probes = 3
+                    candidates.update({RX_LOOKUP_HASH : (hash_probes, hash_bytes)})
+            else:
+                log_warn(("RX messages of node '%s' in network '%s' have repeated IDs, " \
+                          + "using search tree for their lookup.") \
+                         % (self.name, self.network.id_string))
+            
+            if algorithm in candidates:
+                self.rx_lookup = algorithm
+            else:
+                if algorithm in ("linear", "multi_search_tree"):
+                    log_warn(("Msg search algorithm '%s' is not implemented, using search tree " \
+                              + "for node '%s'.") % (algorithm, self.name))
+                    self.rx_lookup = RX_LOOKUP_SEARCH_TREE
+                else:
+                    if algorithm != "auto":
+                        log_warn(("Msg search algorithm '%s' not possible for node '%s', " \
+                                  + "selecting it automatically.") % (algorithm, self.name))
+                    self.rx_lookup = min(candidates, key = lambda form: \
+                        (*candidates[form], rx_lookup_list.index(form)))
+            self.rx_lookup_probes = candidates[self.rx_lookup][0]
+            
+            if self.rx_lookup == RX_LOOKUP_DIRECT:
+                self.rx_lookup_min_id = msg_ids[0]
+                self.rx_lookup_table = [0] * (msg_ids[-1] - msg_ids[0] + 1)
+                for index, msg_id in enumerate(msg_ids):
+                    self.rx_lookup_table[msg_id - self.rx_lookup_min_id] = index + 1
+            elif self.rx_lookup == RX_LOOKUP_HASH:
+                self.rx_lookup_hash = hash_obj
+                self.rx_lookup_table = [0 if index is None else index + 1 \
+                                        for index in hash_obj.slots]
+            
+            log_info(("RX lookup of node '%s' in network '%s': %s, %s messages, worst case " \
+                      + "%s probe(s).") % (self.name, self.network.id_string, self.rx_lookup, \
+                                          rx_count, self.rx_lookup_probes))
+        
+        def set_rx_filters(self, std_filters, ext_filters):
+            """ Computes the hardware acceptance filters (ID/mask pairs) of the RX messages.
+            
+            Filters are computed separately for standard and extended IDs, accepting all the
+            RX messages with as few other IDs as possible (see cg.get_acceptance_filters).
+            
+            Parameters
+            ----------
+                std_filters : int
+                    Number of filters available for standard IDs (0 for no filters).
+                ext_filters : int
+                    Number of filters available for extended IDs (0 for no filters).
+            """
+            for is_extended, max_filters, width in ((False, std_filters, 11), \
+                                                    (True, ext_filters, 29)):
+                msgs_indexes = {}
+                for index, message_name in enumerate(self.sorted_rx_messages):
+                    message = self.network.messages[message_name]
+                    if message.extended_id is is_extended:
+                        msgs_indexes.setdefault(message.id, []).append(index)
+                if len(msgs_indexes) == 0:
+                    continue
+                if max_filters is None or max_filters < 1:
+                    continue
+                
+                # Wider IDs than the frame type allows are not expected, but kept accepted
+                width = max(width, max(msgs_indexes).bit_length())
+                acc_filters = cg.get_acceptance_filters(list(msgs_indexes), width, max_filters)
+                for filter_id, mask, msg_ids in acc_filters:
+                    filter_msgs = [index for msg_id in msg_ids for index in msgs_indexes[msg_id]]
+                    self.rx_filters.append([filter_id, mask, is_extended, filter_msgs])
+                    if mask == (1 << width) - 1 and len(filter_msgs) == 1:
+                        self.rx_filters_msg.append(filter_msgs[0])
+                    else:
+                        self.rx_filters_msg.append(None)
+                self.rx_filters_false_ids[is_extended] = \
+                    cg.count_accepted_keys(acc_filters, width) - len(msgs_indexes)
+                
+                log_info(("RX acceptance filters of node '%s' in network '%s': %s filter(s) " \
+                          + "for %s %s ID(s), %s other ID(s) accepted.") \
+                         % (self.name, self.network.id_string, len(acc_filters), \
+                            len(msgs_indexes), "extended" if is_extended else "standard", \
+                            self.rx_filters_false_ids[is_extended]))
+        
+        def set_rx_timeouts(self, supervision, rx_task_period):
+            """ Computes the RX timeouts in ticks and the timer wheel that supervises them.
+            
+            With RX_TIMEOUT_TIMER_WHEEL only the messages with a timeout are tracked, each one in
+            the slot of the tick in which it times out. The wheel has more slots than the longest
+            timeout, so a slot only holds messages timing out in its next visit. Falls back to
+            RX_TIMEOUT_SCAN if no message has a timeout or the wheel would be too large.
+            
+            Parameters
+            ----------
+                supervision : str
+                    Value of parameter CAN_rx_timeout_supervision.
+                rx_task_period : int
+                    Period in ms of the RX task (parameter CAN_rx_task_period).
+            """
+            for message_name in self.rx_messages:
+                message_timeout = self.network.get_message_timeout(self.name, message_name)
+                if message_timeout is not None:
+                    timeout_in_ticks = round(int(message_timeout)/rx_task_period)
+                else:
+                    timeout_in_ticks = 0
+                self.rx_timeout_ticks.update({message_name : timeout_in_ticks})
+            
+            self.rx_timeout_supervision = RX_TIMEOUT_SCAN
+            if supervision == RX_TIMEOUT_TIMER_WHEEL:
+                wheel_msgs = [index for index, message_name in enumerate(self.sorted_rx_messages) \
+                              if self.rx_timeout_ticks[message_name] > 0]
+                if len(wheel_msgs) > 0:
+                    wheel_slots = 1 << max(self.rx_timeout_ticks.values()).bit_length()
+                    if wheel_slots <= RX_TIMEOUT_WHEEL_MAX_SLOTS:
+                        self.rx_timeout_supervision = RX_TIMEOUT_TIMER_WHEEL
+                        self.rx_timeout_wheel_msgs = wheel_msgs
+                        self.rx_timeout_wheel_slots = wheel_slots
+                        log_info(("RX timeouts of node '%s' in network '%s': timer wheel of %s " \
+                                  + "slot(s) for %s message(s).") % (self.name, \
+                                  self.network.id_string, wheel_slots, len(wheel_msgs)))
+                    else:
+                        log_warn(("RX timeouts of node '%s' in network '%s' exceed %s ticks of " \
+                                  + "the RX task, supervising them by scan.") % (self.name, \
+                                  self.network.id_string, RX_TIMEOUT_WHEEL_MAX_SLOTS - 1))
+            elif supervision != RX_TIMEOUT_SCAN:
+                log_warn(("RX timeout supervision '%s' not valid for node '%s', using '%s'.") \
+                         % (supervision, self.name, RX_TIMEOUT_SCAN))
+        
+        def set_tx_schedule(self, tx_task_period):
+            """ Groups the cyclic TX messages by period and assigns their phase offsets.
+            
+            Messages of a period group share a single counter of ticks of the TX task and each
+            one is transmitted when the counter reaches its phase offset. Offsets are spread so
+            that as few messages as possible are transmitted in the same tick (see
+            cg.get_phase_offsets). Messages with a period below one tick are transmitted in
+            every tick (period of 1).
+            
+            Parameters
+            ----------
+                tx_task_period : int
+                    Period in ms of the TX task (parameter CAN_tx_task_period).
+            """
+            cyclic_msgs = []
+            msgs_periods = []
+            for message_name in self.tx_messages:
+                message = self.network.messages[message_name]
+                if message.tx_period != 0 \
+                and (message.tx_type == tx_type_list[CYCLIC] \
+                or message.tx_type == tx_type_list[CYCLIC_SPONTAN]):
+                    if message.tx_period is None or message.tx_period == "":
+                        period_in_ticks = 0
+                    else:
+                        period_in_ticks = round(int(message.tx_period)/tx_task_period)
+                    cyclic_msgs.append(message_name)
+                    msgs_periods.append(max(1, period_in_ticks))
+            
+            schedule = {}
+            phases = cg.get_phase_offsets(msgs_periods)
+            for message_name, period, phase in zip(cyclic_msgs, msgs_periods, phases):
+                schedule.setdefault(period, {}).setdefault(phase, []).append(message_name)
+            for period in sorted(schedule):
+                self.tx_schedule.append([period, [[phase, schedule[period][phase]] \
+                                                  for phase in sorted(schedule[period])]])
+            
+            if len(cyclic_msgs) > 0:
+                log_info(("TX schedule of node '%s' in network '%s': %s cyclic message(s) in %s " \
+                          + "period group(s).") % (self.name, self.network.id_string, \
+                                                   len(cyclic_msgs), len(self.tx_schedule)))
+            
     #===============================================================================================
     class SignalAccess():
         """ Class to model the abstract access of a signal. """
         def __init__(self, name, length):
             self.signal_name = name
             self.signal_len = length
-            self.signal_base_len = cg.calculate_base_type_len(self.signal_len)
+            if self.signal_len <= cg.Compiler_max_size:
+                self.signal_base_len = cg.calculate_base_type_len(self.signal_len)
+            else:
+                # Signal exceeds maximum compiler data size
+                self.signal_base_len = None
                     
             self.pieces = [] # Array of PieceAccess objects
         
@@ -2842,8 +3757,8 @@ def load_input(input_file, input_type, params, project_obj):
         input_file : Path
             Path object pointing to the input file for the current project' module.
         input_type : int
-            Type of input, can be either IN_TYPE_XML or IN_TYPE_ODS. Those constants are
-            defined in the "project" module.
+            Type of input, can be either IN_TYPE_XML, IN_TYPE_ODS or IN_TYPE_DBC. Those
+            constants are defined in the "project" module.
         params : dict
             Dictionary of parameters if required.
     
@@ -2853,11 +3768,24 @@ def load_input(input_file, input_type, params, project_obj):
         This function returns an object with the loaded data for the current module. For CAN
         Networks this object is of class Network_CAN.
     """
-    del input_type, params # Unused parameters
+    import calvos.common.project as pj
+    
+    def parse_model():
+        network = Network_CAN(project_obj)
+#        network.load_default_gen_params()
+        if input_type == pj.IN_TYPE_XML:
+            network.parse_xml(input_file)
+        elif input_type == pj.IN_TYPE_DBC:
+            network.parse_dbc(input_file)
+        else:
+            network.parse_spreadsheet_ods(input_file)
+        network.update_signal_access_plans()
+        return network
+    
     try:
-        return_object = Network_CAN(project_obj)
-#        return_object.load_default_gen_params()
-        return_object.parse_spreadsheet_ods(input_file)
+        # Parsed network is taken from the model cache if input and parameters didn't change
+        return_object = mc.get_model(project_obj, "comgen.CAN", MODEL_SCHEMA_VERSION, \
+                                     input_file, params, parse_model)
         try:
             return_object.update_cog_sources()
         except Exception as e:
@@ -2904,6 +3832,7 @@ def generate(input_object, out_path, working_path, calvos_path, params = {}):
     # Generate XML
     xml_output_file = out_path / (str(input_object.input_file.stem) + ".xml")
     input_object.gen_XML(xml_output_file)
+    ctpl.output_files.append(str(xml_output_file))
 #     except Exception as e:
 #         log_error('Failed to generate code. Reason: %s' % e)
         
\ No newline at end of file
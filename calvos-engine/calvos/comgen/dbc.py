@@ -0,0 +1,548 @@
+# -*- coding: utf-8 -*-
+""" CalvOS DBC Reader Module.
+
+Reader of CAN databases in DBC format. See parse_dbc.
+
+The whole file is split into tokens with a single regular expression and the statements are
+then parsed in one pass over the tokens, so reading time grows linearly with the size of the
+database. Supported statements are:
+    VERSION, BU_ (nodes), VAL_TABLE_ (value tables), BO_ (messages), SG_ (signals),
+    CM_ (comments), BA_DEF_ / BA_DEF_DEF_ / BA_ (attribute definitions, defaults and values)
+    and VAL_ (signal value descriptions).
+Other statements (e.g., NS_, BS_, EV_, SIG_VALTYPE_) are skipped.
+
+The database is returned as plain data (class Database), it is up to the caller to convert it
+into a network model (see Network_CAN.parse_dbc of comgen.CAN).
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import re
+
+import calvos.common.logsys as lg
+
+# --------------------------------------------------------------------------------------------------
+# Definitions for the logging system
+# --------------------------------------------------------------------------------------------------
+LOGGER_LABEL = "dbc"
+
+log = lg.log_system
+log.add_logger(LOGGER_LABEL)
+
+def log_debug(message):
+    log.debug(LOGGER_LABEL, message)
+
+def log_info(message):
+    log.info(LOGGER_LABEL, message)
+
+def log_warn(message):
+    log.warning(LOGGER_LABEL, message)
+
+def log_error(message):
+    log.error(LOGGER_LABEL, message)
+
+def log_critical(message):
+    log.critical(LOGGER_LABEL, message)
+# --------------------------------------------------------------------------------------------------
+
+# Tokens: strings (with escaped characters), numbers, identifiers or any other single character
+TOKEN_REGEX = re.compile(r'"(?:[^"\\]|\\.)*"' \
+                         r'|[-+]?(?:\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)' \
+                         r'|[A-Za-z_][A-Za-z0-9_]*' \
+                         r'|\S')
+INT_REGEX = re.compile(r"[-+]?\d+\Z")
+
+# Statements terminated by ';' which are not used
+SKIPPED_STATEMENTS = {"BO_TX_BU_", "EV_", "ENVVAR_DATA_", "SGTYPE_", "SGTYPE_VAL_", \
+                      "BA_DEF_SGTYPE_", "BA_SGTYPE_", "SIG_TYPE_REF_", "SIG_GROUP_", \
+                      "SIG_VALTYPE_", "SIGTYPE_VALTYPE_", "BA_DEF_REL_", "BA_REL_", \
+                      "BA_DEF_DEF_REL_", "BU_SG_REL_", "BU_EV_REL_", "BU_BO_REL_", \
+                      "SG_MUL_VAL_", "CAT_DEF_", "CAT_", "FILTER", "EV_DATA_"}
+
+# Statements not terminated by ';'
+UNTERMINATED_STATEMENTS = {"VERSION", "NS_", "BS_", "BU_", "BO_", "SG_"}
+
+# Object types of comments and attributes
+OBJ_NETWORK = ""
+OBJ_NODE = "BU_"
+OBJ_MESSAGE = "BO_"
+OBJ_SIGNAL = "SG_"
+OBJ_ENV_VAR = "EV_"
+OBJECT_TYPES = (OBJ_NODE, OBJ_MESSAGE, OBJ_SIGNAL, OBJ_ENV_VAR)
+
+# Message ID flag of extended frames
+EXTENDED_ID_FLAG = 0x80000000
+EXTENDED_ID_MASK = 0x1FFFFFFF
+
+# Name of the pseudo-message holding signals not assigned to any message
+INDEPENDENT_SIGNALS_MESSAGE = "VECTOR__INDEPENDENT_SIG_MSG"
+# Name of the pseudo-node used as transmitter/receiver when there is none
+DUMMY_NODE = "Vector__XXX"
+
+#===================================================================================================
+def get_number(token):
+    """ Returns the int (or float if not an integer) value of a number token. """
+    if INT_REGEX.match(token) is not None:
+        return int(token)
+    return float(token)
+
+#===================================================================================================
+def get_string(token):
+    """ Returns the text of a string token (quotes removed and escaped characters resolved). """
+    text = token[1:-1]
+    if "\\" in text:
+        text = re.sub(r"\\(.)", r"\1", text)
+    return text
+
+#===================================================================================================
+def get_identifier(text, default = "_"):
+    """ Returns the given text as a C-language identifier, characters other than letters,
+    digits or underscore are replaced by underscores. Identifiers starting with a digit are
+    prefixed with an underscore. Returns default if the text has no valid characters. """
+    identifier = re.sub(r"[^A-Za-z0-9_]+", "_", str(text)).strip("_")
+    if identifier == "":
+        identifier = default
+    elif identifier[0].isdigit():
+        identifier = "_" + identifier
+
+    return identifier
+
+#===================================================================================================
+class Signal():
+    """ Signal of a DBC database. """
+
+    def __init__(self, name, start_bit, length, little_endian, signed, factor, offset, \
+                 minimum, maximum, unit, receivers, multiplex = None):
+        """ Class constructor.
+
+        Parameters
+        ----------
+            start_bit : int
+                Start bit as given in the database: least significant bit for little endian
+                (Intel) signals, most significant bit for big endian (Motorola) signals.
+            multiplex : str or int, optional
+                "M" for a multiplexer signal, the multiplexer value for multiplexed signals or
+                None for plain signals.
+        """
+        self.name = name
+        self.start_bit = start_bit
+        self.len = length
+        self.little_endian = little_endian
+        self.signed = signed
+        self.factor = factor
+        self.offset = offset
+        self.minimum = minimum
+        self.maximum = maximum
+        self.unit = unit
+        self.receivers = receivers
+        self.multiplex = multiplex
+        self.comment = ""
+        self.attributes = {}
+        self.values = [] # [(value, description), ...] (VAL_ statement)
+
+#===================================================================================================
+class Message():
+    """ Message of a DBC database. """
+
+    def __init__(self, raw_id, name, length, transmitter):
+        """ Class constructor.
+
+        Parameters
+        ----------
+            raw_id : int
+                Message ID as given in the database (bit 31 set for extended frames).
+        """
+        self.raw_id = raw_id
+        self.id = raw_id & EXTENDED_ID_MASK
+        self.extended_id = (raw_id & EXTENDED_ID_FLAG) != 0
+        self.name = name
+        self.len = length
+        self.transmitter = transmitter
+        self.comment = ""
+        self.attributes = {}
+        self.signals = {} # {signal name : Signal object}
+
+#===================================================================================================
+class Database():
+    """ Data of a DBC database. """
+
+    def __init__(self, file_name = None):
+        self.file_name = file_name
+        self.version = ""
+        self.comment = ""
+        self.attributes = {} # Network attributes {name : value}
+        self.nodes = {} # {node name : comment}
+        self.node_attributes = {} # {node name : {attribute name : value}}
+        self.value_tables = {} # {table name : [(value, description), ...]}
+        self.messages = {} # {raw message ID : Message object}
+        # {attribute name : (object type, value type, [enum values] or None)}
+        self.attribute_definitions = {}
+        self.attribute_defaults = {} # {attribute name : default value}
+
+    #===============================================================================================
+    def get_attribute(self, attributes, name, default = None):
+        """ Returns the value of an attribute.
+
+        Parameters
+        ----------
+            attributes : dict
+                Attributes of an object (e.g., Message.attributes).
+            name : str
+                Name of the attribute.
+            default : optional
+                Value returned if the attribute is neither set nor has a default value.
+
+        Returns
+        -------
+            Value of the attribute, the default value of its definition if not set for the
+            object. Values of ENUM attributes are returned as the enum string.
+        """
+        value = attributes.get(name, self.attribute_defaults.get(name, default))
+        definition = self.attribute_definitions.get(name, None)
+        if definition is not None and definition[1] == "ENUM" \
+        and isinstance(value, int) and 0 <= value < len(definition[2]):
+            value = definition[2][value]
+
+        return value
+
+    #===============================================================================================
+    def get_message(self, raw_id):
+        return self.messages.get(raw_id, None)
+
+    #===============================================================================================
+    def get_signal(self, raw_id, signal_name):
+        message = self.messages.get(raw_id, None)
+        if message is not None:
+            return message.signals.get(signal_name, None)
+        return None
+
+#===================================================================================================
+class Parser():
+    """ Single pass parser of the tokens of a DBC file. """
+
+    def __init__(self, tokens, database):
+        self.tokens = tokens
+        self.database = database
+        self.message = None # Message of the last BO_ statement
+        self.handlers = {"VERSION" : self.parse_version, \
+                         "NS_" : self.parse_new_symbols, \
+                         "BS_" : self.parse_bit_timing, \
+                         "BU_" : self.parse_nodes, \
+                         "VAL_TABLE_" : self.parse_value_table, \
+                         "BO_" : self.parse_message, \
+                         "SG_" : self.parse_signal, \
+                         "CM_" : self.parse_comment, \
+                         "BA_DEF_" : self.parse_attribute_definition, \
+                         "BA_DEF_DEF_" : self.parse_attribute_default, \
+                         "BA_" : self.parse_attribute, \
+                         "VAL_" : self.parse_value_descriptions}
+
+    #===============================================================================================
+    def parse(self):
+        """ Parses all the tokens filling-in the database. """
+        tokens = self.tokens
+        handlers = self.handlers
+        tokens_count = len(tokens)
+        unexpected = 0
+        idx = 0
+        while idx < tokens_count:
+            token = tokens[idx]
+            if token in handlers:
+                try:
+                    idx = handlers[token](idx + 1)
+                except (IndexError, ValueError) as e:
+                    log_warn("Invalid '%s' statement in '%s' (%s). Statement ignored." \
+                             % (token, self.database.file_name, e))
+                    if token in UNTERMINATED_STATEMENTS:
+                        idx += 1
+                    else:
+                        idx = self.skip_statement(idx + 1)
+            elif token in SKIPPED_STATEMENTS:
+                idx = self.skip_statement(idx + 1)
+            else:
+                unexpected += 1
+                idx += 1
+        if unexpected > 0:
+            log_warn("%s unexpected token(s) ignored in '%s'." \
+                     % (unexpected, self.database.file_name))
+
+    #===============================================================================================
+    def is_keyword(self, token):
+        return token in self.handlers or token in SKIPPED_STATEMENTS
+
+    #===============================================================================================
+    def skip_statement(self, idx):
+        """ Returns the index after the end (';') of the current statement. """
+        tokens = self.tokens
+        while idx < len(tokens) and tokens[idx] != ";":
+            idx += 1
+        return idx + 1
+
+    #===============================================================================================
+    def expect(self, idx, expected):
+        """ Returns the index of the next token, raises ValueError if the token at idx is not
+        the expected one. """
+        if self.tokens[idx] != expected:
+            raise ValueError("expected '%s', found '%s'" % (expected, self.tokens[idx]))
+        return idx + 1
+
+    #===============================================================================================
+    def parse_version(self, idx):
+        # VERSION "version"
+        self.database.version = get_string(self.tokens[idx])
+        return idx + 1
+
+    #===============================================================================================
+    def parse_new_symbols(self, idx):
+        # NS_ : symbol1 symbol2 ... (list ends at the BS_ statement)
+        tokens = self.tokens
+        while idx < len(tokens) and tokens[idx] != "BS_":
+            idx += 1
+        return idx
+
+    #===============================================================================================
+    def parse_bit_timing(self, idx):
+        # BS_ : [baudrate : BTR1 , BTR2] [;]
+        tokens = self.tokens
+        idx = self.expect(idx, ":")
+        if idx < len(tokens) and tokens[idx][0].isdigit():
+            idx += 5
+        if idx < len(tokens) and tokens[idx] == ";":
+            idx += 1
+        return idx
+
+    #===============================================================================================
+    def parse_nodes(self, idx):
+        # BU_ : node1 node2 ...
+        tokens = self.tokens
+        nodes = self.database.nodes
+        idx = self.expect(idx, ":")
+        while idx < len(tokens) and self.is_keyword(tokens[idx]) is False \
+        and (tokens[idx][0].isalpha() or tokens[idx][0] == "_"):
+            nodes.setdefault(tokens[idx], "")
+            idx += 1
+        return idx
+
+    #===============================================================================================
+    def parse_value_pairs(self, idx):
+        """ Parses value/description pairs up to the end of the statement (';').
+
+        Returns
+        -------
+            tuple
+                (index after the statement, [(value, description), ...])
+        """
+        tokens = self.tokens
+        values = []
+        while tokens[idx] != ";":
+            values.append((get_number(tokens[idx]), get_string(tokens[idx + 1])))
+            idx += 2
+        return (idx + 1, values)
+
+    #===============================================================================================
+    def parse_value_table(self, idx):
+        # VAL_TABLE_ name value1 "description1" value2 "description2" ... ;
+        name = self.tokens[idx]
+        idx, values = self.parse_value_pairs(idx + 1)
+        self.database.value_tables.update({name : values})
+        return idx
+
+    #===============================================================================================
+    def parse_message(self, idx):
+        # BO_ id name : length transmitter
+        tokens = self.tokens
+        raw_id = get_number(tokens[idx])
+        name = tokens[idx + 1]
+        idx = self.expect(idx + 2, ":")
+        message = Message(raw_id, name, get_number(tokens[idx]), tokens[idx + 1])
+        if raw_id in self.database.messages:
+            log_warn("Duplicated message ID %s of message '%s' in '%s'. Message ignored." \
+                     % (hex(raw_id), name, self.database.file_name))
+        else:
+            self.database.messages.update({raw_id : message})
+        # Signals that follow belong to this message
+        self.message = message
+        return idx + 2
+
+    #===============================================================================================
+    def parse_signal(self, idx):
+        # SG_ name [multiplex] : start|length@order sign (factor,offset) [min|max] "unit" receivers
+        tokens = self.tokens
+        name = tokens[idx]
+        idx += 1
+        multiplex = None
+        if tokens[idx] != ":":
+            multiplex = tokens[idx]
+            if multiplex != "M":
+                multiplex = get_number(multiplex.lstrip("m").rstrip("M"))
+            idx += 1
+        idx = self.expect(idx, ":")
+        start_bit = get_number(tokens[idx])
+        idx = self.expect(idx + 1, "|")
+        length = get_number(tokens[idx])
+        idx = self.expect(idx + 1, "@")
+        little_endian = tokens[idx] == "1"
+        signed = tokens[idx + 1] == "-"
+        idx = self.expect(idx + 2, "(")
+        factor = get_number(tokens[idx])
+        idx = self.expect(idx + 1, ",")
+        offset = get_number(tokens[idx])
+        idx = self.expect(idx + 1, ")")
+        idx = self.expect(idx, "[")
+        minimum = get_number(tokens[idx])
+        idx = self.expect(idx + 1, "|")
+        maximum = get_number(tokens[idx])
+        idx = self.expect(idx + 1, "]")
+        unit = get_string(tokens[idx])
+        idx += 1
+        receivers = [tokens[idx]]
+        idx += 1
+        while idx < len(tokens) and tokens[idx] == ",":
+            receivers.append(tokens[idx + 1])
+            idx += 2
+
+        if self.message is None:
+            log_warn("Signal '%s' defined out of a message in '%s'. Signal ignored." \
+                     % (name, self.database.file_name))
+        elif name in self.message.signals:
+            log_warn("Duplicated signal '%s' in message '%s' of '%s'. Signal ignored." \
+                     % (name, self.message.name, self.database.file_name))
+        else:
+            self.message.signals.update({name : Signal(name, start_bit, length, little_endian, \
+                                                       signed, factor, offset, minimum, \
+                                                       maximum, unit, receivers, multiplex)})
+        return idx
+
+    #===============================================================================================
+    def parse_object_reference(self, idx):
+        """ Parses the object reference of comments and attribute values.
+
+        Returns
+        -------
+            tuple
+                (index after the reference, object type, object) where object is the node name
+                (BU_), the Message object (BO_), the Signal object (SG_) or the environment
+                variable name (EV_). Message and Signal objects are None if not defined.
+        """
+        tokens = self.tokens
+        object_type = tokens[idx]
+        if object_type == OBJ_NODE or object_type == OBJ_ENV_VAR:
+            return (idx + 2, object_type, tokens[idx + 1])
+        elif object_type == OBJ_MESSAGE:
+            return (idx + 2, object_type, self.database.get_message(get_number(tokens[idx + 1])))
+        elif object_type == OBJ_SIGNAL:
+            return (idx + 3, object_type, \
+                    self.database.get_signal(get_number(tokens[idx + 1]), tokens[idx + 2]))
+        return (idx, OBJ_NETWORK, None)
+
+    #===============================================================================================
+    def parse_comment(self, idx):
+        # CM_ [BU_ node | BO_ id | SG_ id signal | EV_ variable] "comment" ;
+        idx, object_type, obj = self.parse_object_reference(idx)
+        comment = get_string(self.tokens[idx])
+        if object_type == OBJ_NETWORK:
+            self.database.comment = comment
+        elif object_type == OBJ_NODE:
+            if obj in self.database.nodes:
+                self.database.nodes[obj] = comment
+        elif object_type in (OBJ_MESSAGE, OBJ_SIGNAL) and obj is not None:
+            obj.comment = comment
+        return self.skip_statement(idx + 1)
+
+    #===============================================================================================
+    def parse_attribute_definition(self, idx):
+        # BA_DEF_ [BU_|BO_|SG_|EV_] "name" INT|HEX|FLOAT|STRING|ENUM [parameters] ;
+        tokens = self.tokens
+        object_type = OBJ_NETWORK
+        if tokens[idx] in OBJECT_TYPES:
+            object_type = tokens[idx]
+            idx += 1
+        name = get_string(tokens[idx])
+        value_type = tokens[idx + 1]
+        idx += 2
+        enum_values = None
+        if value_type == "ENUM":
+            enum_values = []
+            while tokens[idx] != ";":
+                if tokens[idx] != ",":
+                    enum_values.append(get_string(tokens[idx]))
+                idx += 1
+        self.database.attribute_definitions.update({name : (object_type, value_type, \
+                                                            enum_values)})
+        return self.skip_statement(idx)
+
+    #===============================================================================================
+    def get_attribute_value(self, token):
+        if token[0] == '"':
+            return get_string(token)
+        return get_number(token)
+
+    #===============================================================================================
+    def parse_attribute_default(self, idx):
+        # BA_DEF_DEF_ "name" value ;
+        name = get_string(self.tokens[idx])
+        value = self.get_attribute_value(self.tokens[idx + 1])
+        # Defaults of ENUM attributes are given as strings
+        self.database.attribute_defaults.update({name : value})
+        return self.skip_statement(idx + 2)
+
+    #===============================================================================================
+    def parse_attribute(self, idx):
+        # BA_ "name" [BU_ node | BO_ id | SG_ id signal | EV_ variable] value ;
+        name = get_string(self.tokens[idx])
+        idx, object_type, obj = self.parse_object_reference(idx + 1)
+        value = self.get_attribute_value(self.tokens[idx])
+        if object_type == OBJ_NETWORK:
+            self.database.attributes.update({name : value})
+        elif object_type == OBJ_NODE:
+            self.database.node_attributes.setdefault(obj, {}).update({name : value})
+        elif object_type in (OBJ_MESSAGE, OBJ_SIGNAL) and obj is not None:
+            obj.attributes.update({name : value})
+        return self.skip_statement(idx + 1)
+
+    #===============================================================================================
+    def parse_value_descriptions(self, idx):
+        # VAL_ id signal value1 "description1" ... ; or VAL_ variable value1 "description1" ... ;
+        tokens = self.tokens
+        if tokens[idx][0].isdigit():
+            signal = self.database.get_signal(get_number(tokens[idx]), tokens[idx + 1])
+            idx, values = self.parse_value_pairs(idx + 2)
+            if signal is not None:
+                signal.values = values
+        else:
+            # Environment variables are not used
+            idx = self.skip_statement(idx)
+        return idx
+
+#===================================================================================================
+def parse_dbc(input_file, encoding = "latin-1"):
+    """ Parses a DBC file.
+
+    Parameters
+    ----------
+        input_file : path
+            DBC file to parse.
+        encoding : str, optional
+            Encoding of the file. DBC files are usually written with a windows code page, by
+            default file is read as latin-1 so any byte is accepted.
+
+    Returns
+    -------
+        Database
+            Data read from the DBC file.
+    """
+    with open(str(input_file), "r", encoding = encoding, newline = "") as f:
+        text = f.read()
+
+    database = Database(str(input_file))
+    tokens = TOKEN_REGEX.findall(text)
+    Parser(tokens, database).parse()
+    log_debug("Read %s messages and %s nodes from '%s' (%s tokens)." \
+              % (len(database.messages), len(database.nodes), input_file, len(tokens)))
+
+    return database
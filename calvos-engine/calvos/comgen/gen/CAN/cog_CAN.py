@@ -56,4 +56,147 @@ def C_gen_info(worksheet, network_object):
  *     Network date: \""""+ str(network_object.date) + """\"
  *     Network version: \""""+ str(network_object.version) +"""\"
  -----------------------------------------------------------------------------*/"""
-    return return_str
\ No newline at end of file
+    return return_str
+
+def C_timer_wheel_types():
+    """ Returns the C declarations of the timer wheel types (supervision of RX
+    timeouts). """
+    return_str = """/* Declaration of timer wheel (supervision of RX timeouts) */
+typedef struct{
+	uint16_t next;	/* Next entry of the same slot plus one, 0 for the last one */
+	uint16_t prev;	/* Previous entry of the same slot plus one, 0 for the first one */
+	uint16_t slot;	/* Slot of the entry plus one, 0 if entry is not armed */
+}CANtimerWheelEntry;
+
+typedef struct{
+	uint16_t* slots;	/* First entry of each slot plus one, 0 for an empty slot */
+	CANtimerWheelEntry* entries;
+	uint16_t mask;	/* Number of slots minus one (number of slots is a power of two) */
+	uint16_t n_entries;
+	uint16_t tick;	/* Slot of the current tick */
+}CANtimerWheel;
+"""
+    return return_str
+
+def C_timer_wheel_prototypes():
+    """ Returns the C prototypes of the timer wheel functions. """
+    return_str = """/* Timer Wheel Functions */
+extern void can_timerWheelInit(CANtimerWheel* wheel);
+extern void can_timerWheelArm(CANtimerWheel* wheel, uint16_t entry, uint32_t ticks);
+extern void can_timerWheelAdvance(CANtimerWheel* wheel);
+extern uint16_t can_timerWheelPopExpired(CANtimerWheel* wheel);"""
+    return return_str
+
+def C_timer_wheel_functions():
+    """ Returns the C definitions of the timer wheel functions. """
+    return_str = """/* ===========================================================================*/
+/** Function to initialize a timer wheel.
+ *
+ * Empties all the slots of the wheel and disarms all its entries.
+ *
+ * @param wheel 	Pointer to the timer wheel to operate with.
+ * ===========================================================================*/
+void can_timerWheelInit(CANtimerWheel* wheel){
+	CALVOS_CRITICAL_ENTER();
+	for(uint32_t i = 0u; i <= wheel->mask; i++){
+		wheel->slots[i] = 0u;
+	}
+	for(uint32_t i = 0u; i < wheel->n_entries; i++){
+		wheel->entries[i].slot = 0u;
+	}
+	wheel->tick = 0u;
+	CALVOS_CRITICAL_EXIT();
+}
+
+/* ===========================================================================*/
+/** Function to unlink an entry from the slot of a timer wheel it is armed in.
+ *
+ * Does nothing if the entry is not armed. Shall be called within a critical
+ * section.
+ *
+ * @param wheel 	Pointer to the timer wheel to operate with.
+ * @param entry 	Index of the entry to unlink.
+ * ===========================================================================*/
+static void can_timerWheelUnlink(CANtimerWheel* wheel, uint16_t entry){
+	CANtimerWheelEntry* wheel_entry = &wheel->entries[entry];
+
+	if(wheel_entry->slot != 0u){
+		if(wheel_entry->prev != 0u){
+			wheel->entries[wheel_entry->prev - 1u].next = wheel_entry->next;
+		}else{
+			// Entry is the first one of its slot
+			wheel->slots[wheel_entry->slot - 1u] = wheel_entry->next;
+		}
+		if(wheel_entry->next != 0u){
+			wheel->entries[wheel_entry->next - 1u].prev = wheel_entry->prev;
+		}
+		wheel_entry->slot = 0u;
+	}
+}
+
+/* ===========================================================================*/
+/** Function to (re)arm an entry of a timer wheel.
+ *
+ * Moves the entry to the slot of the tick in which it expires, O(1) regardless
+ * of the number of entries.
+ *
+ * @param wheel 	Pointer to the timer wheel to operate with.
+ * @param entry 	Index of the entry to arm.
+ * @param ticks 	Ticks until the entry expires, from 1 up to the number of
+ * 					slots of the wheel minus one.
+ * ===========================================================================*/
+void can_timerWheelArm(CANtimerWheel* wheel, uint16_t entry, uint32_t ticks){
+	CANtimerWheelEntry* wheel_entry = &wheel->entries[entry];
+	uint16_t slot;
+
+	CALVOS_CRITICAL_ENTER();
+	can_timerWheelUnlink(wheel, entry);
+	// Link entry as the first one of its slot
+	slot = (uint16_t)((wheel->tick + ticks) & wheel->mask);
+	wheel_entry->prev = 0u;
+	wheel_entry->next = wheel->slots[slot];
+	if(wheel->slots[slot] != 0u){
+		wheel->entries[wheel->slots[slot] - 1u].prev = entry + 1u;
+	}
+	wheel->slots[slot] = entry + 1u;
+	wheel_entry->slot = slot + 1u;
+	CALVOS_CRITICAL_EXIT();
+}
+
+/* ===========================================================================*/
+/** Function to advance a timer wheel by one tick.
+ *
+ * Entries expiring in the new tick shall then be taken with
+ * can_timerWheelPopExpired.
+ *
+ * @param wheel 	Pointer to the timer wheel to operate with.
+ * ===========================================================================*/
+void can_timerWheelAdvance(CANtimerWheel* wheel){
+	CALVOS_CRITICAL_ENTER();
+	wheel->tick = (wheel->tick + 1u) & wheel->mask;
+	CALVOS_CRITICAL_EXIT();
+}
+
+/* ===========================================================================*/
+/** Function to take an expired entry of a timer wheel.
+ *
+ * Disarms one of the entries expiring in the current tick.
+ *
+ * @param wheel 	Pointer to the timer wheel to operate with.
+ * @return	Returns the index plus one of the expired entry. Returns 0 if no
+ * 			more entries expire in the current tick.
+ * ===========================================================================*/
+uint16_t can_timerWheelPopExpired(CANtimerWheel* wheel){
+	uint16_t return_value;
+
+	CALVOS_CRITICAL_ENTER();
+	return_value = wheel->slots[wheel->tick];
+	if(return_value != 0u){
+		can_timerWheelUnlink(wheel, return_value - 1u);
+	}
+	CALVOS_CRITICAL_EXIT();
+
+	return return_value;
+}
+"""
+    return return_str
@@ -13,17 +13,23 @@ import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
 
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
-
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project_obj = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+
+if 'cog_proj_obj' in locals():
+	project_obj = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project_obj = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -116,19 +122,12 @@ if NODEID_wildcard != "None":
 else:
 	node_name_str = ""
 
-# Get subnetwork for this node
-subnet = network.get_subnetwork([node_name])
-
-list_of_tx_msgs = []
-list_of_rx_msgs = []
-for message in subnet.messages.values():
-	if subnet.get_message_direction(node_name,message.name) == nw.CAN_TX:
-		list_of_tx_msgs.append(message.name)
-	elif subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-		list_of_rx_msgs.append(message.name)
-	else:
-		log_warn(("Message '%s' direction not determined for node '%s' " \
-			+ "in network '%s'.") % (message.name, node_name, network_name))
+# Get view of this node (tables shared by all node templates, see Network_CAN.NodeView)
+node_view = network.get_node_view(node_name)
+subnet = node_view.network
+
+list_of_tx_msgs = node_view.tx_messages
+list_of_rx_msgs = node_view.rx_messages
 
 callback_prefix = "can_" + net_name_str + node_name_str
 callback_rx_sufix = "_rx_callback"
@@ -13,17 +13,23 @@ import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
 
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
-
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+
+if 'cog_proj_obj' in locals():
+	project = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -87,25 +93,15 @@ if NODEID_wildcard != "None":
 else:
 	node_name_str = ""
 
-# Get subnetwork for this node
-subnet = network.get_subnetwork([node_name])
+# Get view of this node (tables shared by all node templates, see Network_CAN.NodeView)
+node_view = network.get_node_view(node_name)
+subnet = node_view.network
 
-list_of_tx_msgs = []
-list_of_rx_msgs = []
-for message in subnet.messages.values():
-	if subnet.get_message_direction(node_name,message.name) == nw.CAN_TX:
-		list_of_tx_msgs.append(message.name)
-	elif subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-		list_of_rx_msgs.append(message.name)
-	else:
-		log_warn(("Message '%s' direction not determined for node '%s' " \
-			+ "in network '%s'.") % (message.name, node_name, network_name))
+list_of_tx_msgs = node_view.tx_messages
+list_of_rx_msgs = node_view.rx_messages
 
-# Sort RX messages by ID
-sorted_rx_msgs = {} # Expects {msg_name : msg_id}
-for msg_name in list_of_rx_msgs:
-	sorted_rx_msgs.update({msg_name : subnet.messages[msg_name].id})
-sorted_rx_msgs = dict(sorted(sorted_rx_msgs.items(), key=lambda kv: kv[1]))
+# RX messages sorted by ID
+sorted_rx_msgs = node_view.sorted_rx_messages
 
  ]]] */
 // [[[end]]]
@@ -169,16 +165,12 @@ if len(list_of_rx_msgs) > 0:
 	sym_sig_idx_pfx = "kCAN_" + net_name_str + node_name_str + "sig_avlbl_idx_"
 	macro_names = []
 	macro_values = []
-	for message in subnet.messages.values():
-		if subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-			message_signals = subnet.get_signals_of_message(message.name)
-			index = 0
-			for signal in message_signals:
-				macro_name = sym_sig_idx_pfx + signal.name
-				macro_value = "(" + str(index) + "u)"
-				index += 1
-				macro_names.append(macro_name)
-				macro_values.append(macro_value)
+	for message_name in list_of_rx_msgs:
+		for signal in node_view.messages_signals[message_name]:
+			macro_name = sym_sig_idx_pfx + signal.name
+			macro_value = "(" + str(node_view.rx_avlbl_flags_idx[signal.name]) + "u)"
+			macro_names.append(macro_name)
+			macro_values.append(macro_value)
 
 	max_len = cg.get_str_max_len(macro_names)
 	max_len += TAB_SPACE
@@ -203,11 +195,8 @@ if len(list_of_rx_msgs) > 0:
 /* Array of Rx messages static data */
 /* [[[cog
 if len(list_of_rx_msgs) > 0:
-	# Create search tree
-	input = [*range(len(list_of_rx_msgs))]
-	root = cg.formTree(input)
-	search_tree = []
-	cg.inorderTree(root, search_tree)
+	# Search tree
+	search_tree = node_view.rx_search_tree
 
 	# Create static array
 	sym_rx_stat_data_type = "const CANrxMsgStaticData"
@@ -224,8 +213,7 @@ if len(list_of_rx_msgs) > 0:
 	sym_avlbl_size_idx_pfx = "kCAN_" + net_name_str + node_name_str + "avlbl_slot_len_"
 
 	array_data = []
-	data_idx = 0
-	for i, msg_name in enumerate(sorted_rx_msgs.keys()):
+	for i, msg_name in enumerate(sorted_rx_msgs):
 		array_data.clear()
 		# Msg ID
 		array_data.append("kCAN_" + net_name_str + "msgId_" + msg_name)
@@ -237,8 +225,8 @@ if len(list_of_rx_msgs) > 0:
 		# Msg timeout callback
 		array_data.append("&" + callback_prefix + msg_name + callback_tout_sufix)
 		# Data Buffer
-		array_data.append(" \\\n\t\t\t\t&" + sym_rx_data_name + "["+ str(data_idx) +"]")
-		data_idx += subnet.messages[msg_name].len
+		array_data.append(" \\\n\t\t\t\t&" + sym_rx_data_name + "[" \
+			+ str(node_view.rx_data_idx[msg_name]) + "]")
 		# Available Flags Buffer
 		array_data.append("&" + sym_avlbl_buffer_name + "["+ sym_avlbl_buff_idx_pfx + msg_name +"]")
 		# Available Flags Buffer Length
@@ -280,7 +268,7 @@ if len(list_of_rx_msgs) > 0:
 				code_string += ",\t"
 			if j == ALL_DATA_END:
 				code_string += "}"
-		if i < len(sorted_rx_msgs.keys()) - 1:
+		if i < len(sorted_rx_msgs) - 1:
 			code_string += ", \\"
 		else:
 			code_string += "};"
@@ -288,13 +276,107 @@ if len(list_of_rx_msgs) > 0:
  ]]] */
 // [[[end]]]
 
-/* Rx search tree starting index */
 /* [[[cog
+def gen_lookup_array(data_type, name, size, values):
+	cog.outl(data_type+" "+name+"["+size+"] = {\\")
+	for i in range(0, len(values), 16):
+		code_string = ", ".join([str(value)+"u" for value in values[i:i+16]])
+		if i + 16 < len(values):
+			code_string += ", \\"
+		else:
+			code_string += "};"
+		cog.outl("\t\t"+code_string)
+
+if len(list_of_rx_msgs) > 0 and node_view.rx_lookup != nw.RX_LOOKUP_SEARCH_TREE:
+	cog.outl("/"+chr(42)+" Rx message lookup "+chr(42)+"/")
+	cog.outl("/"+chr(42)+" Lookup form: "+node_view.rx_lookup+", worst case " \
+		+str(node_view.rx_lookup_probes)+" probe(s) for "+str(len(list_of_rx_msgs)) \
+		+" message(s). "+chr(42)+"/")
+else:
+	cog.outl("/"+chr(42)+" Rx search tree starting index "+chr(42)+"/")
+
 if len(list_of_rx_msgs) > 0:
-	search_tree_start_idx = math.floor(len(list_of_rx_msgs)/2)
-	# Create static array
-	sym_search_start_idx = "kCAN_" + net_name_str + node_name_str +"RxSearchStartIdx"
-	cog.outl("#define "+sym_search_start_idx+"\t\t("+str(search_tree_start_idx)+"u)")
+	rx_lookup = node_view.rx_lookup
+	sym_lookup_pfx = "kCAN_" + net_name_str + node_name_str + "RxLookup"
+	sym_lookup_table = "can_" + net_name_str + node_name_str + "rxLookupTable"
+	sym_lookup_disp = "can_" + net_name_str + node_name_str + "rxLookupDisp"
+	lookup_table_type = "const " + cg.get_dtv(len(list_of_rx_msgs).bit_length())
+	if rx_lookup == nw.RX_LOOKUP_SEARCH_TREE:
+		search_tree_start_idx = node_view.rx_search_start_idx
+		sym_search_start_idx = "kCAN_" + net_name_str + node_name_str +"RxSearchStartIdx"
+		cog.outl("#define "+sym_search_start_idx+"\t\t("+str(search_tree_start_idx)+"u)")
+	elif rx_lookup == nw.RX_LOOKUP_DIRECT:
+		cog.outl("#define "+sym_lookup_pfx+"MinId\t\t(" \
+			+cg.to_hex_string_with_suffix(node_view.rx_lookup_min_id)+")")
+		cog.outl("#define "+sym_lookup_pfx+"Len\t\t("+str(len(node_view.rx_lookup_table))+"u)")
+		gen_lookup_array(lookup_table_type, sym_lookup_table, sym_lookup_pfx+"Len", \
+			node_view.rx_lookup_table)
+	elif rx_lookup == nw.RX_LOOKUP_HASH:
+		hash_obj = node_view.rx_lookup_hash
+		cog.outl("#define "+sym_lookup_pfx+"SlotMult\t\t(" \
+			+cg.to_hex_string_with_suffix(hash_obj.slot_mult)+")")
+		cog.outl("#define "+sym_lookup_pfx+"SlotShift\t\t("+str(32 - hash_obj.slot_bits)+"u)")
+		cog.outl("#define "+sym_lookup_pfx+"Len\t\t("+str(len(hash_obj.slots))+"u)")
+		if hash_obj.bucket_bits > 0:
+			cog.outl("#define "+sym_lookup_pfx+"BucketMult\t\t(" \
+				+cg.to_hex_string_with_suffix(hash_obj.bucket_mult)+")")
+			cog.outl("#define "+sym_lookup_pfx+"BucketShift\t\t(" \
+				+str(32 - hash_obj.bucket_bits)+"u)")
+			cog.outl("#define "+sym_lookup_pfx+"Buckets\t\t(" \
+				+str(len(hash_obj.displacements))+"u)")
+			gen_lookup_array("const " + cg.get_dtv(hash_obj.slot_bits), sym_lookup_disp, \
+				sym_lookup_pfx+"Buckets", hash_obj.displacements)
+		else:
+			cog.outl("#define "+sym_lookup_pfx+"Disp\t\t("+str(hash_obj.displacements[0])+"u)")
+		gen_lookup_array(lookup_table_type, sym_lookup_table, sym_lookup_pfx+"Len", \
+			node_view.rx_lookup_table)
+ ]]] */
+// [[[end]]]
+
+/* Rx static data of each acceptance filter (NULL if it accepts several IDs) */
+/* [[[cog
+if len(node_view.rx_filters) > 0:
+	sym_rx_filters = "kCAN_" + net_name_str + node_name_str + "nOfRxFilters"
+	sym_filter_table = "can_" + net_name_str + node_name_str + "rxFilterMsgTable"
+	cog.outl("const CANrxMsgStaticData* const "+sym_filter_table+"["+sym_rx_filters+"] = {\\")
+	for i, msg_idx in enumerate(node_view.rx_filters_msg):
+		if msg_idx is not None:
+			code_string = "&" + sym_rx_stat_data_name + "[" + str(msg_idx) + "]"
+		else:
+			code_string = "NULL"
+		if i < len(node_view.rx_filters_msg) - 1:
+			code_string += ", \\"
+		else:
+			code_string += "};"
+		cog.outl("\t\t"+code_string)
+ ]]] */
+// [[[end]]]
+
+/* Rx timeouts timer wheel (only messages with a timeout are tracked) */
+/* [[[cog
+if node_view.rx_timeout_supervision == nw.RX_TIMEOUT_TIMER_WHEEL:
+	sym_wheel_pfx = "kCAN_" + net_name_str + node_name_str + "RxTimeout"
+	sym_rx_timeouts = "kCAN_" + net_name_str + node_name_str + "nOfRxTimeouts"
+	sym_wheel_name = "can_" + net_name_str + node_name_str + "rxTimeoutWheel"
+	sym_wheel_slots_name = "can_" + net_name_str + node_name_str + "rxTimeoutSlots"
+	sym_wheel_entries_name = "can_" + net_name_str + node_name_str + "rxTimeoutEntries"
+	sym_wheel_msg_idx = "can_" + net_name_str + node_name_str + "rxTimeoutMsgIdx"
+	sym_wheel_entry_idx = "can_" + net_name_str + node_name_str + "rxTimeoutEntryIdx"
+	cog.outl("#define "+sym_wheel_pfx+"Slots\t\t("+str(node_view.rx_timeout_wheel_slots)+"u)")
+	cog.outl("#define "+sym_rx_timeouts+"\t\t("+str(len(node_view.rx_timeout_wheel_msgs))+"u)")
+	cog.outl(cg.get_dtv(16)+" "+sym_wheel_slots_name+"["+sym_wheel_pfx+"Slots];")
+	cog.outl("CANtimerWheelEntry "+sym_wheel_entries_name+"["+sym_rx_timeouts+"];")
+	cog.outl("CANtimerWheel "+sym_wheel_name+" = {"+sym_wheel_slots_name+", \\")
+	cog.outl("\t\t"+sym_wheel_entries_name+", \\")
+	cog.outl("\t\t("+sym_wheel_pfx+"Slots - 1u), "+sym_rx_timeouts+", 0u};")
+	# Index in the Rx static data of each wheel entry
+	gen_lookup_array("const "+cg.get_dtv(16), sym_wheel_msg_idx, sym_rx_timeouts, \
+		node_view.rx_timeout_wheel_msgs)
+	# Wheel entry plus one of each Rx message, 0 if it has no timeout
+	wheel_entry_idx = [0] * len(list_of_rx_msgs)
+	for entry, msg_idx in enumerate(node_view.rx_timeout_wheel_msgs):
+		wheel_entry_idx[msg_idx] = entry + 1
+	gen_lookup_array("const "+cg.get_dtv(16), sym_wheel_entry_idx, sym_rx_msgs, wheel_entry_idx)
  ]]] */
 // [[[end]]]
 
@@ -320,6 +402,18 @@ if len(list_of_tx_msgs) > 0:
 ]]] */
 // [[[end]]]
 
+/* Tick counters of the cyclic Tx messages, one per period (of more than 1 tick) */
+/* [[[cog
+tx_period_groups = [group for group in node_view.tx_schedule if group[0] > 1]
+if len(tx_period_groups) > 0:
+	sym_tx_periods = "kCAN_" + net_name_str + node_name_str + "nOfTxPeriods"
+	sym_tx_period_timers = "can_" + net_name_str + node_name_str + "txPeriodTimers"
+	cog.outl("#define "+sym_tx_periods+"\t\t("+str(len(tx_period_groups))+"u)")
+	tx_period_timer_type = cg.get_dtv(max([group[0] for group in tx_period_groups]).bit_length())
+	cog.outl(tx_period_timer_type+" "+sym_tx_period_timers+"["+sym_tx_periods+"];")
+]]] */
+// [[[end]]]
+
 /* Tx transmission queue */
 /* [[[cog
 if len(list_of_tx_msgs) > 0:
@@ -335,7 +429,12 @@ if len(list_of_tx_msgs) > 0:
 if len(list_of_tx_msgs) > 0:
 	sym_txing_msg_name = "can_" + net_name_str +  node_name_str + "transmittingMsg"
 	sym_txing_msg_type = "const CANtxMsgStaticData*"
-	code_str = sym_txing_msg_type+ " "+sym_txing_msg_name+";"
+	if node_view.tx_mailboxes > 1:
+		# One message in transmission per HAL TX mailbox (NULL if mailbox is free)
+		sym_tx_mailboxes = "kCAN_" + net_name_str + node_name_str + "nOfTxMailboxes"
+		code_str = sym_txing_msg_type+ " "+sym_txing_msg_name+"["+sym_tx_mailboxes+"];"
+	else:
+		code_str = sym_txing_msg_type+ " "+sym_txing_msg_name+";"
 	cog.outl(code_str)
 ]]] */
 // [[[end]]]
@@ -353,7 +452,6 @@ if len(list_of_tx_msgs) > 0:
 	callback_tx_sufix = "_tx_callback"
 
 	array_data = []
-	data_idx = 0
 	for i, msg_name in enumerate(list_of_tx_msgs):
 		array_data.clear()
 		# Msg ID
@@ -363,8 +461,8 @@ if len(list_of_tx_msgs) > 0:
 		# Msg tx callback
 		array_data.append("&" + callback_prefix + msg_name + callback_tx_sufix)
 		# Data Buffer
-		array_data.append(" \\\n\t\t\t\t&" + sym_tx_data_name + "["+ str(data_idx) +"]")
-		data_idx += subnet.messages[msg_name].len
+		array_data.append(" \\\n\t\t\t\t&" + sym_tx_data_name + "[" \
+			+ str(node_view.tx_data_idx[msg_name]) + "]")
 		# Pointer to dynamic data
 		array_data.append("&" + sym_tx_dyn_data_name + "["+ str(i) +"]")
 		# Msg Len
@@ -405,6 +503,70 @@ if len(list_of_tx_msgs) > 0:
  * 	Function definitions
  * ===========================================================================*/
 
+/* ===========================================================================*/
+/** Function for handling a received CAN msg subscribed by this node.
+ *
+ * Copies the received data and signals the reception of the message if the
+ * received length matches the expected one, then invokes its callback.
+ *
+ * @param msg_static_data 	Static data of the received message.
+ * @param data_in 	Pointer to the message's received data.
+ * @param data_len 	Length of the received data.
+ * ===========================================================================*/
+/* [[[cog
+if len(list_of_rx_msgs) > 0:
+	sym_rx_recv_func_name = "can_" + net_name_str + node_name_str + "receiveRxMessage"
+	code_str = "static void "+sym_rx_recv_func_name \
+		+"(const CANrxMsgStaticData* msg_static_data, uint8_t * data_in, uint8_t data_len){"
+	cog.outl(code_str)
+
+	if node_view.rx_timeout_supervision == nw.RX_TIMEOUT_TIMER_WHEEL:
+		timeout_reset_str = """
+		// clear timeout flag and re-arm timeout in the timer wheel
+		msg_static_data->dyn->timedout = kFalse;
+		uint16_t wheel_entry = """+sym_wheel_entry_idx+"""[ \\
+			msg_static_data - """+sym_rx_stat_data_name+"""];
+		if(wheel_entry != 0u){
+			can_timerWheelArm(&"""+sym_wheel_name+""", wheel_entry - 1u, \\
+				msg_static_data->timeout);
+		}"""
+	else:
+		timeout_reset_str = """
+		// clear timeout flag and reset timeout timer
+		msg_static_data->dyn->timeout_timer = 0;
+		msg_static_data->dyn->timedout = kFalse;"""
+
+	function_body = """
+	// Consider message as valid if it matches the expected length
+	if(data_len == msg_static_data->fields.len){
+		if(data_len != 0){
+			// Copy data to buffer
+			memcpy(msg_static_data->data, data_in, msg_static_data->fields.len);
+			// Set Signals available flags
+			if(msg_static_data->sig_avlbl_buf_len == 1){
+				*msg_static_data->sig_avlbl_flags = kAllOnes8;
+			}else{
+				for(uint32_t i=0; i < msg_static_data->sig_avlbl_buf_len; i++){
+					msg_static_data->sig_avlbl_flags[i] = kAllOnes8;
+				}
+			}
+		}
+
+		// Set Message available flags
+		msg_static_data->dyn->available.all = kAllOnes32;
+"""+timeout_reset_str+"""
+		// Invoke rx callback
+		if(msg_static_data->rx_callback != NULL){
+			(msg_static_data->rx_callback)();
+		}
+	}
+}
+	"""
+	function_body = function_body[1:]
+	cog.outl(function_body)
+]]] */
+// [[[end]]]
+
 /* ===========================================================================*/
 /** Function for processing reception of a CAN msg.
  *
@@ -424,40 +586,86 @@ if len(list_of_rx_msgs) > 0:
 	code_str = sym_rx_proc_func_return+" "+sym_rx_proc_func_name+sym_rx_proc_func_args+"{"
 	cog.outl(code_str)
 
-	invoke_search = "msg_static_data = can_traverseRxSearchTree(msg_id, \\\n\t\t\t&"\
-		+sym_rx_stat_data_name+"["+sym_search_start_idx+"],  \\\n\t\t\t"+sym_rx_msgs+");"
+	if rx_lookup == nw.RX_LOOKUP_SEARCH_TREE:
+		invoke_search = "msg_static_data = can_traverseRxSearchTree(msg_id, \\\n\t\t\t&"\
+			+sym_rx_stat_data_name+"["+sym_search_start_idx+"],  \\\n\t\t\t"+sym_rx_msgs+");"
+	elif rx_lookup == nw.RX_LOOKUP_SWITCH:
+		invoke_search = "switch(msg_id){"
+		for i, msg_name in enumerate(sorted_rx_msgs):
+			invoke_search += "\n\t\tcase kCAN_" + net_name_str + "msgId_" + msg_name + ":" \
+				+ "\n\t\t\tmsg_static_data = &" + sym_rx_stat_data_name + "[" + str(i) + "];" \
+				+ "\n\t\t\tbreak;"
+		invoke_search += "\n\t\tdefault:\n\t\t\tmsg_static_data = NULL;\n\t\t\tbreak;\n\t}"
+	else:
+		if rx_lookup == nw.RX_LOOKUP_DIRECT:
+			# Unsigned difference, IDs below the minimum wrap around out of the table
+			invoke_search = "if((msg_id - "+sym_lookup_pfx+"MinId) < "+sym_lookup_pfx+"Len){" \
+				+ "\n\t\tlookup_idx = "+sym_lookup_table+"[msg_id - "+sym_lookup_pfx+"MinId];" \
+				+ "\n\t}else{\n\t\tlookup_idx = 0u;\n\t}"
+		else:
+			if node_view.rx_lookup_hash.bucket_bits > 0:
+				sym_disp = sym_lookup_disp + "[(uint32_t)(msg_id * "+sym_lookup_pfx \
+					+ "BucketMult) >> "+sym_lookup_pfx+"BucketShift]"
+			else:
+				sym_disp = sym_lookup_pfx + "Disp"
+			invoke_search = "lookup_idx = "+sym_lookup_table+"[ \\\n\t\t((uint32_t)(msg_id * " \
+				+ sym_lookup_pfx+"SlotMult) >> "+sym_lookup_pfx+"SlotShift) \\\n\t\t^ " \
+				+ sym_disp + "];" \
+				+ "\n\tif((lookup_idx != 0u) && (" + sym_rx_stat_data_name \
+				+ "[lookup_idx - 1u].id != msg_id)){" \
+				+ "\n\t\t// Slot of another message\n\t\tlookup_idx = 0u;\n\t}"
+		invoke_search = lookup_table_type[6:] + " lookup_idx;\n\t" + invoke_search \
+			+ "\n\tif(lookup_idx != 0u){" \
+			+ "\n\t\tmsg_static_data = &" + sym_rx_stat_data_name + "[lookup_idx - 1u];" \
+			+ "\n\t}else{\n\t\tmsg_static_data = NULL;\n\t}"
 
 	function_body = """
 	const CANrxMsgStaticData* msg_static_data;
 	// Search for message to see if its suscribed by this node.
 	"""+invoke_search+"""
 	if(msg_static_data != NULL){
-		// Consider message as valid if it matches the expected length
-		if(data_len == msg_static_data->fields.len){
-			if(data_len != 0){
-				// Copy data to buffer
-				memcpy(msg_static_data->data, data_in, msg_static_data->fields.len);
-				// Set Signals available flags
-				if(msg_static_data->sig_avlbl_buf_len == 1){
-					*msg_static_data->sig_avlbl_flags = kAllOnes8;
-				}else{
-					for(uint32_t i=0; i < msg_static_data->sig_avlbl_buf_len; i++){
-						msg_static_data->sig_avlbl_flags[i] = kAllOnes8;
-					}
-				}
-			}
+		"""+sym_rx_recv_func_name+"""(msg_static_data, data_in, data_len);
+	}
+}
+	"""
+	function_body = function_body[1:]
+	cog.outl(function_body)
+]]] */
+// [[[end]]]
 
-			// Set Message available flags
-			msg_static_data->dyn->available.all = kAllOnes32;
+/* ===========================================================================*/
+/** Function for processing reception of a CAN msg with the index of the
+ *  acceptance filter that accepted it.
+ *
+ * For CAN controllers reporting the index of the matching acceptance filter
+ * (filters configured as generated in the HAL header). If the filter accepts
+ * only one message its static data is taken directly, otherwise (or for an
+ * unexpected index or ID) the message is processed as in the RX processing
+ * function, searching for it.
+ *
+ * @param filter_idx 	Index of the acceptance filter that accepted the message.
+ * @param msg_id 	Id of the received message.
+ * @param data_in 	Pointer to the message's received data.
+ * @param data_len 	Length of the received data.
+ * ===========================================================================*/
+/* [[[cog
+if len(node_view.rx_filters) > 0:
+	sym_rx_filters = "kCAN_" + net_name_str + node_name_str + "nOfRxFilters"
+	sym_filter_table = "can_" + net_name_str + node_name_str + "rxFilterMsgTable"
+	sym_rx_filter_func_name = "can_" + net_name_str + node_name_str + "processRxFilterMatch"
+	code_str = "void "+sym_rx_filter_func_name \
+		+"(uint8_t filter_idx, uint32_t msg_id, uint8_t * data_in, uint8_t data_len){"
+	cog.outl(code_str)
 
-			// clear timeout flag and reset timeout timer
-			msg_static_data->dyn->timeout_timer = 0;
-			msg_static_data->dyn->timedout = kFalse;
-			// Invoke rx callback
-			if(msg_static_data->rx_callback != NULL){
-				(msg_static_data->rx_callback)();
-			}
-		}
+	function_body = """
+	const CANrxMsgStaticData* msg_static_data = NULL;
+	if(filter_idx < """+sym_rx_filters+"""){
+		msg_static_data = """+sym_filter_table+"""[filter_idx];
+	}
+	if((msg_static_data != NULL) && (msg_static_data->id == msg_id)){
+		"""+sym_rx_recv_func_name+"""(msg_static_data, data_in, data_len);
+	}else{
+		"""+sym_rx_proc_func_name+"""(msg_id, data_in, data_len);
 	}
 }
 	"""
@@ -482,7 +690,30 @@ if len(list_of_rx_msgs) > 0:
 	code_str = "void "+sym_rx_proc_func_name+"(void){"
 	cog.outl(code_str)
 
-	code_strs = """
+	if node_view.rx_timeout_supervision == nw.RX_TIMEOUT_TIMER_WHEEL:
+		function_body = """
+	const CANrxMsgStaticData* msg_static_data;
+	uint16_t wheel_entry;
+
+	// Advance timer wheel and process only the messages timing out in this tick
+	can_timerWheelAdvance(&"""+sym_wheel_name+""");
+	wheel_entry = can_timerWheelPopExpired(&"""+sym_wheel_name+""");
+	while(wheel_entry != 0u){
+		msg_static_data = &"""+sym_rx_stat_data_name+"""[ \\
+			"""+sym_wheel_msg_idx+"""[wheel_entry - 1u]];
+		// Set timeout flag
+		CALVOS_CRITICAL_ENTER();
+		msg_static_data->dyn->timedout = kTrue;
+		CALVOS_CRITICAL_EXIT();
+		// Call timeout callback if not NULL
+		if(msg_static_data->timeout_callback != NULL){
+			(msg_static_data->timeout_callback)();
+		}
+		wheel_entry = can_timerWheelPopExpired(&"""+sym_wheel_name+""");
+	}
+"""
+	else:
+		code_strs = """
 	for(uint32_t i = 0u; i < """+sym_rx_msgs+"""; i++){
 		// Check if message has a timeout defined
 		if("""+sym_rx_stat_data_name+"""[i].timeout > 0u){
@@ -511,11 +742,10 @@ if len(list_of_rx_msgs) > 0:
 		}
 	}\n"""
 
-	function_body = """
+		function_body = """
 
-	// TODO: Implement this as a timer wheel for efficiency
-	// TODO: Consider separating data structures for timeout so that memory for that
-	// is only used for messages with defined timeout and not for all.
+	// Scan of all RX messages (see param 'CAN_rx_timeout_supervision' for a timer
+	// wheel processing only the messages timing out)
 """+code_strs+"\n"
 
 	function_body = function_body[1:]
@@ -546,15 +776,26 @@ if len(list_of_tx_msgs) > 0:
 	code_str = "CalvosError "+sym_transmit_func_name+sym_transmit_func_args+"{"
 	cog.outl(code_str)
 
+	if node_view.tx_mailboxes > 1:
+		transmit_str = """
+		// Transmit in a free HAL TX mailbox
+		return_value = can_commonTransmitMsgMailbox(&"""+sym_tx_stat_data_name+"""[msg_idx], \\
+								  &"""+sym_tx_queue_name+""", \\
+								  &"""+sym_hal_transmit_name+""", \\
+								  """+sym_txing_msg_name+""", \\
+								  """+sym_tx_mailboxes+""");"""
+	else:
+		transmit_str = """
+		return_value = can_commonTransmitMsg(&"""+sym_tx_stat_data_name+"""[msg_idx], \\
+								  &"""+sym_tx_queue_name+""", \\
+								  &"""+sym_hal_transmit_name+""", \\
+								  &"""+sym_txing_msg_name+""");"""
+
 	function_body = """
 	CalvosError return_value = kError;
 
 	// Trigger CAN transmission to HAL
-	if(msg_idx < """+sym_max_tx_msgs+"""){
-		return_value = can_commonTransmitMsg(&"""+sym_tx_stat_data_name+"""[msg_idx], \\
-								  &"""+sym_tx_queue_name+""", \\
-								  &"""+sym_hal_transmit_name+""", \\
-								  &"""+sym_txing_msg_name+""");
+	if(msg_idx < """+sym_max_tx_msgs+"""){"""+transmit_str+"""
 	}
 
 	return return_value;
@@ -581,33 +822,46 @@ if len(list_of_tx_msgs) > 0:
 	code_str = "void "+sym_tx_proc_func_name+"(void){"
 	cog.outl(code_str)
 
-	code_strs = ""
-	for message_name in list_of_tx_msgs:
-		if subnet.messages[message_name].tx_period != 0 \
-		and  (subnet.messages[message_name].tx_type == nw.tx_type_list[nw.CYCLIC] \
-		or subnet.messages[message_name].tx_type == nw.tx_type_list[nw.CYCLIC_SPONTAN]):
-			sym_tx_msg_idx_name = sym_tx_msg_idx_prefix + message_name
-			# Reduce timer
-			code_strs += """	// Increment timer (up-counter since they are initialized with zero)
-	"""+sym_tx_stat_data_name+"["+sym_tx_msg_idx_name+"""].dyn->period_timer++;
-	if("""+sym_tx_stat_data_name+"["+sym_tx_msg_idx_name+"""].dyn->period_timer \\
-	>= """+sym_tx_stat_data_name+"["+sym_tx_msg_idx_name+"""].period){
-		// Timer expired, trigger message transmission
-		"""+sym_transmit_func_name+"("+sym_tx_msg_idx_name+""");
-		// Reset timer
-		"""+sym_tx_stat_data_name+"["+sym_tx_msg_idx_name+"""].dyn->period_timer = 0u;
-	}\n"""
-
-
-	function_body = """
-
-	// TODO: Implement this as a timer wheel for efficiency
-	// TODO: Group tx messages with same period in single timers rather than
-	// individual ones for efficiency.
+	def gen_tx_transmits(messages_names, indent):
+		code_str = ""
+		for message_name in messages_names:
+			code_str += indent+sym_transmit_func_name+"("+sym_tx_msg_idx_prefix+message_name+");\n"
+		return code_str
 
-"""+code_strs+"\n"
+	code_strs = ""
+	group_idx = 0
+	for period, period_phases in node_view.tx_schedule:
+		if period == 1:
+			code_strs += """
+	// Messages transmitted in every tick
+"""+gen_tx_transmits(period_phases[0][1], "\t")
+			continue
+		sym_timer = sym_tx_period_timers + "[" + str(group_idx) + "]"
+		group_idx += 1
+		code_strs += """
+	// Messages with a period of """+str(period)+""" ticks (single up-counter for all of them,
+	// each message is transmitted when the counter reaches its phase offset)
+	"""+sym_timer+"""++;
+	if("""+sym_timer+""" >= """+str(period)+"""u){
+		"""+sym_timer+""" = 0u;
+	}
+"""
+		if len(period_phases) == 1:
+			code_strs += """	if("""+sym_timer+""" == """+str(period_phases[0][0])+"""u){
+"""+gen_tx_transmits(period_phases[0][1], "\t\t")+"""	}
+"""
+		else:
+			code_strs += """	switch("""+sym_timer+"""){
+"""
+			for phase, messages_names in period_phases:
+				code_strs += "\tcase "+str(phase)+"u:\n" \
+					+ gen_tx_transmits(messages_names, "\t\t") + "\t\tbreak;\n"
+			code_strs += """	default:
+		break;
+	}
+"""
 
-	function_body = function_body[1:]
+	function_body = code_strs
 	cog.outl(function_body+"}")
 ]]] */
 // [[[end]]]
@@ -646,6 +900,29 @@ if len(list_of_tx_msgs) > 0:
 			can_txQueueDequeue(&"""+sym_tx_queue_name+""", NULL);
 		}
 	}
+"""
+	if node_view.tx_mailboxes > 1:
+		function_body = """
+	const CANtxMsgStaticData* msg_to_retry;
+	CalvosError return_value;
+
+	// Retry queued messages while there are free HAL TX mailboxes
+	msg_to_retry = can_txQueueGetHead(&"""+sym_tx_queue_name+""");
+	while(msg_to_retry != NULL){
+		// Attempt the re-transmission
+		return_value = can_commonTransmitMsgMailbox(msg_to_retry, \\
+								  NULL, \\
+								  &"""+sym_hal_transmit_name+""", \\
+								  """+sym_txing_msg_name+""", \\
+								  """+sym_tx_mailboxes+""");
+		if(return_value != kNoError){
+			// No free mailbox or HAL busy, retry later
+			break;
+		}
+		// Transmission succeeded. Dequeue the message.
+		can_txQueueDequeue(&"""+sym_tx_queue_name+""", NULL);
+		msg_to_retry = can_txQueueGetHead(&"""+sym_tx_queue_name+""");
+	}
 """
 	function_body = function_body[1:]
 	cog.outl(function_body+"}")
@@ -705,6 +982,34 @@ if len(list_of_tx_msgs) > 0:
 		"""+sym_rx_dyn_data_name+"""[i].timedout = kTrue;
 	}\n"""
 
+	if node_view.rx_timeout_supervision == nw.RX_TIMEOUT_TIMER_WHEEL:
+		timeout_inits_str += """
+	// Init RX timeouts timer wheel
+	can_timerWheelInit(&"""+sym_wheel_name+""");\n"""
+		if timeouts_initially_true is not True:
+			timeout_inits_str += """
+	// Arm RX timeouts (param 'CAN_init_timeouts_val' is set to False)
+	for(uint32_t i = 0; i < """+sym_rx_timeouts+"""; i++){
+		can_timerWheelArm(&"""+sym_wheel_name+""", i, \\
+			"""+sym_rx_stat_data_name+"["+sym_wheel_msg_idx+"""[i]].timeout);
+	}\n"""
+
+	if node_view.tx_mailboxes > 1:
+		txing_msg_init_str = """// Init transmitting messages (all TX mailboxes free)
+	for(uint32_t i = 0; i < """+sym_tx_mailboxes+"""; i++){
+		"""+sym_txing_msg_name+"""[i] = NULL;
+	}"""
+	else:
+		txing_msg_init_str = """// Init transmitting message
+	"""+sym_txing_msg_name+""" = NULL;"""
+
+	tx_period_inits_str = ""
+	if len(tx_period_groups) > 0:
+		tx_period_inits_str = """
+	// Clear tick counters of cyclic TX messages
+	memset(&"""+sym_tx_period_timers+",0u,sizeof("+sym_tx_period_timers+"""));
+"""
+
 	function_body = """
 
 	// Clear RX data buffer
@@ -721,15 +1026,14 @@ if len(list_of_tx_msgs) > 0:
 	"""+timeout_inits_str+"""
 	// Clear TX dynamic data
 	memset(&"""+sym_tx_dyn_data_name+",0u,sizeof("+sym_tx_dyn_data_type+")*("+sym_tx_dyn_data_len+"""));
-
+"""+tx_period_inits_str+"""
 	// Init signal values
 	"""+sym_init_sigs_name+"""();
 
 	// Init TX queue
 	can_txQueueInit(&"""+sym_tx_queue_name+""");
 
-	// Init transmitting message
-	"""+sym_txing_msg_name+""" = NULL;
+	"""+txing_msg_init_str+"""
 
 	// Init CAN HAL
 	"""+sym_hal_init_name+"""();
@@ -13,17 +13,23 @@ import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
 
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
-
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_proj_pickle_file, e))
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+
+if 'cog_proj_obj' in locals():
+	project = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_proj_pickle_file, e))
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -96,19 +102,12 @@ if NODEID_wildcard != "None":
 else:
 	node_name_str = ""
 
-# Get subnetwork for this node
-subnet = network.get_subnetwork([node_name])
+# Get view of this node (tables shared by all node templates, see Network_CAN.NodeView)
+node_view = network.get_node_view(node_name)
+subnet = node_view.network
 
-list_of_tx_msgs = []
-list_of_rx_msgs = []
-for message in subnet.messages.values():
-	if subnet.get_message_direction(node_name,message.name) == nw.CAN_TX:
-		list_of_tx_msgs.append(message.name)
-	elif subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-		list_of_rx_msgs.append(message.name)
-	else:
-		log_warn(("Message '%s' direction not determined for node '%s' " \
-			+ "in network '%s'.") % (message.name, node_name, network_name))
+list_of_tx_msgs = node_view.tx_messages
+list_of_rx_msgs = node_view.rx_messages
 
  ]]] */
 // [[[end]]]
@@ -168,7 +167,13 @@ if len(list_of_tx_msgs) > 0:
 	# -----------------------
 	sym_txing_msg_name = "can_" + net_name_str +  node_name_str + "transmittingMsg"
 	sym_txing_msg_type = "const CANtxMsgStaticData*"
-	code_str = "extern "+sym_txing_msg_type+" "+sym_txing_msg_name+";"
+	if node_view.tx_mailboxes > 1:
+		# One message in transmission per HAL TX mailbox
+		sym_tx_mailboxes = "kCAN_" + net_name_str + node_name_str + "nOfTxMailboxes"
+		cog.outl("#define "+sym_tx_mailboxes+"\t\t("+str(node_view.tx_mailboxes)+"u)")
+		code_str = "extern "+sym_txing_msg_type+" "+sym_txing_msg_name+"["+sym_tx_mailboxes+"];"
+	else:
+		code_str = "extern "+sym_txing_msg_type+" "+sym_txing_msg_name+";"
 	cog.outl(code_str)
 
 cog.outl("")
@@ -182,6 +187,15 @@ if len(list_of_rx_msgs) > 0:
 	code_str = "extern "+sym_rx_proc_func_return+" "+sym_rx_proc_func_name+sym_rx_proc_func_args+";"
 	cog.outl(code_str)
 
+	# RX Processing Function with acceptance filter index
+	# ---------------------------------------------------
+	if len(node_view.rx_filters) > 0:
+		sym_rx_filter_func_name = "can_" + net_name_str + node_name_str + "processRxFilterMatch"
+		sym_rx_filter_func_args = "(uint8_t filter_idx, uint32_t msg_id, uint8_t * data_in, " \
+			+ "uint8_t data_len)"
+		code_str = "extern void "+sym_rx_filter_func_name+sym_rx_filter_func_args+";"
+		cog.outl(code_str)
+
 	# RX Cyclic Processing Function
 	# -----------------------------
 	rx_proc_task = network.get_simple_param("CAN_rx_task_period")
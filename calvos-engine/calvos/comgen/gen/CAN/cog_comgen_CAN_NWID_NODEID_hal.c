@@ -13,17 +13,23 @@ import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
 
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
-
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project_obj = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+
+if 'cog_proj_obj' in locals():
+	project_obj = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project_obj = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -86,19 +92,12 @@ if NODEID_wildcard != "None":
 else:
 	node_name_str = ""
 
-# Get subnetwork for this node
-subnet = network.get_subnetwork([node_name])
-
-list_of_tx_msgs = []
-list_of_rx_msgs = []
-for message in subnet.messages.values():
-	if subnet.get_message_direction(node_name,message.name) == nw.CAN_TX:
-		list_of_tx_msgs.append(message.name)
-	elif subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-		list_of_rx_msgs.append(message.name)
-	else:
-		log_warn(("Message '%s' direction not determined for node '%s' " \
-			+ "in network '%s'.") % (message.name, node_name, network_name))
+# Get view of this node (tables shared by all node templates, see Network_CAN.NodeView)
+node_view = network.get_node_view(node_name)
+subnet = node_view.network
+
+list_of_tx_msgs = node_view.tx_messages
+list_of_rx_msgs = node_view.rx_messages
  ]]] */
 // [[[end]]]
 
@@ -124,7 +123,10 @@ cog.outl("#if "+sym_tx_id_needed_name+"==kTrue")
 
 sym_get_tx_id_return = "uint32_t"
 sym_get_tx_id_name = "can_"+net_name_str+node_name_str+"HALgetTxdMsgId"
-sym_get_tx_id_args = "(void)"
+if node_view.tx_mailboxes > 1:
+	sym_get_tx_id_args = "(uint8_t mailbox)"
+else:
+	sym_get_tx_id_args = "(void)"
 
 code_str = sym_get_tx_id_return+" "+sym_get_tx_id_name+sym_get_tx_id_args+";"
 cog.outl(code_str)
@@ -144,13 +146,18 @@ cog.outl("#endif")
  * given CAN message in the target MCU.
  *
  * @param msg_info 	Pointer to the structure containing the message information.
+ * @param mailbox 	Index of the HAL TX mailbox to use (only generated if parameter
+ * 					"CAN_tx_mailboxes" is bigger than 1).
  * @return 	Returns @c kNoError if transmission was accepted by the HAL, returns
  * 			@c kError if it was not accepted.
  * ===========================================================================*/
 /* [[[cog
 sym_hal_transmit_return = "CalvosError"
 sym_hal_transmit_name = "can_"+net_name_str+node_name_str+"HALtransmitMsg"
-sym_hal_transmit_args = "(const CANtxMsgStaticData* msg_info)"
+if node_view.tx_mailboxes > 1:
+	sym_hal_transmit_args = "(const CANtxMsgStaticData* msg_info, uint8_t mailbox)"
+else:
+	sym_hal_transmit_args = "(const CANtxMsgStaticData* msg_info)"
 
 code_str = sym_hal_transmit_return+" "+sym_hal_transmit_name+sym_hal_transmit_args+"{\n"
 cog.outl(code_str)
@@ -158,7 +165,11 @@ sym_can_transmit_body="""
 	CalvosError return_value = kError;
 	// Write HAL code to transmit a CAN message. Information about the message
 	// can be extracted from the provided msg_info structure.
-	#warning "User code needed here. Remove this line when done."
+"""
+if node_view.tx_mailboxes > 1:
+	sym_can_transmit_body += """	// The message shall be written in the given HAL TX mailbox.
+"""
+sym_can_transmit_body += """	#warning "User code needed here. Remove this line when done."
 
 	return return_value;
 """
@@ -172,7 +183,9 @@ cog.outl(sym_can_transmit_body)
  *
  * This function returns the id of the CAN message just transmitted by the
  * target CAN HAL. This function is invoked by the TX confirmation function
- * "can_NWID_NODEID_HALconfirmTxMsg".
+ * "can_NWID_NODEID_HALconfirmTxMsg". If parameter "CAN_tx_mailboxes" is
+ * bigger than 1 it returns the ID of the message transmitted from the given
+ * HAL TX mailbox.
  * ===========================================================================*/
 /* [[[cog
 # This function has a conditional compilation directive
@@ -185,7 +198,11 @@ sym_get_tx_id_body="""
 	uint32_t txd_msg_id;
 	// Write user code to return the ID of the CAN message just transmitted
 	// by the CAN HAL.
-	#warning "User code needed here. Remove this line when done."
+"""
+if node_view.tx_mailboxes > 1:
+	sym_get_tx_id_body += """	// The message shall be the one transmitted from the given HAL TX mailbox.
+"""
+sym_get_tx_id_body += """	#warning "User code needed here. Remove this line when done."
 
 	return txd_msg_id;
 """
@@ -201,19 +218,40 @@ cog.outl("#endif")
 /** Function for confirming transmission of CAN message for given node.
  *
  * This function shall be called when the target MCU confirms the transmission
- * of the lastly requested tx message.
+ * of the lastly requested tx message. If parameter "CAN_tx_mailboxes" is bigger
+ * than 1 it shall be called with the index of the HAL TX mailbox whose
+ * transmission is confirmed.
  * ===========================================================================*/
 /* [[[cog
 sym_txing_msg_name = "can_" + net_name_str +  node_name_str + "transmittingMsg"
 
 sym_hal_confirm_tx_return = "void"
 sym_hal_confirm_tx_name = "can_"+net_name_str+node_name_str+"HALconfirmTxMsg"
-sym_hal_confirm_tx_args = "(void)"
+if node_view.tx_mailboxes > 1:
+	sym_hal_confirm_tx_args = "(uint8_t mailbox)"
+else:
+	sym_hal_confirm_tx_args = "(void)"
 
 code_str = sym_hal_confirm_tx_return+" "+sym_hal_confirm_tx_name+sym_hal_confirm_tx_args+"{\n"
 cog.outl(code_str)
 
-sym_hal_confirm_tx_body="""
+if node_view.tx_mailboxes > 1:
+	sym_tx_mailboxes = "kCAN_" + net_name_str + node_name_str + "nOfTxMailboxes"
+	sym_hal_confirm_tx_body="""
+#if """+sym_tx_id_needed_name+"""==kTrue
+	uint32_t txd_msg_id;
+	// Get ID of the message just transmitted from the given mailbox
+	txd_msg_id = """+sym_get_tx_id_name+"""(mailbox);
+	// Confirm TX message if ID matches and release the mailbox
+	can_commonConfirmTxMailbox("""+sym_txing_msg_name+""", """+sym_tx_mailboxes+""", \\
+							   mailbox, kTrue, txd_msg_id);
+#else
+	can_commonConfirmTxMailbox("""+sym_txing_msg_name+""", """+sym_tx_mailboxes+""", \\
+							   mailbox, kFalse, 0u);
+#endif
+"""
+else:
+	sym_hal_confirm_tx_body="""
 #if """+sym_tx_id_needed_name+"""==kTrue
 	uint32_t txd_msg_id;
 	// Get ID of the message just transmitted
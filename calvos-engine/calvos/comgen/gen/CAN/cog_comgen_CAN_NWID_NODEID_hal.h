@@ -13,17 +13,23 @@ import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
 
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
-
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project_obj = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+
+if 'cog_proj_obj' in locals():
+	project_obj = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project_obj = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -95,19 +101,12 @@ if NODEID_wildcard != "None":
 else:
 	node_name_str = ""
 
-# Get subnetwork for this node
-subnet = network.get_subnetwork([node_name])
-
-list_of_tx_msgs = []
-list_of_rx_msgs = []
-for message in subnet.messages.values():
-	if subnet.get_message_direction(node_name,message.name) == nw.CAN_TX:
-		list_of_tx_msgs.append(message.name)
-	elif subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-		list_of_rx_msgs.append(message.name)
-	else:
-		log_warn(("Message '%s' direction not determined for node '%s' " \
-			+ "in network '%s'.") % (message.name, node_name, network_name))
+# Get view of this node (tables shared by all node templates, see Network_CAN.NodeView)
+node_view = network.get_node_view(node_name)
+subnet = node_view.network
+
+list_of_tx_msgs = node_view.tx_messages
+list_of_rx_msgs = node_view.rx_messages
  ]]] */
 // [[[end]]]
 
@@ -117,7 +116,11 @@ for message in subnet.messages.values():
 # ---------------------
 sym_hal_transmit_return = "CalvosError"
 sym_hal_transmit_name = "can_"+net_name_str+node_name_str+"HALtransmitMsg"
-sym_hal_transmit_args = "(const CANtxMsgStaticData* msg_info)"
+if node_view.tx_mailboxes > 1:
+	# HAL transmits and confirms messages by TX mailbox index
+	sym_hal_transmit_args = "(const CANtxMsgStaticData* msg_info, uint8_t mailbox)"
+else:
+	sym_hal_transmit_args = "(const CANtxMsgStaticData* msg_info)"
 
 code_str = "extern "+sym_hal_transmit_return+" "+sym_hal_transmit_name+sym_hal_transmit_args+";"
 cog.outl(code_str)
@@ -126,7 +129,10 @@ cog.outl(code_str)
 # -----------------------------
 sym_hal_confirm_tx_return = "void"
 sym_hal_confirm_tx_name = "can_"+net_name_str+node_name_str+"HALconfirmTxMsg"
-sym_hal_confirm_tx_args = "(void)"
+if node_view.tx_mailboxes > 1:
+	sym_hal_confirm_tx_args = "(uint8_t mailbox)"
+else:
+	sym_hal_confirm_tx_args = "(void)"
 
 code_str = "extern "+sym_hal_confirm_tx_return+" "+sym_hal_confirm_tx_name+sym_hal_confirm_tx_args+";"
 cog.outl(code_str)
@@ -151,6 +157,35 @@ cog.outl(code_str)
 ]]] */
 // [[[end]]]
 
+/* CAN acceptance filters */
+/* [[[cog
+# Filter i accepts a message ID if (ID & Mask_i) == (Id_i & Mask_i). Filters are given in the
+# order of the filter index (see can_NWID_NODEID_processRxFilterMatch).
+if len(node_view.rx_filters) > 0:
+	sym_filter_pfx = "kCAN_" + net_name_str + node_name_str + "rxFilter"
+	sym_rx_filters = "kCAN_" + net_name_str + node_name_str + "nOfRxFilters"
+	sym_filter_table = "can_" + net_name_str + node_name_str + "rxFilterMsgTable"
+	for is_extended, frame_type in ((False, "standard"), (True, "extended")):
+		filters_count = sum(1 for rx_filter in node_view.rx_filters if rx_filter[2] is is_extended)
+		if filters_count > 0:
+			cog.outl("/"+chr(42)+" "+str(filters_count)+" filter(s) for "+frame_type+" IDs, " \
+				+str(node_view.rx_filters_false_ids[is_extended]) \
+				+" ID(s) accepted which are not received by the node. "+chr(42)+"/")
+	cog.outl("#define "+sym_rx_filters+"\t\t("+str(len(node_view.rx_filters))+"u)")
+	for i, (filter_id, mask, is_extended, msgs_indexes) in enumerate(node_view.rx_filters):
+		cog.outl("#define "+sym_filter_pfx+"Id_"+str(i)+"\t\t(" \
+			+cg.to_hex_string_with_suffix(filter_id)+")")
+		cog.outl("#define "+sym_filter_pfx+"Mask_"+str(i)+"\t\t(" \
+			+cg.to_hex_string_with_suffix(mask)+")")
+		cog.outl("#define "+sym_filter_pfx+"Extended_"+str(i)+"\t\t(" \
+			+("kTrue" if is_extended is True else "kFalse")+")")
+	cog.outl("")
+	cog.outl("/"+chr(42)+" Static data of the message accepted by each filter (NULL if several). " \
+		+chr(42)+"/")
+	cog.outl("extern const CANrxMsgStaticData* const "+sym_filter_table+"["+sym_rx_filters+"];")
+]]] */
+// [[[end]]]
+
 /* [[[cog
 # Print include guards
 cog.outl("#endif /"+chr(42)+" "+ guard_symbol + " "+chr(42) + "/")
@@ -12,11 +12,14 @@ import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
 
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -74,8 +77,12 @@ if NODEID_wildcard != "None":
 else:
 	node_name_str = ""
 
-# Get subnetwork for this node
-subnet = network.get_subnetwork([node_name])
+# Get view of this node (tables shared by all node templates, see Network_CAN.NodeView)
+node_view = network.get_node_view(node_name)
+subnet = node_view.network
+
+list_of_tx_msgs = node_view.tx_messages
+list_of_rx_msgs = node_view.rx_messages
  ]]] */
 // [[[end]]]
 
@@ -88,9 +95,6 @@ subnet = network.get_subnetwork([node_name])
 /* Message(s) direction */
 /* [[[cog
 
-list_of_tx_msgs = []
-list_of_rx_msgs = []
-
 # Calculate padding spaces
 macro_prefix = "kCAN_" + net_name_str + node_name_str + "msg_dir_"
 macro_names = []
@@ -98,10 +102,8 @@ macro_values = []
 for message in subnet.messages.values():
 	macro_name = macro_prefix + message.name
 	if subnet.get_message_direction(node_name,message.name) == nw.CAN_TX:
-		list_of_tx_msgs.append(message.name)
 		macro_value = "(kDirTX)"
 	elif subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-		list_of_rx_msgs.append(message.name)
 		macro_value = "(kDirRX)"
 	else:
 		macro_value = None
@@ -200,29 +202,29 @@ if len(list_of_rx_msgs) > 0:
 	macro_prefix = "kCAN_" + net_name_str + node_name_str + "msgTimeout_"
 	macro_names = []
 	macro_values = []
-	for message in subnet.messages.values():
+	for message_name in list_of_rx_msgs:
+		message = subnet.messages[message_name]
 		macro_name = macro_prefix + message.name
-		if subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-			message_timeout = subnet.get_message_timeout(node_name,message.name)
-			if message_timeout is not None:
-				message_timeout = int(message_timeout)
-				timeout_in_ticks = round(int(message_timeout)/rx_proc_task)
-				macro_value = "(" + str(timeout_in_ticks) + "u)"
-
-				# Check if RX timeout tolerance is met
-				upper_tol_perc = (100 + rx_timeout_tolerance) / 100
-				lower_tol_perc = (100 - rx_timeout_tolerance) / 100
-
-				if ((timeout_in_ticks * rx_proc_task) > (upper_tol_perc * message_timeout)) or \
-				((timeout_in_ticks * rx_proc_task) < (lower_tol_perc * message_timeout)):
-					log_warn(("Generated timeout of '%sms' for message '%s' doesn't met tolerance of +/-'%s' percent. " \
-							 + "Consider changing period of Rx task in config parameter 'CAN_rx_task_period' " \
-							 + "or the tolerance for RX timeouts in parameter 'CAN_rx_timeout_tolerance'.") \
-							 % ((timeout_in_ticks * rx_proc_task), message.name, str(rx_timeout_tolerance)))
-			else:
-				macro_value = "(0u)"
-			macro_names.append(macro_name)
-			macro_values.append(macro_value)
+		message_timeout = subnet.get_message_timeout(node_name,message.name)
+		if message_timeout is not None:
+			message_timeout = int(message_timeout)
+			timeout_in_ticks = node_view.rx_timeout_ticks[message.name]
+			macro_value = "(" + str(timeout_in_ticks) + "u)"
+
+			# Check if RX timeout tolerance is met
+			upper_tol_perc = (100 + rx_timeout_tolerance) / 100
+			lower_tol_perc = (100 - rx_timeout_tolerance) / 100
+
+			if ((timeout_in_ticks * rx_proc_task) > (upper_tol_perc * message_timeout)) or \
+			((timeout_in_ticks * rx_proc_task) < (lower_tol_perc * message_timeout)):
+				log_warn(("Generated timeout of '%sms' for message '%s' doesn't met tolerance of +/-'%s' percent. " \
+						 + "Consider changing period of Rx task in config parameter 'CAN_rx_task_period' " \
+						 + "or the tolerance for RX timeouts in parameter 'CAN_rx_timeout_tolerance'.") \
+						 % ((timeout_in_ticks * rx_proc_task), message.name, str(rx_timeout_tolerance)))
+		else:
+			macro_value = "(0u)"
+		macro_names.append(macro_name)
+		macro_values.append(macro_value)
 
 	max_len = cg.get_str_max_len(macro_names)
 	max_len += TAB_SPACE
@@ -242,18 +244,13 @@ if len(list_of_rx_msgs) > 0:
 	sym_sig_idx_pfx = "kCAN_" + net_name_str + node_name_str + "sig_avlbl_idx_"
 	macro_names = []
 	macro_values = []
-	avlbl_flags_idx = {}
-	for message in subnet.messages.values():
-		if subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-			message_signals = subnet.get_signals_of_message(message.name)
-			index = 0
-			for signal in message_signals:
-				avlbl_flags_idx.update({signal.name : index})
-				macro_name = sym_sig_idx_pfx + signal.name
-				macro_value = "(" + str(index) + "u)"
-				index += 1
-				macro_names.append(macro_name)
-				macro_values.append(macro_value)
+	avlbl_flags_idx = node_view.rx_avlbl_flags_idx
+	for message_name in list_of_rx_msgs:
+		for signal in node_view.messages_signals[message_name]:
+			macro_name = sym_sig_idx_pfx + signal.name
+			macro_value = "(" + str(avlbl_flags_idx[signal.name]) + "u)"
+			macro_names.append(macro_name)
+			macro_values.append(macro_value)
 
 	max_len = cg.get_str_max_len(macro_names)
 	max_len += TAB_SPACE
@@ -272,21 +269,13 @@ if len(list_of_rx_msgs) > 0:
 	sym_avlbl_buff_idx_pfx = "kCAN_" + net_name_str + node_name_str + "avlbl_buffer_idx_"
 	macro_names = []
 	macro_values = []
-	avlbl_msg_buff_idx = {}
-	avlbl_buff_byte = 0
-	for message in subnet.messages.values():
-		if subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-			avlbl_msg_buff_idx.update({message.name : avlbl_buff_byte})
-
-			macro_name = sym_avlbl_buff_idx_pfx + message.name
-			macro_value = "(" + str(avlbl_buff_byte) + "u)"
-
-			message_signals = subnet.get_signals_of_message(message.name)
-			avlbl_buff_byte += \
-				int(cg.calculate_base_type_len(len(message_signals))/8)
+	avlbl_msg_buff_idx = node_view.rx_avlbl_buffer_idx
+	for message_name in list_of_rx_msgs:
+		macro_name = sym_avlbl_buff_idx_pfx + message_name
+		macro_value = "(" + str(avlbl_msg_buff_idx[message_name]) + "u)"
 
-			macro_names.append(macro_name)
-			macro_values.append(macro_value)
+		macro_names.append(macro_name)
+		macro_values.append(macro_value)
 
 	max_len = cg.get_str_max_len(macro_names)
 	max_len += TAB_SPACE
@@ -305,17 +294,12 @@ if len(list_of_rx_msgs) > 0:
 	sym_avlbl_size_idx_pfx = "kCAN_" + net_name_str + node_name_str + "avlbl_slot_len_"
 	macro_names = []
 	macro_values = []
-	for message in subnet.messages.values():
-		if subnet.get_message_direction(node_name,message.name) == nw.CAN_RX:
-			macro_name = sym_avlbl_size_idx_pfx + message.name
-
-			message_signals = subnet.get_signals_of_message(message.name)
-			avlbl_buff_len = \
-				int(cg.calculate_base_type_len(len(message_signals))/8)
-			macro_value = "(" + str(avlbl_buff_len) + "u)"
+	for message_name in list_of_rx_msgs:
+		macro_name = sym_avlbl_size_idx_pfx + message_name
+		macro_value = "(" + str(node_view.rx_avlbl_slot_len[message_name]) + "u)"
 
-			macro_names.append(macro_name)
-			macro_values.append(macro_value)
+		macro_names.append(macro_name)
+		macro_values.append(macro_value)
 
 	max_len = cg.get_str_max_len(macro_names)
 	max_len += TAB_SPACE
@@ -331,7 +315,7 @@ if len(list_of_rx_msgs) > 0:
 /* [[[cog
 if len(list_of_rx_msgs) > 0:
 	sym_avlbl_buff_len = "kCAN_" + net_name_str + node_name_str + "avlbl_buffer_len"
-	sym_avlbl_buff_len_val = str(avlbl_buff_byte)
+	sym_avlbl_buff_len_val = str(node_view.rx_avlbl_buffer_len)
 
 	cog.outl("#define "+sym_avlbl_buff_len+"\t\t("+sym_avlbl_buff_len_val+"u)")
 ]]] */
@@ -340,11 +324,8 @@ if len(list_of_rx_msgs) > 0:
 /* RX message(s) indexes - sorted by ID -*/
 /* [[[cog
 if len(list_of_rx_msgs) > 0:
-	# Sort RX messages by ID to easy rx search later on
-	sorted_rx_msgs = {} # Expects {msg_name : msg_id}
-	for msg_name in list_of_rx_msgs:
-		sorted_rx_msgs.update({msg_name : subnet.messages[msg_name].id})
-	sorted_rx_msgs = dict(sorted(sorted_rx_msgs.items(), key=lambda kv: kv[1]))
+	# RX messages sorted by ID to easy rx search later on
+	sorted_rx_msgs = node_view.sorted_rx_messages
 
 	# Create RX enumeration
 	enum_name = "CAN_" + net_name_str + node_name_str + "rxMsgs"
@@ -352,7 +333,7 @@ if len(list_of_rx_msgs) > 0:
 
 	sym_rx_idx_pfx = "kCAN_" + net_name_str + node_name_str + "rxMsgIdx_"
 	symbol_names = []
-	for i, message_name in enumerate(sorted_rx_msgs.keys()):
+	for i, message_name in enumerate(sorted_rx_msgs):
 		if i == 0:
 			symbol_name = "\t" + sym_rx_idx_pfx + message_name + "=0,"
 		else:
@@ -397,7 +378,7 @@ line_sep_str = " \\\n\t\t\t\t\t\t\t\t\t\t\t\t\t\t\t"
 if len(subnet.messages) > 0:
 	for message in subnet.messages.values():
 		message_name = message.name
-		message_signals = subnet.get_signals_of_message(message_name)
+		message_signals = node_view.messages_signals[message_name]
 
 		if subnet.get_message_direction(node_name,message.name) == nw.CAN_TX:
 			msg_is_tx = True
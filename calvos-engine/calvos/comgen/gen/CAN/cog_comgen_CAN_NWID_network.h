@@ -12,17 +12,23 @@ import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
 
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
-
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+
+if 'cog_proj_obj' in locals():
+	project = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -507,7 +513,7 @@ for message in messages_layouts:
 				macro_str = "ERROR, invalid signal '" \
 						+ signal.name + "' access structure."
 				# TODO: logging system for this file
-				log_warn("Invalid signal '%s' access structure" & signal.name)
+				log_warn("Invalid signal '%s' access structure" % signal.name)
 
 			cog.outl("#define " + def_read + pad_read + macro_str)
 
@@ -597,7 +603,7 @@ for message in messages_layouts:
 				macro_str = "ERROR, invalid signal '" \
 						+ signal.name + "' access structure."
 				# TODO: logging system for this file
-				log_warn("Invalid signal '%s' access structure" & signal.name)
+				log_warn("Invalid signal '%s' access structure" % signal.name)
 
 			cog.outl("#define " + def_write + pad_write + macro_str)
 			cog.outl("#define " + def_update + pad_update \
@@ -12,18 +12,31 @@ import calvos.comgen.CAN as nw
 import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
+from cog_CAN import C_timer_wheel_types, C_timer_wheel_prototypes, C_timer_wheel_functions
 
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
-
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_proj_pickle_file, e))
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+
+if 'cog_proj_obj' in locals():
+	project = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_proj_pickle_file, e))
+
+# Timer wheel code is only generated if used (see Network_CAN.uses_rx_timer_wheel)
+if 'rx_timer_wheel_var' in locals():
+	rx_timer_wheel = json.loads(rx_timer_wheel_var)
+else:
+	rx_timer_wheel = True
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -244,6 +257,11 @@ CalvosError can_txQueueInit(CANtxQueue* queue){
 	return return_value;
 }
 
+/* [[[cog
+if rx_timer_wheel is True:
+	cog.outl(C_timer_wheel_functions())
+]]] */
+// [[[end]]]
 /* ===========================================================================*/
 /** Function for clearing all available flags of a received CAN msg.
  *
@@ -268,6 +286,42 @@ void can_clearAllAvlblFlags(const CANrxMsgStaticData* msg_struct){
 	}
 }
 
+/* ===========================================================================*/
+/** Function for queueing a CAN msg not accepted for transmission.
+ *
+ * Queues the message for a later transmission (retry) if a queue is given and
+ * updates its transmission state.
+ *
+ * @param msg_struct 	Pointer to the message's static data.
+ * @param queue 		Pointer to the transmitting queue, NULL to not queue it.
+ * @Return 		Returns @c kNoError if message was queued. Returns @c kError
+ * 				otherwise (no queue given, queue full).
+ * ===========================================================================*/
+static CalvosError can_commonQueueTxMsg(const CANtxMsgStaticData* msg_struct, \
+										CANtxQueue* queue){
+	CalvosError return_value = kError;
+	CalvosError local_return_value;
+
+	// If queue is not NULL, queue message for a later transmission (retry)
+	if(queue != NULL){
+		local_return_value = can_txQueueEnqueue(queue, msg_struct);
+		if(local_return_value == kNoError){
+			// Queue succeeded
+			msg_struct->dyn->state = kCANtxState_queued;
+			return_value = kNoError;
+		}else{
+			msg_struct->dyn->state = kCANtxState_requested;
+		}
+	}else{
+		if(msg_struct->dyn->state != kCANtxState_queued){
+			// If message was not queued, set it to requested
+			// otherwise it will remain as queued
+			msg_struct->dyn->state = kCANtxState_requested;
+		}
+	}
+	return return_value;
+}
+
 /* ===========================================================================*/
 /** Function for transmitting a CAN msg given its data structure.
  *
@@ -294,23 +348,8 @@ CalvosError can_commonTransmitMsg(const CANtxMsgStaticData* msg_struct, \
 		*transmitting_msg = msg_struct;
 		return_value = kNoError;
 	}else{
-		// If queue is not NULL, queue message for a later transmission (retry)
-		if(queue != NULL){
-			local_return_value = can_txQueueEnqueue(queue, msg_struct);
-			if(local_return_value == kNoError){
-				// Queue succeeded
-				msg_struct->dyn->state = kCANtxState_queued;
-				return_value = kNoError;
-			}else{
-				msg_struct->dyn->state = kCANtxState_requested;
-			}
-		}else{
-			if(msg_struct->dyn->state != kCANtxState_queued){
-				// If message was not queued, set it to requested
-				// otherwise it will remain as queued
-				msg_struct->dyn->state = kCANtxState_requested;
-			}
-		}
+		// Queue message for a later transmission (retry)
+		return_value = can_commonQueueTxMsg(msg_struct, queue);
 	}
 	return return_value;
 }
@@ -349,3 +388,95 @@ void can_commonConfirmTxMsg(const CANtxMsgStaticData* transmitting_msg, \
 		}
 	}
 }
+
+/* ===========================================================================*/
+/** Function for transmitting a CAN msg through one of several TX mailboxes.
+ *
+ * Reserves the first free mailbox and triggers the transmission of the message
+ * in it. If no mailbox is free or the HAL doesn't accept the transmission the
+ * message is queued as in can_commonTransmitMsg.
+ *
+ * @param msg_struct 	Pointer to the transmitting message's static data.
+ * @param queue 		Pointer to the transmitting queue, NULL to not queue it.
+ * @param can_hal_tx_function 	HAL function transmitting in a given mailbox.
+ * @param transmitting_msgs 	Message in transmission in each mailbox (NULL
+ * 								for a free mailbox).
+ * @param n_mailboxes 	Number of mailboxes.
+ * @Return 		Returns @c kNoError if message was triggered for transmission
+ * 				by HAL or if it was successfully queued for a transmission
+ * 				retry. Returns @c kError otherwise (no mailbox free or HAL
+ * 				busy, and queue full).
+ * ===========================================================================*/
+CalvosError can_commonTransmitMsgMailbox(const CANtxMsgStaticData* msg_struct, \
+										 CANtxQueue* queue, \
+										 CANhalTxMailboxFunction can_hal_tx_function, \
+										 const CANtxMsgStaticData** transmitting_msgs, \
+										 uint8_t n_mailboxes){
+	CalvosError return_value = kError;
+	uint8_t mailbox;
+
+	// Reserve first free mailbox
+	CALVOS_CRITICAL_ENTER();
+	for(mailbox = 0u; mailbox < n_mailboxes; mailbox++){
+		if(transmitting_msgs[mailbox] == NULL){
+			transmitting_msgs[mailbox] = msg_struct;
+			break;
+		}
+	}
+	CALVOS_CRITICAL_EXIT();
+
+	if(mailbox < n_mailboxes){
+		// Trigger CAN transmission to HAL in the reserved mailbox
+		if((*can_hal_tx_function)(msg_struct, mailbox) == kNoError){
+			msg_struct->dyn->state = kCANtxState_transmitting;
+			return_value = kNoError;
+		}else{
+			// Release mailbox
+			CALVOS_CRITICAL_ENTER();
+			transmitting_msgs[mailbox] = NULL;
+			CALVOS_CRITICAL_EXIT();
+		}
+	}
+	if(return_value != kNoError){
+		// Queue message for a later transmission (retry)
+		return_value = can_commonQueueTxMsg(msg_struct, queue);
+	}
+	return return_value;
+}
+
+/* ===========================================================================*/
+/** Function for confirming the transmission of a CAN msg in a TX mailbox.
+ *
+ * Frees the given mailbox. The message in it is confirmed as transmitted only
+ * if the transmitted ID matches in case check_msg_id is set true. If
+ * check_msg_id is false then the message will be confirmed but no TX callback
+ * triggered.
+ *
+ * @param transmitting_msgs 	Message in transmission in each mailbox.
+ * @param n_mailboxes 	Number of mailboxes.
+ * @param mailbox 		Index of the mailbox which transmission is confirmed.
+ * @param check_msg_id 	If true, checks the transmitted ID.
+ * @param txd_msg_id 	ID transmitted in the mailbox.
+ * ===========================================================================*/
+void can_commonConfirmTxMailbox(const CANtxMsgStaticData** transmitting_msgs, \
+								uint8_t n_mailboxes, uint8_t mailbox, \
+								uintNat_t check_msg_id, uint32_t txd_msg_id){
+	const CANtxMsgStaticData* transmitting_msg;
+
+	if(mailbox < n_mailboxes){
+		transmitting_msg = transmitting_msgs[mailbox];
+		if(transmitting_msg != NULL){
+			if(!check_msg_id || txd_msg_id == transmitting_msg->id){
+				transmitting_msg->dyn->state = kCANtxState_transmitted;
+				// Invoke TX callback if defined and check_msg_id is true
+				if((check_msg_id) && (transmitting_msg->tx_callback != NULL)){
+					(transmitting_msg->tx_callback)();
+				}
+			}
+			// Free the mailbox
+			CALVOS_CRITICAL_ENTER();
+			transmitting_msgs[mailbox] = NULL;
+			CALVOS_CRITICAL_EXIT();
+		}
+	}
+}
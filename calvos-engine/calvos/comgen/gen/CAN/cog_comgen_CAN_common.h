@@ -12,18 +12,31 @@ import calvos.comgen.CAN as nw
 import calvos.common.codegen as cg
 
 from cog_CAN import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
-
-try:
-	with open(cog_pickle_file, 'rb') as f:
-		network = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
-
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_proj_pickle_file, e))
+from cog_CAN import C_timer_wheel_types, C_timer_wheel_prototypes, C_timer_wheel_functions
+
+if 'cog_network_obj' in locals():
+	network = cog_network_obj
+else:
+	try:
+		with open(cog_pickle_file, 'rb') as f:
+			network = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_pickle_file, e))
+
+if 'cog_proj_obj' in locals():
+	project = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_proj_pickle_file, e))
+
+# Timer wheel code is only generated if used (see Network_CAN.uses_rx_timer_wheel)
+if 'rx_timer_wheel_var' in locals():
+	rx_timer_wheel = json.loads(rx_timer_wheel_var)
+else:
+	rx_timer_wheel = True
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -139,7 +152,6 @@ typedef struct{
 typedef struct{
 	CANtxState state;
 	intNat_t BAF_active;
-	uint32_t period_timer;	/* In ticks */
 	const struct CANtxMsgStaticData* txQueueNext;
 }CANtxMsgDynamicData;
 
@@ -185,8 +197,16 @@ typedef struct{
 	const CANtxMsgStaticData* tail;
 }CANtxQueue;
 
+/* [[[cog
+if rx_timer_wheel is True:
+	cog.outl(C_timer_wheel_types())
+]]] */
+// [[[end]]]
 /* HAL tx function typedef */
 typedef CalvosError (*CANhalTxFunction)(const CANtxMsgStaticData* msg_info);
+/* HAL tx function typedef (several TX mailboxes) */
+typedef CalvosError (*CANhalTxMailboxFunction)(const CANtxMsgStaticData* msg_info, \
+		uint8_t mailbox);
 
 /* Exported Prototypes */
 /* ------------------- */
@@ -195,6 +215,11 @@ extern CalvosError can_txQueueEnqueue(CANtxQueue* queue, const CANtxMsgStaticDat
 extern const CANtxMsgStaticData* can_txQueueGetHead(CANtxQueue* queue);
 extern CalvosError can_txQueueDequeue(CANtxQueue* queue, const CANtxMsgStaticData* node);
 extern CalvosError can_txQueueInit(CANtxQueue* queue);
+/* [[[cog
+if rx_timer_wheel is True:
+	cog.outl(C_timer_wheel_prototypes())
+]]] */
+// [[[end]]]
 
 extern void can_clearAllAvlblFlags(const CANrxMsgStaticData* msg_struct);
 extern const CANrxMsgStaticData* can_traverseRxSearchTree(uint32_t msg_id, \
@@ -209,6 +234,15 @@ extern CalvosError can_commonTransmitMsg(const CANtxMsgStaticData* msg_struct, \
 extern void can_commonConfirmTxMsg(const CANtxMsgStaticData* transmitting_msg, \
 		uintNat_t check_msg_id, uint32_t txd_msg_id);
 
+extern CalvosError can_commonTransmitMsgMailbox(const CANtxMsgStaticData* msg_struct, \
+		  CANtxQueue* queue, \
+		  CANhalTxMailboxFunction can_hal_tx_function, \
+		  const CANtxMsgStaticData** transmitting_msgs, \
+		  uint8_t n_mailboxes);
+
+extern void can_commonConfirmTxMailbox(const CANtxMsgStaticData** transmitting_msgs, \
+		uint8_t n_mailboxes, uint8_t mailbox, uintNat_t check_msg_id, uint32_t txd_msg_id);
+
 /* [[[cog
 # Print include guards
 cog.outl("#endif /"+chr(42)+" "+ guard_symbol + " "+chr(42) + "/")
@@ -11,16 +11,18 @@ __version__ = '0.0.1'
 __date__ = '2020-09-29'
 __updated__ = '2020-09-29'
 
-import cogapp as cog
-import pyexcel as pe
 import re
 import time
 import os
 import shutil
 import pathlib as pl
 import math
+import heapq
 
 import calvos.common.logsys as lg
+import calvos.common.cogtemplates as ctpl
+import calvos.common.odsreader as ods
+import calvos.common.modelcache as mc
 
 # --------------------------------------------------------------------------------------------------
 # Definitions for the logging system
@@ -92,6 +94,10 @@ gp = {"px_enum"    :    "E_",   "px_enum_el"    :   "E_",
 # Prefixes to use for signal parts.
 gen_part_prefixes = ["","part_", "ele_"]
 PRFX_DEFAULT = 0
+
+# Version of the model parsed from the codegen input (see load_input). Shall be incremented
+# whenever it changes so that cached models (see common.modelcache) are discarded.
+MODEL_SCHEMA_VERSION = 1
     
 #==============================================================================
 def calculate_base_type_len(data_size):
@@ -101,7 +107,11 @@ def calculate_base_type_len(data_size):
     returns None.
     """
     return_value = None
-    exponent = math.ceil(math.log(data_size, 2))
+    if type(data_size) is int and data_size > 0:
+        # Exact integer computation of ceil(log2(data_size))
+        exponent = (data_size - 1).bit_length()
+    else:
+        exponent = math.ceil(math.log(data_size, 2))
     base = int(math.pow(2, exponent))
     
     if base <= Compiler_max_size:
@@ -170,31 +180,27 @@ def shifter_string_with_suffix(shifting_bits):
 
 #==============================================================================
 def get_bit_mask(n_of_bits, start_bit = 0, inverse = False, length = None):
-    """ Returns an integer mask. """
-    bits_mask_str = ""
-    if inverse is False:
-        zero_char = "0"
-        one_char = "1"
-    else:
-        zero_char = "1"
-        one_char = "0"
-     
+    """ Returns an integer mask.
+    
+    Mask has max_len bits (base type length of length, or of n_of_bits + start_bit if length is
+    not given), bits from start_bit to start_bit + n_of_bits - 1 are ones (zeros if inverse is
+    True) and the rest are zeros (ones if inverse is True).
+    """
     if length is not None:
         max_len = calculate_base_type_len(length)
     else:
         max_len = calculate_base_type_len(n_of_bits+start_bit)
-     
-    first_bit_position = start_bit
-    last_bit_position = first_bit_position + n_of_bits - 1
-    for i in range(max_len,0,-1):
-        if (i-1) >= first_bit_position and (i-1) <= last_bit_position:
-            # Put a "one_char"
-            bits_mask_str += one_char
-        else:
-            # Put a "zero_char"
-            bits_mask_str += zero_char
-         
-    bits_mask = int(bits_mask_str, 2)
+    
+    first_bit_position = max(start_bit, 0)
+    last_bit_position = min(start_bit + n_of_bits - 1, max_len - 1)
+    if last_bit_position >= first_bit_position:
+        bits_mask = ((1 << (last_bit_position - first_bit_position + 1)) - 1) \
+            << first_bit_position
+    else:
+        bits_mask = 0
+    
+    if inverse is not False:
+        bits_mask = bits_mask ^ ((1 << max_len) - 1)
          
     return bits_mask
 
@@ -314,7 +320,7 @@ def get_param_category(parameter):
 #==============================================================================
 def parse_codegen_spreadsheet(input_file):
     """ Parses an spreadsheet containing code generation parameters. """
-    book = pe.get_book(file_name=str(input_file))
+    book = ods.get_book(input_file, ["Setup", "Parameters"])
 
     # -----------------------
     # Parse selected Setup
@@ -323,20 +329,21 @@ def parse_codegen_spreadsheet(input_file):
     setup = working_sheet[0,1]
     
     working_sheet.name_columns_by_row(2)
+    columns = working_sheet.column_indexes
     setup_found = False
     for row in working_sheet:
         # Check if selected setup exists. If it does extract the rest of the
         # setuo datam, otherwise, warn the user.
-        if setup == row[working_sheet.colnames.index("Setup Name")]:
+        if setup == row[columns["Setup Name"]]:
             # Setup name found
             setup_found = True
             break
     
     if setup_found:
-        params_set = row[working_sheet.colnames.index("Parameters Set")]
-        compiler_name = row[working_sheet.colnames.index("Compiler")]
-        MCU_name = row[working_sheet.colnames.index("MCU")]
-        settings_name = row[working_sheet.colnames.index("Settings")]
+        params_set = row[columns["Parameters Set"]]
+        compiler_name = row[columns["Compiler"]]
+        MCU_name = row[columns["MCU"]]
+        settings_name = row[columns["Settings"]]
         
         # -----------------------
         # Parse Parameters
@@ -344,24 +351,25 @@ def parse_codegen_spreadsheet(input_file):
         # Check if parameter set exists
         working_sheet = book["Parameters"]
         working_sheet.name_columns_by_row(0)
+        columns = working_sheet.column_indexes
         
         if params_set in working_sheet.colnames:
             # Parameter set exists, continue processing parameters...
             for row in working_sheet:
             # Check if parameter exist. If it does, update the value, otherwise
             # warn the user.
-                param = row[working_sheet.colnames.index("Parameter")]
+                param = row[columns["Parameter"]]
                 param_category = get_param_category(param)
                 if param_category == 1:
                     # Parameter is of "data type" type. Update value if it is not
                     # empty.
-                    param_value = str(row[working_sheet.colnames.index(params_set)])
+                    param_value = str(row[columns[params_set]])
                     if param_value != "":
                         dt.update({param : param_value})
                 elif param_category == 2:
                     # Parameter is of "general" type. Update value if it is not
                     # empty.
-                    param_value = str(row[working_sheet.colnames.index(params_set)])
+                    param_value = str(row[columns[params_set]])
                     if param_value != "":
                         dt.update({param : param_value})
                 else:
@@ -700,19 +708,35 @@ def folder_exists(path):
     
     return return_value
 
-def delete_folder_contents(folder):
+def delete_folder_contents(folder, keep = None):
     """ Deletes contents of the given folder.
+    
+    Parameters
+    ----------
+        folder : str or path
+            Folder whose contents are to be deleted.
+        keep : list
+            Optional list of files and/or folders (str or path) not to be deleted. Folders
+            containing kept elements are not deleted either.
     """
+    if keep is not None:
+        keep = set(os.path.abspath(str(element)) for element in keep)
     if folder_exists(folder) is True:
         for filename in os.listdir(folder):
             file_path = os.path.join(folder, filename)
             try:
+                if keep is not None and os.path.abspath(file_path) in keep:
+                    continue
                 if os.path.isfile(file_path) or os.path.islink(file_path):
                     os.unlink(file_path)
                 elif os.path.isdir(file_path):
-                    delete_folder_contents(file_path)
-                    shutil.rmtree(file_path)
-                    log_debug('Deleted element %s' % file_path)
+                    delete_folder_contents(file_path, keep)
+                    if keep is None:
+                        shutil.rmtree(file_path)
+                        log_debug('Deleted element %s' % file_path)
+                    elif len(os.listdir(file_path)) == 0:
+                        os.rmdir(file_path)
+                        log_debug('Deleted element %s' % file_path)
             except Exception as e:
                 log_error('Failed to delete folder %s. Reason: %s' % (file_path, e))
 
@@ -746,6 +770,13 @@ def file_exists(file_name):
         
     return return_value
 
+def update_file_hash(hash_obj, file_name, chunk_size = 65536):
+    """ Updates the given hashlib object with the contents of the specified file.
+    """
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hash_obj.update(chunk)
+
 def resolve_wildcards(in_str, wildcards):
     """ Return the input string with the wildcard(s) resolved """
     out_str = in_str
@@ -962,7 +993,322 @@ def formTree(ordered_list, root = None):
             pass
         
         return root
+
+#===================================================================================================
+class PerfectHash():
+    """ Models a perfect hash (free of collisions) of a set of keys, see get_perfect_hash.
+    
+    A key is mapped to its slot as follows (hash and displace):
+        bucket = ((key * bucket_mult) mod 2^32) >> (32 - bucket_bits), 0 if bucket_bits is 0
+        slot = (((key * slot_mult) mod 2^32) >> (32 - slot_bits)) ^ displacements[bucket]
+    
+    Attributes
+    ----------
+        bucket_mult : int
+            Odd 32-bit multiplier for the bucket of a key.
+        bucket_bits : int
+            Number of buckets as a power of two.
+        slot_mult : int
+            Odd 32-bit multiplier for the slot of a key.
+        slot_bits : int
+            Number of slots as a power of two.
+        displacements : list
+            Displacement of the slots of each bucket.
+        slots : list
+            Index of the key (in the placed keys list) assigned to each slot, None if empty.
+    """
+    def __init__(self, bucket_mult, bucket_bits, slot_mult, slot_bits):
+        self.bucket_mult = bucket_mult
+        self.bucket_bits = bucket_bits
+        self.slot_mult = slot_mult
+        self.slot_bits = slot_bits
+        self.displacements = [0] * (1 << bucket_bits)
+        self.slots = [None] * (1 << slot_bits)
+    
+    def get_bucket(self, key):
+        """ Returns the bucket of the given key. """
+        if self.bucket_bits == 0:
+            return 0
+        return ((key * self.bucket_mult) & 0xFFFFFFFF) >> (32 - self.bucket_bits)
+    
+    def get_hash(self, key):
+        """ Returns the slot of the given key before displacement. """
+        return ((key * self.slot_mult) & 0xFFFFFFFF) >> (32 - self.slot_bits)
+    
+    def get_slot(self, key):
+        """ Returns the slot of the given key. """
+        return self.get_hash(key) ^ self.displacements[self.get_bucket(key)]
+    
+    def place_keys(self, keys):
+        """ Assigns the given keys to the slots, returns False if it is not possible without
+        collisions using the multipliers of this object. """
+        buckets = {}
+        for key_idx, key in enumerate(keys):
+            buckets.setdefault(self.get_bucket(key), []).append(key_idx)
+        # Biggest buckets are placed first
+        for bucket in sorted(buckets, key = lambda bucket: (-len(buckets[bucket]), bucket)):
+            hashes = [self.get_hash(keys[key_idx]) for key_idx in buckets[bucket]]
+            if len(set(hashes)) != len(hashes):
+                return False
+            for displacement in range(len(self.slots)):
+                slots = [key_hash ^ displacement for key_hash in hashes]
+                if all(self.slots[slot] is None for slot in slots):
+                    break
+            else:
+                return False
+            self.displacements[bucket] = displacement
+            for key_idx, slot in zip(buckets[bucket], slots):
+                self.slots[slot] = key_idx
+        
+        return True
+
+#===================================================================================================
+def get_hash_multipliers(count):
+    """ Returns a list of odd 32-bit multipliers (always the same sequence). """
+    multipliers = []
+    value = 0x9E3779B9
+    for _ in range(count):
+        multipliers.append(value | 1)
+        value = (value * 0x5851F42D + 0x14057B7F) & 0xFFFFFFFF
+    
+    return multipliers
+
+#===================================================================================================
+def get_perfect_hash(keys, max_tries = 256):
+    """ Returns a PerfectHash object for the given keys or None if no hash is found.
+    
+    The number of slots is the smallest power of two holding all keys (doubled if no hash is
+    found within max_tries pairs of multipliers). For each number of slots a hash without
+    displacements (single bucket) is tried first, then keys are spread in buckets of about four
+    keys. If all the displacements of the found hash are zero, it is reduced to a single bucket.
+    
+    Parameters
+    ----------
+        keys : list
+            Distinct non-negative integers of up to 32 bits.
+        max_tries : int
+            Maximum number of multipliers pairs to try for each number of slots.
+    """
+    if len(keys) == 0 or len(set(keys)) != len(keys):
+        return None
+    
+    min_slot_bits = max(1, (len(keys) - 1).bit_length())
+    multipliers = get_hash_multipliers(max_tries + 1)
+    for slot_bits in (min_slot_bits, min_slot_bits + 1):
+        for bucket_bits in sorted(set((0, max(0, slot_bits - 2)))):
+            for try_idx in range(max_tries):
+                hash_obj = PerfectHash(multipliers[try_idx], bucket_bits, \
+                                       multipliers[try_idx + 1], slot_bits)
+                if hash_obj.place_keys(keys) is True:
+                    if hash_obj.bucket_bits > 0 and not any(hash_obj.displacements):
+                        # Displacements not needed
+                        hash_obj.bucket_bits = 0
+                        hash_obj.displacements = [0]
+                    return hash_obj
+    
+    return None
+
+#===================================================================================================
+def get_acceptance_filters(keys, width, max_filters):
+    """ Returns up to max_filters acceptance filters (ID/mask pairs) accepting all the given keys
+    with few other keys accepted.
+    
+    A filter accepts a key if (key & mask) == (filter_id & mask). Each filter takes a range of
+    the sorted keys: starting with one exact filter per key, the two adjacent ranges whose merge
+    accepts the fewest additional keys are merged until max_filters ranges remain (greedy
+    minimization, O(n log n) for n keys). If a merge leaves no common bits (all-zero mask) a
+    single filter accepting all keys is returned. Finally, the boundaries between adjacent
+    ranges are moved one key at a time while it reduces the accepted keys.
+    
+    Parameters
+    ----------
+        keys : list
+            Integers of up to width bits (repeated keys are taken once).
+        width : int
+            Number of bits of the keys (e.g., 11 for standard CAN IDs, 29 for extended ones).
+        max_filters : int
+            Maximum number of filters.
+    
+    Returns
+    -------
+        list
+            Filters as [filter_id, mask, [keys accepted by the filter]] sorted by filter ID.
+            Empty list if there are no keys or max_filters is smaller than 1.
+    """
+    full_mask = (1 << width) - 1
+    keys = sorted(set(keys))
+    if len(keys) == 0 or max_filters < 1:
+        return []
+    
+    # Tables of the bitwise and/or of keys[i : i + 2**level] for getting the bits of any range
+    # of keys in constant time.
+    bits_and = [keys]
+    bits_or = [keys]
+    level_len = 1
+    while 2 * level_len <= len(keys):
+        prev_and = bits_and[-1]
+        prev_or = bits_or[-1]
+        bits_and.append([prev_and[i] & prev_and[i + level_len] \
+                         for i in range(len(prev_and) - level_len)])
+        bits_or.append([prev_or[i] | prev_or[i + level_len] \
+                        for i in range(len(prev_or) - level_len)])
+        level_len *= 2
+    
+    def get_free_bits(start, end):
+        # Bits not common to all keys[start:end]
+        level = (end - start).bit_length() - 1
+        last = end - (1 << level)
+        return (bits_and[level][start] & bits_and[level][last]) \
+            ^ (bits_or[level][start] | bits_or[level][last])
+    
+    def get_cover(start, end):
+        # Number of keys accepted by a filter of keys[start:end]
+        return 1 << bin(get_free_bits(start, end)).count("1")
+    
+    # Ranges of keys [start, end) as a linked list of adjacent ranges indexed by their start
+    ends = list(range(1, len(keys) + 1))
+    prevs = list(range(-1, len(keys) - 1))
+    groups_count = len(keys)
+    if groups_count > max_filters:
+        def get_merge_cost(start, middle, end):
+            return get_cover(start, end) - get_cover(start, middle) - get_cover(middle, end)
         
+        heap = [(get_merge_cost(i, i + 1, i + 2), i, i + 2) for i in range(len(keys) - 1)]
+        heapq.heapify(heap)
+        while groups_count > max_filters:
+            _, start, end = heapq.heappop(heap)
+            middle = ends[start]
+            if middle < 0 or middle >= end or ends[middle] != end:
+                # Outdated, one of the ranges was merged
+                continue
+            if get_free_bits(start, end) == full_mask:
+                # Filter without common bits accepts all the keys
+                return [[0, 0, keys.copy()]]
+            ends[start] = end
+            ends[middle] = -1
+            groups_count -= 1
+            if end < len(keys):
+                prevs[end] = start
+                heapq.heappush(heap, (get_merge_cost(start, end, ends[end]), start, ends[end]))
+            if prevs[start] >= 0:
+                heapq.heappush(heap, (get_merge_cost(prevs[start], start, end), \
+                                      prevs[start], end))
+    bounds = [0]
+    while bounds[-1] < len(keys):
+        bounds.append(ends[bounds[-1]])
+    
+    # Refinement, each move of a boundary reduces the sum of keys accepted by the filters. Each
+    # pass visits the boundaries once, a move is at most one key per boundary and pass.
+    for _ in range(len(keys)):
+        improved = False
+        for i in range(1, len(bounds) - 1):
+            start, middle, end = bounds[i - 1], bounds[i], bounds[i + 1]
+            best_cover = get_cover(start, middle) + get_cover(middle, end)
+            best_middle = middle
+            for new_middle in (middle - 1, middle + 1):
+                if start < new_middle < end:
+                    cover = get_cover(start, new_middle) + get_cover(new_middle, end)
+                    if cover < best_cover:
+                        best_cover = cover
+                        best_middle = new_middle
+            if best_middle != middle:
+                bounds[i] = best_middle
+                improved = True
+        if improved is False:
+            break
+    
+    filters = []
+    for start, end in zip(bounds, bounds[1:]):
+        mask = full_mask & ~get_free_bits(start, end)
+        filters.append([keys[start] & mask, mask, keys[start:end]])
+    filters.sort(key = lambda acc_filter: (acc_filter[0], acc_filter[1]))
+    
+    return filters
+
+#===================================================================================================
+def count_accepted_keys(filters, width):
+    """ Returns the number of distinct keys of the given width accepted by at least one of the
+    given filters ([filter_id, mask, ...] elements as returned by get_acceptance_filters). """
+    full_mask = (1 << width) - 1
+    
+    def count_not_accepted(filter_id, mask, others):
+        # Keys matching (filter_id, mask) not accepted by any of the others filters
+        for other_idx, (other_id, other_mask) in enumerate(others):
+            if (filter_id ^ other_id) & mask & other_mask == 0:
+                break
+        else:
+            return 1 << (width - bin(mask).count("1"))
+        split_bits = other_mask & ~mask & full_mask
+        if split_bits == 0:
+            # Fully covered by the other filter
+            return 0
+        # Split on one bit fixed by the other filter: the half not matching it can't be
+        # accepted by it, the other half is checked against it again
+        bit = split_bits & -split_bits
+        return count_not_accepted(filter_id | (~other_id & bit), mask | bit, \
+                                  others[other_idx + 1:]) \
+            + count_not_accepted((filter_id & ~bit) | (other_id & bit), mask | bit, \
+                                 others[other_idx:])
+    
+    accepted = 0
+    for filter_idx, acc_filter in enumerate(filters):
+        accepted += count_not_accepted(acc_filter[0] & acc_filter[1], acc_filter[1], \
+                                       [(other[0], other[1]) for other in filters[:filter_idx]])
+    
+    return accepted
+
+#===================================================================================================
+def get_phase_offsets(periods):
+    """ Assigns phase offsets to periodic events so that as few of them as possible coincide.
+
+    An event with period P and phase offset f occurs in the ticks t where t % P == f. Events
+    are placed by increasing period, each one in the phase whose ticks have the lowest average
+    number of events already placed (exact, using integers scaled by the least common multiple
+    of the periods), the lowest phase on ties.
+
+    Parameters
+    ----------
+        periods : list
+            Period in ticks (int, 1 or more) of each event.
+
+    Returns
+    -------
+        list
+            Phase offset (0 to period - 1) of each event, in the order of periods.
+    """
+    phases = [0] * len(periods)
+    groups = {}
+    for index, period in enumerate(periods):
+        groups.setdefault(period, []).append(index)
+    scale = 1
+    for period in groups:
+        scale = scale * period // math.gcd(scale, period)
+
+    # Events placed on each phase of each period {period : [events count of each phase]}
+    placed = {}
+    for period in sorted(groups):
+        # Average events per tick of each phase (scaled) due to the events of other periods
+        load = [0] * period
+        for other_period, counts in placed.items():
+            divisor = math.gcd(period, other_period)
+            folded = [0] * divisor
+            for phase, count in enumerate(counts):
+                folded[phase % divisor] += count
+            weight = scale * divisor // other_period
+            for phase in range(period):
+                load[phase] += folded[phase % divisor] * weight
+
+        heap = [(phase_load, phase) for phase, phase_load in enumerate(load)]
+        heapq.heapify(heap)
+        counts = [0] * period
+        for index in groups[period]:
+            phase_load, phase = heapq.heappop(heap)
+            phases[index] = phase
+            counts[phase] += 1
+            heapq.heappush(heap, (phase_load + scale, phase))
+        placed.update({period : counts})
+
+    return phases
 
 #===================================================================================================
 def cog_generator(input_file, out_dir, work_dir, gen_path, variables = None):
@@ -978,27 +1324,21 @@ def cog_generator(input_file, out_dir, work_dir, gen_path, variables = None):
         cog_output_file_str = cog_output_file_str[7:]
     cog_output_file = out_dir / cog_output_file_str
     
-    # Get project pickle full file name  
-    project_pickle = project_object.get_work_file_path("common.project", "project_pickle")
-        
     # Invoke code generation
-    # ----------------------           
-    cog_arguments = ['dummy_argument', \
-               '-d', \
-               '-D', 'input_worksheet=' + input_file, \
-               '-D', 'project_working_dir=' + str(work_dir), \
-               '-D', 'cog_proj_pickle_file=' + str(project_pickle),
-               '-o', str(cog_output_file), \
-               str(cog_input_file) ]
+    # ----------------------
+    cog_variables = {"input_worksheet" : input_file, \
+                     "project_working_dir" : str(work_dir)}
+    # Hand over project object (either live object or pickle file)
+    cog_variables.update(project_object.get_cog_project_variables())
     
     # Append additional variables if required
     if variables is not None:
         for variable in variables:
-            cog_arguments.append('-D')
-            cog_arguments.append(str(variable))
+            variable_name, _, variable_val = str(variable).partition("=")
+            cog_variables.update({variable_name : variable_val})
             
-    # Call cogapp engine
-    cog_return = cog.Cog().main(cog_arguments)
+    # Render compiled template
+    cog_return = ctpl.render_template(cog_input_file, cog_output_file, cog_variables)
     if cog_return == 0:
         log_info("Code generation successful: '%s'" % (str(out_dir / cog_output_file_str)))
         print("INFO: code generation successful: ",cog_output_file)
@@ -1009,15 +1349,58 @@ def cog_generator(input_file, out_dir, work_dir, gen_path, variables = None):
 
 
 project_object = None
+#===================================================================================================
+def get_module_state():
+    """ Returns the settings of this module set while loading the project (e.g., data types
+    parsed from the codegen input). Used to replicate them in worker processes. """
+    return {"calvos_path" : calvos_path, \
+            "calvos_project_path" : calvos_project_path, \
+            "MCU_word_size" : MCU_word_size, \
+            "Compiler_max_size" : Compiler_max_size, \
+            "little_endian" : little_endian, \
+            "pack_struct_tag" : pack_struct_tag, \
+            "dt" : dict(dt), \
+            "gp" : dict(gp)}
+
+#===================================================================================================
+def set_module_state(state):
+    """ Restores the module settings returned by get_module_state. """
+    global calvos_path, calvos_project_path, MCU_word_size, Compiler_max_size, little_endian, \
+        pack_struct_tag
+    
+    calvos_path = state["calvos_path"]
+    calvos_project_path = state["calvos_project_path"]
+    MCU_word_size = state["MCU_word_size"]
+    Compiler_max_size = state["Compiler_max_size"]
+    little_endian = state["little_endian"]
+    pack_struct_tag = state["pack_struct_tag"]
+    dt.update(state["dt"])
+    gp.update(state["gp"])
+
 #===================================================================================================
 def load_input(input_file, input_type, params, project_obj):
     """ Loads input file and returns the corresponding object. """
-    del input_type, params # Unused parameters
+    del input_type # Unused parameters
     
     global project_object
     
     project_object = project_obj
-    parse_codegen_spreadsheet(input_file)
+    
+    def parse_model():
+        # Model of this module is made of the data types and general parameters changed by the input
+        dt_before = dict(dt)
+        gp_before = dict(gp)
+        parse_codegen_spreadsheet(input_file)
+        return {"dt" : {key : value for key, value in dt.items() \
+                        if dt_before.get(key, None) != value}, \
+                "gp" : {key : value for key, value in gp.items() \
+                        if gp_before.get(key, None) != value}}
+    
+    # Parsed data is taken from the model cache if input and parameters didn't change
+    model = mc.get_model(project_obj, "common.codegen", MODEL_SCHEMA_VERSION, input_file, \
+                         params, parse_model)
+    dt.update(model["dt"])
+    gp.update(model["gp"])
     # This function for this specific module returns a dummy object.
     return 0
 
@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+""" CalvOS Cog Templates Module.
+
+Compiled and cached cog templates. Each cog template is read and compiled only once per process
+into literal text chunks and python code objects. cogapp is imported at first use (not when
+this module is imported). The compiled template can then be rendered
+many times with different variables (e.g., node_name, NODEID_wildcard, include_var) producing
+the same output as a 'cog -d -D name=value -o output input' invocation.
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import sys
+import os
+import re
+import time
+import types
+import locale
+import pickle
+import traceback
+import concurrent.futures
+import pathlib as pl
+
+import calvos.common.logsys as lg
+import calvos.common.workers as workers
+
+# --------------------------------------------------------------------------------------------------
+# Definitions for the logging system
+# --------------------------------------------------------------------------------------------------
+LOGGER_LABEL = "cog_tpl"
+
+log = lg.log_system
+log.add_logger(LOGGER_LABEL)
+
+def log_debug(message):
+    log.debug(LOGGER_LABEL, message)
+
+def log_info(message):
+    log.info(LOGGER_LABEL, message)
+
+def log_warn(message):
+    log.warning(LOGGER_LABEL, message)
+
+def log_error(message):
+    log.error(LOGGER_LABEL, message)
+
+def log_critical(message):
+    log.critical(LOGGER_LABEL, message)
+# --------------------------------------------------------------------------------------------------
+
+# Return values of render_template, aligned with the return codes of cog.Cog().main()
+RENDER_OK = 0
+RENDER_COG_ERROR = 1
+RENDER_GEN_ERROR = 3
+RENDER_USER_ERROR = 4
+
+# Prologue prepended to each cog block (same as the one used by cogapp).
+COG_PROLOGUE = "import cog as cog\n"
+
+#===================================================================================================
+class CogBlock():
+    """ Compiled [[[cog ... ]]] block of a template. """
+
+    def __init__(self, generator, code, fname, pref_out):
+        # Cogapp generator holding the block markers, used for the output indentation
+        # and for the cog.out/cog.outl functions.
+        self.generator = generator
+        self.code = code
+        self.fname = fname
+        # Whitespace prefix for the output
+        self.pref_out = pref_out
+
+    #===============================================================================================
+    def evaluate(self, cog_module, template_globals):
+        """ Executes the block code and returns its (indented) output. """
+        from cogapp import cogapp
+
+        gen = self.generator
+        gen.outstring = ""
+
+        if self.code is None:
+            return ""
+
+        cog_module.msg = gen.msg
+        cog_module.out = gen.out
+        cog_module.outl = gen.outl
+        cog_module.error = gen.error
+
+        eval(self.code, template_globals)
+
+        # Ensure that the last line of the output ends with a new line.
+        if gen.outstring and gen.outstring[-1] != "\n":
+            gen.outstring += "\n"
+
+        return cogapp.reindent_block(gen.outstring, self.pref_out)
+
+#===================================================================================================
+class CompiledTemplate():
+    """ Cog template compiled into literal text chunks and CogBlock objects. """
+
+    def __init__(self, template_file):
+        self.template_file = pl.Path(template_file)
+        self.template_dir = str(self.template_file.parent)
+        # List of either strings (literal text) or CogBlock objects
+        self.chunks = []
+        self.compile_time = 0
+
+        start_time = time.perf_counter()
+        self.compile()
+        self.compile_time = time.perf_counter() - start_time
+
+    #===============================================================================================
+    def compile(self):
+        """ Parses the template file and compiles each of its cog blocks.
+
+        Parsing follows the same rules as cogapp's process_file with the -d (delete code) option.
+        """
+        from cogapp import cogapp
+
+        options = cogapp.CogOptions()
+        begin_spec = options.begin_spec
+        end_spec = options.end_spec
+        end_output = options.end_output
+        file_name = str(self.template_file)
+
+        def is_end_spec(line):
+            return end_spec in line and end_output not in line
+
+        def raise_error(message, line_number):
+            raise cogapp.CogError(message, file=file_name, line=line_number)
+
+        with open(file_name, encoding=options.encoding) as f:
+            lines = f.readlines()
+
+        literal = []
+        idx = 0
+        num_lines = len(lines)
+        while idx < num_lines:
+            line = lines[idx]
+            if begin_spec not in line:
+                if is_end_spec(line):
+                    raise_error("Unexpected %r" % end_spec, idx + 1)
+                if end_output in line:
+                    raise_error("Unexpected %r" % end_output, idx + 1)
+                literal.append(line)
+                idx += 1
+                continue
+
+            # Begin of a cog block, flush literal text
+            if len(literal) > 0:
+                self.chunks.append("".join(literal))
+                literal = []
+
+            gen = cogapp.CogGenerator(options = options)
+            gen.parse_marker(line)
+            first_line_num = idx + 1
+
+            if is_end_spec(line):
+                # Single line block
+                beg = line.find(begin_spec)
+                end = line.find(end_spec)
+                if beg > end:
+                    raise_error("Cog code markers inverted", first_line_num)
+                gen.parse_line(line[beg + len(begin_spec) : end].strip())
+            else:
+                idx += 1
+                while idx < num_lines and not is_end_spec(lines[idx]):
+                    line = lines[idx]
+                    if begin_spec in line:
+                        raise_error("Unexpected %r" % begin_spec, idx + 1)
+                    if end_output in line:
+                        raise_error("Unexpected %r" % end_output, idx + 1)
+                    gen.parse_line(line)
+                    idx += 1
+                if idx >= num_lines:
+                    raise_error("Cog block begun but never ended.", first_line_num)
+                gen.parse_marker(lines[idx])
+
+            # Skip previous output of the block
+            idx += 1
+            while idx < num_lines and end_output not in lines[idx]:
+                if begin_spec in lines[idx]:
+                    raise_error("Unexpected %r" % begin_spec, idx + 1)
+                if is_end_spec(lines[idx]):
+                    raise_error("Unexpected %r" % end_spec, idx + 1)
+                idx += 1
+            if idx >= num_lines:
+                raise_error("Missing %r before end of file." % end_output, idx)
+            # Skip end output line
+            idx += 1
+
+            fname = "<cog %s:%s>" % (file_name, first_line_num)
+            pref_out = cogapp.white_prefix(gen.markers)
+            code_text = gen.get_code()
+            if code_text:
+                code = compile(COG_PROLOGUE + code_text, fname, "exec")
+            else:
+                code = None
+            self.chunks.append(CogBlock(gen, code, fname, pref_out))
+
+        if len(literal) > 0:
+            self.chunks.append("".join(literal))
+
+    #===============================================================================================
+    def render(self, output_file, variables = None):
+        """ Renders the template into the given output file.
+
+        Parameters
+        ----------
+            output_file : str or path
+                Full path of the file to be generated.
+            variables : dict
+                Variables to be defined as globals for the template code (equivalent to cogapp's
+                -D option).
+        """
+        from cogapp import cogapp
+
+        cog_module = types.SimpleNamespace()
+        cog_module.path = [self.template_dir]
+        cog_module.inFile = str(self.template_file)
+        cog_module.outFile = str(output_file)
+        cog_module.previous = ""
+
+        template_globals = {}
+        if variables is not None:
+            template_globals.update(variables)
+
+        saved_sys_path = sys.path[:]
+        saved_cog_module = sys.modules.get("cog")
+        sys.modules["cog"] = cog_module
+        sys.path.append(self.template_dir)
+
+        output = []
+        try:
+            for chunk in self.chunks:
+                if isinstance(chunk, str):
+                    output.append(chunk)
+                else:
+                    output.append(chunk.evaluate(cog_module, template_globals))
+        finally:
+            sys.path = saved_sys_path
+            if saved_cog_module is not None:
+                sys.modules["cog"] = saved_cog_module
+            else:
+                sys.modules.pop("cog", None)
+
+        write_output(output_file, "".join(output), cogapp.CogOptions().encoding)
+
+# Generation timestamp written in the header of generated files (see cog_codegen.py). Files
+# differing only in it are considered unchanged by write_output.
+TIMESTAMP_REGEX = re.compile(rb"(generated on \(yyyy\.mm\.dd::hh:mm:ss\): )[^\r\n]*")
+
+#===================================================================================================
+def write_output(output_file, content, encoding = "utf-8"):
+    """ Writes the given content into output_file only if it differs from the current content of
+    the file, so that unchanged files keep their modification time (and don't trigger rebuilds
+    of the C code using them). The generation timestamp in the file header is not considered
+    in the comparison, unchanged files keep their original timestamp.
+    
+    Parameters
+    ----------
+        output_file : str or path
+            Full path of the file to be written. Missing folders are created.
+        content : str
+            Text to be written.
+        encoding : str
+            Encoding of the file. If None, the platform's preferred encoding is used (as with
+            open()).
+            
+    Returns
+    -------
+        bool
+            True if the file was written, False if it already had the given content.
+    """
+    output_file = str(output_file)
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    # Text mode writes with the platform newlines, compare against the same translation.
+    content_bytes = content.replace("\n", os.linesep).encode(encoding)
+    if os.path.isfile(output_file):
+        with open(output_file, "rb") as f:
+            current_bytes = f.read()
+        if current_bytes == content_bytes \
+        or TIMESTAMP_REGEX.sub(rb"\1", current_bytes) \
+        == TIMESTAMP_REGEX.sub(rb"\1", content_bytes):
+            log_debug("Output file '%s' unchanged, not overwritten." % output_file)
+            return False
+    
+    out_dir = os.path.dirname(output_file)
+    if out_dir and not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+    with open(output_file, "wb") as f:
+        f.write(content_bytes)
+    return True
+
+#===================================================================================================
+# Cache of compiled templates, key is the full path of the template file.
+compiled_templates = {}
+# Timings of the templates {template key : [compile time, render count, render time]}.
+# Timings reported by worker processes are also accumulated here.
+template_timings = {}
+# Files successfully generated so far (including the ones generated by worker processes).
+output_files = []
+
+#===================================================================================================
+def add_timings(template_key, compile_time = 0, render_count = 0, render_time = 0):
+    """ Accumulates compile/render timings for the given template. """
+    if template_key not in template_timings:
+        template_timings.update({template_key : [0, 0, 0]})
+    timings = template_timings[template_key]
+    timings[0] += compile_time
+    timings[1] += render_count
+    timings[2] += render_time
+
+#===================================================================================================
+def get_template(template_file):
+    """ Returns the compiled template for the given file, compiling it if not done yet. """
+    template_key = str(template_file)
+    if template_key not in compiled_templates:
+        compiled_templates.update({template_key : CompiledTemplate(template_file)})
+        add_timings(template_key, compile_time = compiled_templates[template_key].compile_time)
+        log_debug("Compiled template '%s' in %.3f ms." \
+                  % (template_key, compiled_templates[template_key].compile_time * 1000))
+    return compiled_templates[template_key]
+
+#===================================================================================================
+def render_template(template_file, output_file, variables = None):
+    """ Renders a cog template into the given output file.
+
+    Parameters
+    ----------
+        template_file : str or path
+            Full path of the cog template.
+        output_file : str or path
+            Full path of the file to be generated.
+        variables : dict
+            Variables to be defined as globals for the template code.
+
+    Returns
+    -------
+        int
+            RENDER_OK if generation was successful, otherwise an error code aligned with the
+            return codes of cogapp.
+    """
+    from cogapp import cogapp
+
+    try:
+        template = get_template(template_file)
+        start_time = time.perf_counter()
+        template.render(output_file, variables)
+        add_timings(str(template_file), render_count = 1, \
+                    render_time = time.perf_counter() - start_time)
+        output_files.append(str(output_file))
+    except cogapp.CogGeneratedError as e:
+        log_error("Error: %s" % e)
+        return RENDER_GEN_ERROR
+    except cogapp.CogError as e:
+        log_error(str(e))
+        return RENDER_COG_ERROR
+    except Exception:
+        typ, err, tb = sys.exc_info()
+        frames = (tuple(fr) for fr in traceback.extract_tb(tb.tb_next))
+        frames = cogapp.find_cog_source(frames, COG_PROLOGUE)
+        message = "".join(traceback.format_list(frames))
+        message += "%s: %s" % (typ.__name__, err)
+        log_error("Traceback (most recent call last):\n%s" % message)
+        print("Traceback (most recent call last):\n%s" % message, file = sys.stderr)
+        return RENDER_USER_ERROR
+
+    return RENDER_OK
+
+#===================================================================================================
+def render_templates(render_jobs, jobs = 1, shared_variables = None, result_callback = None):
+    """ Renders a list of templates, optionally across a pool of worker processes.
+
+    Parameters
+    ----------
+        render_jobs : list
+            List of tuples (template_file, output_file, variables).
+        jobs : int
+            Number of worker processes. If 1 (or less) templates are rendered in this process.
+        shared_variables : dict
+            Variables common to all the render jobs (e.g., project and network objects). These
+            are transferred only once to each worker process.
+        result_callback : function
+            Function called as result_callback(job_index, return_value) after each job, in the
+            same order as render_jobs regardless of the order in which workers finish.
+            
+    Returns
+    -------
+        list
+            Render return values, in the same order as render_jobs.
+    """
+    results = []
+    
+    if jobs is not None and jobs > 1 and len(render_jobs) > 1:
+        jobs = min(jobs, len(render_jobs))
+        try:
+            import calvos.common.codegen as cg
+            
+            shared_data_pickle = pickle.dumps((cg.get_module_state(), shared_variables), \
+                                              pickle.HIGHEST_PROTOCOL)
+            with concurrent.futures.ProcessPoolExecutor(max_workers = jobs, \
+                    initializer = workers.init_worker, \
+                    initargs = (lg.log_system.level, shared_data_pickle)) as executor:
+                futures = [executor.submit(workers.render_job, template_file, output_file, variables) \
+                           for template_file, output_file, variables in render_jobs]
+                # Collect results in submission order to get deterministic logs.
+                for job_idx, future in enumerate(futures):
+                    return_value, records, job_stdout, job_stderr, timings = future.result()
+                    if job_stdout != "":
+                        print(job_stdout, end = "")
+                    if job_stderr != "":
+                        print(job_stderr, end = "", file = sys.stderr)
+                    lg.log_system.replay(records)
+                    add_timings(str(render_jobs[job_idx][0]), *timings)
+                    if return_value == RENDER_OK:
+                        output_files.append(str(render_jobs[job_idx][1]))
+                    results.append(return_value)
+                    if result_callback is not None:
+                        result_callback(job_idx, return_value)
+        except Exception as e:
+            log_warn("Rendering with %s worker processes failed, rendering remaining templates " \
+                     "in the main process. Reason: %s" % (jobs, e))
+    
+    # Render serially (or the remaining jobs if the parallel rendering failed)
+    for job_idx in range(len(results), len(render_jobs)):
+        template_file, output_file, variables = render_jobs[job_idx]
+        cog_variables = {}
+        if shared_variables is not None:
+            cog_variables.update(shared_variables)
+        cog_variables.update(variables)
+        return_value = render_template(template_file, output_file, cog_variables)
+        results.append(return_value)
+        if result_callback is not None:
+            result_callback(job_idx, return_value)
+    
+    return results
+
+#===================================================================================================
+def log_timings():
+    """ Logs compile and render timings of each of the used templates. """
+    for template_key, timings in template_timings.items():
+        log_info("Template '%s': compiled in %.3f ms, rendered %d time(s) in %.3f ms." \
+                 % (pl.Path(template_key).name, timings[0] * 1000, timings[1], \
+                    timings[2] * 1000))
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+""" CalvOS Export Module.
+
+Differential export of the generated code into a user folder (-e/--export) with backup of the
+overwritten files (-b/--backup). See export_code.
+
+Only files whose content differs from the one in the export folder are copied. Backups store
+only the files actually overwritten. Backup content is kept in a content-addressed store and
+backup sets reference it through hardlinks, so the same content is stored only once across all
+the sets. File comparison and copy operations are run concurrently.
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import os
+import csv
+import shutil
+import hashlib
+import concurrent.futures
+
+import calvos.common.codegen as cg
+import calvos.common.logsys as lg
+
+# --------------------------------------------------------------------------------------------------
+# Definitions for the logging system
+# --------------------------------------------------------------------------------------------------
+LOGGER_LABEL = "export"
+
+log = lg.log_system
+log.add_logger(LOGGER_LABEL)
+
+def log_debug(message):
+    log.debug(LOGGER_LABEL, message)
+
+def log_info(message):
+    log.info(LOGGER_LABEL, message)
+
+def log_warn(message):
+    log.warning(LOGGER_LABEL, message)
+
+def log_error(message):
+    log.error(LOGGER_LABEL, message)
+
+def log_critical(message):
+    log.critical(LOGGER_LABEL, message)
+# --------------------------------------------------------------------------------------------------
+
+# Folder (inside the backup folder) of the content-addressed store of backed-up files.
+BACKUP_STORE_FOLDER = ".store"
+# Default number of threads for file operations (these are I/O bound).
+DEFAULT_THREADS = 8
+
+#===================================================================================================
+def get_file_hash(file_name):
+    """ Returns the sha256 hex digest of the given file or None if it doesn't exist. """
+    return_value = None
+    if cg.file_exists(file_name):
+        hash_obj = hashlib.sha256()
+        cg.update_file_hash(hash_obj, file_name)
+        return_value = hash_obj.hexdigest()
+
+    return return_value
+
+#===================================================================================================
+def get_changed_files(files, export_path, threads = DEFAULT_THREADS):
+    """ Compares the given files against the ones with the same name in the export folder.
+
+    Parameters
+    ----------
+        files : list
+            List of paths of the files to be exported.
+        export_path : path
+            Export folder.
+        threads : int
+            Number of threads used to compute the file hashes.
+
+    Returns
+    -------
+        list
+            List of tuples (file, existing) for the files whose content differs from the one in
+            the export folder (in the same order as files). "existing" is True if the file
+            exists in the export folder (i.e., it will be overwritten).
+    """
+    def compare(file):
+        export_hash = get_file_hash(export_path / file.name)
+        if export_hash is None:
+            return (file, False)
+        elif export_hash != get_file_hash(file):
+            return (file, True)
+        return None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = max(1, threads)) as executor:
+        results = list(executor.map(compare, files))
+
+    return [result for result in results if result is not None]
+
+#===================================================================================================
+def backup_file(orig_file, dest_file, store_path):
+    """ Backs-up orig_file as dest_file.
+
+    The content is stored once in the content-addressed store (store_path / <sha256>) and
+    dest_file is created as a hardlink to it. If hardlinks are not supported, dest_file is a
+    copy of the stored content.
+    """
+    file_hash = get_file_hash(orig_file)
+    stored_file = store_path / file_hash
+    if cg.file_exists(stored_file) is False:
+        shutil.copy2(orig_file, stored_file)
+
+    if os.path.lexists(dest_file):
+        os.unlink(dest_file)
+    try:
+        os.link(stored_file, dest_file)
+    except OSError:
+        shutil.copy2(stored_file, dest_file)
+
+#===================================================================================================
+def backup_files(files, export_path, backup_path, backup_set, threads = DEFAULT_THREADS):
+    """ Backs-up the files of the export folder that are going to be overwritten.
+
+    Backed-up files are named "<backup_set>_<file name>" in the backup folder. Files of a
+    previous use of the same backup set are deleted first. Stored contents no longer referenced
+    by any backup set are removed from the store.
+
+    Parameters
+    ----------
+        files : list
+            Paths of the generated files that will overwrite existing files in the export folder.
+        export_path : path
+            Export folder.
+        backup_path : path
+            Backup folder.
+        backup_set : int
+            Number of the backup set to use.
+        threads : int
+            Number of threads used to back-up the files.
+
+    Returns
+    -------
+        int
+            Number of backed-up files.
+    """
+    store_path = backup_path / BACKUP_STORE_FOLDER
+    if cg.folder_exists(store_path) is False:
+        cg.create_folder(store_path)
+
+    # Remove files of the previous use of this backup set
+    set_prefix = str(backup_set) + "_"
+    for file_name in os.listdir(backup_path):
+        if file_name.startswith(set_prefix) and os.path.isfile(backup_path / file_name):
+            cg.delete_file(backup_path / file_name)
+
+    def backup(file):
+        backup_file(export_path / file.name, backup_path / (set_prefix + file.name), store_path)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = max(1, threads)) as executor:
+        list(executor.map(backup, files))
+
+    # Remove stored contents not referenced anymore (only the store's link remains)
+    for file_name in os.listdir(store_path):
+        stored_file = store_path / file_name
+        if os.stat(stored_file).st_nlink <= 1:
+            cg.delete_file(stored_file)
+
+    log_debug("Backed-up %s file(s) in backup set %s." % (len(files), backup_set))
+
+    return len(files)
+
+#===================================================================================================
+def export_files(files, export_path, threads = DEFAULT_THREADS):
+    """ Copies the given files into the export folder.
+
+    Returns
+    -------
+        int
+            Number of exported files.
+    """
+    def export(file):
+        shutil.copy(file, export_path / file.name)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = max(1, threads)) as executor:
+        list(executor.map(export, files))
+
+    return len(files)
+
+#===================================================================================================
+def export_code(output_path, export_path, backup_path = None, threads = DEFAULT_THREADS):
+    """ Exports the generated C-code (.c and .h files of the output folder) into the export
+    folder, optionally backing-up the files to be overwritten.
+
+    Backups are stored in up to MAX_BKUP_COPIES rotating backup sets, the used sets are recorded
+    in the history file backup_history.csv of the backup folder.
+
+    Parameters
+    ----------
+        output_path : path
+            Folder with the generated code.
+        export_path : path
+            Export folder. Shall exist.
+        backup_path : path
+            Optional backup folder. Created if it doesn't exist.
+        threads : int
+            Number of threads used for the file operations.
+
+    Returns
+    -------
+        bool
+            False if export was not performed (export folder doesn't exist or is the same as
+            the backup folder), True otherwise.
+    """
+    MAX_BKUP_COPIES = 10
+
+    log_info("============== Exporting generated code. ==============")
+    print("INFO: Exporting generated C-code...")
+    if cg.folder_exists(export_path) is False:
+        print("ERROR: Export folder '%s' doesn't exist. No export performed." % export_path)
+        log_warn("Export folder '%s' doesn't exist. No export performed." % export_path)
+        return False
+
+    # Get files to export
+    c_files = list(output_path.glob('*.c'))
+    h_files = list(output_path.glob('*.h'))
+
+    # Only files with a content different than the exported one are copied
+    changed_files = get_changed_files(c_files + h_files, export_path, threads)
+
+    # If backup location is defined then do the backup
+    if backup_path is not None:
+        current_bkup_copy = 0
+        create_header = False
+
+        log_info("-------------- Backing up files. --------------")
+        print("INFO: Backing up C-code to be overwritten during export...")
+        if export_path == backup_path:
+            log_warn("Provided Export and Backup folders are same. Export operation cancelled.")
+            return False
+
+        if cg.folder_exists(backup_path) is False:
+            log_info(" Backup path '%s' doesn't exist, creating it..." % backup_path)
+            cg.create_folder(backup_path)
+        # Check if history file exists
+        history_file_name = "backup_history.csv"
+        history_fields = ['bkpu_set', 'store_date']
+        history_file = backup_path / history_file_name
+        try:
+            if cg.file_exists(history_file):
+                # Get last stored backup set
+                with open(history_file, newline='') as csvfile:
+                    reader = csv.DictReader(csvfile, fieldnames=history_fields)
+                    for row in reader:
+                        current_bkup_copy = row['bkpu_set']
+
+                    current_bkup_copy = int(current_bkup_copy)
+                    # increment bkup copy
+                    if current_bkup_copy < MAX_BKUP_COPIES - 1:
+                        current_bkup_copy += 1
+                    else:
+                        current_bkup_copy = 0
+            else:
+                # Create history file header
+                create_header = True
+                current_bkup_copy = 0
+        except Exception as e:
+            current_bkup_copy = MAX_BKUP_COPIES
+            print(("WARNING: Error accessing bkup history file (backup_history.csv). " \
+                  + "Backed up in set number %s.") % MAX_BKUP_COPIES)
+            log_warn(("Error accessing bkup history file (backup_history.csv). " \
+                  + "Backed up in set number %s. Reason: %s") % (MAX_BKUP_COPIES, e))
+
+        # Backup only the files to be overwritten
+        overwritten_files = [file for file, existing in changed_files if existing is True]
+        file_counter = 0
+        if len(overwritten_files) > 0:
+            file_counter = backup_files(overwritten_files, export_path, backup_path, \
+                                        current_bkup_copy, threads)
+
+            # Write history file with latest information
+            with open(history_file, 'a', newline='') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=history_fields)
+                if create_header:
+                    writer.writeheader()
+                writer.writerow({history_fields[0] : str(current_bkup_copy),
+                                history_fields[1] : "\tCreated on " \
+                                + cg.get_local_time_formatted() \
+                                + ". " + str(file_counter) + " file(s) backed-up."})
+
+        log_info(" Backup completed. '%s' file(s) backed-up." % file_counter)
+        print("INFO: Backup completed. '%s' file(s) backed-up." % file_counter)
+
+    # Export files
+    log_info("-------------- Exporting files. --------------")
+
+    file_counter = export_files([file for file, existing in changed_files], export_path, threads)
+    unchanged_counter = len(c_files) + len(h_files) - file_counter
+
+    log_info("Export completed. '%s' file(s) exported, '%s' file(s) unchanged." \
+             % (file_counter, unchanged_counter))
+    print("INFO: Export completed. '%s' file(s) exported, '%s' file(s) unchanged." \
+          % (file_counter, unchanged_counter))
+
+    return True
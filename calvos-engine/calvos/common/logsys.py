@@ -13,8 +13,6 @@ __updated__ = '2020-12-06'
 
 import logging
 import traceback
-from lxml import etree as ET
-import xml.dom.minidom
 
 # #TODO: Solve how to pass the log file path dynamically to this module
 
@@ -106,6 +104,10 @@ class Log:
                          "warning" : 0,
                          "error" : 0,
                          "critical" : 0}
+        
+        # If a list, messages are stored in it instead of being logged. Used in worker processes
+        # so that the parent process can replay them (in a deterministic order).
+        self.records = None
             
     def set_output_file(self, file_name):
         self.file_handler = logging.FileHandler(file_name)
@@ -142,22 +144,18 @@ class Log:
     
     def debug(self, name, message):
         """ """
-        self.loggers[name].logger.debug(message)
-        self.counters["debug"] += 1
+        self.emit("debug", name, message)
     
     def info(self, name, message):
         """ """
-        self.loggers[name].logger.info(message)
-        self.counters["info"] += 1
+        self.emit("info", name, message)
     
     def warning(self, name, message):
         """ """
-        self.loggers[name].logger.warning(message)
-        self.counters["warning"] += 1
+        self.emit("warning", name, message)
     
     def error(self, name, message):
         """ """
-        self.counters["error"] += 1
         if traceback.format_exc().find("NoneType") == -1:
             trace = traceback.format_exc()
             print("ERROR: ", message)
@@ -173,14 +171,55 @@ class Log:
         else:
             message += str(trace)
             
-        self.loggers[name].logger.error(message)
+        self.emit("error", name, message)
 
     def critical(self, name, message):
         """ """
-        self.loggers[name].logger.critical(message)
-        self.counters["critical"] += 1
+        self.emit("critical", name, message)
+    
+    def emit(self, level, name, message):
+        """ Logs the message with the given level ("debug", "info", etc.) or stores it if
+        recording is active. """
+        if self.records is not None:
+            self.records.append((level, name, message))
+        else:
+            if name not in self.loggers:
+                self.add_logger(name)
+            getattr(self.loggers[name].logger, level)(message)
+            self.counters[level] += 1
+    
+    def get_errors_count(self):
+        """ Returns the number of error and critical messages logged so far (including the
+        recorded ones). """
+        errors_count = self.counters["error"] + self.counters["critical"]
+        if self.records is not None:
+            for record in self.records:
+                if record[0] in ["error", "critical"]:
+                    errors_count += 1
+        return errors_count
+    
+    def start_recording(self):
+        """ Messages logged from now on are stored instead of being logged. """
+        self.records = []
+    
+    def stop_recording(self):
+        """ Stops recording of messages and returns the recorded ones. """
+        records = self.records
+        self.records = None
+        if records is None:
+            records = []
+        return records
+    
+    def replay(self, records):
+        """ Logs a list of messages recorded with start_recording/stop_recording. 
+        Counters are updated accordingly. """
+        for level, name, message in records:
+            self.emit(level, name, message)
     
     def to_xml(self, output_file = None):
+        from lxml import etree as ET
+        import xml.dom.minidom
+        
         #Generate Logs root node and its information
         XML_root = ET.Element("Logs")
         for record in self.abstract_logs:
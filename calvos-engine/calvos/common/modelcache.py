@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+""" CalvOS Model Cache Module.
+
+Cache of the models parsed from the user input files of the project components (e.g., the
+Network_CAN object parsed from a CAN network spreadsheet). See get_model.
+
+Parsed models are stored in the user cache folder as binary snapshots (compressed pickle with a
+versioned header), one snapshot per component module and input file. A snapshot is used only
+if its key matches, the key covers:
+    - The calvos version and package path.
+    - The component module and its model schema version (MODEL_SCHEMA_VERSION constant of the
+      component module, to be incremented whenever the model classes change).
+    - The path and content of the input file.
+    - The effective parameters of the component (resolved definition parameters and the
+      parameters given in the project file).
+
+Messages logged while parsing a model are stored in its snapshot and logged again when the
+snapshot is used. Models whose parsing logged errors are not cached.
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import os
+import zlib
+import struct
+import pickle
+import hashlib
+import pathlib as pl
+
+import calvos.__version__ as calvos_version
+import calvos.common.logsys as lg
+import calvos.common.codegen as cg
+import calvos.common.registry as reg
+
+# --------------------------------------------------------------------------------------------------
+# Definitions for the logging system
+# --------------------------------------------------------------------------------------------------
+LOGGER_LABEL = "modelcache"
+
+log = lg.log_system
+log.add_logger(LOGGER_LABEL)
+
+def log_debug(message):
+    log.debug(LOGGER_LABEL, message)
+
+def log_info(message):
+    log.info(LOGGER_LABEL, message)
+
+def log_warn(message):
+    log.warning(LOGGER_LABEL, message)
+
+def log_error(message):
+    log.error(LOGGER_LABEL, message)
+
+def log_critical(message):
+    log.critical(LOGGER_LABEL, message)
+# --------------------------------------------------------------------------------------------------
+
+# Snapshot header: magic, snapshot format version, model schema version, key (sha256 digest)
+SNAPSHOT_MAGIC = b"CLVMODEL"
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<8sHI32s")
+SNAPSHOT_EXTENSION = ".clvm"
+
+#===================================================================================================
+def get_cache_folder():
+    """ Returns the folder of the model snapshots. """
+    return reg.get_cache_path() / "models"
+
+#===================================================================================================
+def is_enabled(project_obj):
+    """ Returns True if model caching is enabled for the given project. """
+    return project_obj.get_simple_param_val("common.project", "project_model_cache", True) \
+        is not False
+
+#===================================================================================================
+def get_model_key(project_obj, module, schema_version, input_file, params = {}):
+    """ Returns the key (sha256 digest, bytes) of the model of the given module parsed from the
+    given input file. """
+    hash_obj = hashlib.sha256()
+    hash_obj.update(("%s|%s|%s|%s|%s;" % (calvos_version.__version__, \
+                                          project_obj.paths.get("calvos_path", None), \
+                                          module, schema_version, \
+                                          os.path.abspath(str(input_file)))).encode())
+    cg.update_file_hash(hash_obj, input_file)
+
+    # Effective parameters
+    if module in project_obj.components_definitions:
+        simple_params = project_obj.components_definitions[module].simple_params
+        for param_id in sorted(simple_params):
+            hash_obj.update(("%s=%r;" % (param_id, simple_params[param_id].param_value)) \
+                            .encode())
+    for param_id in sorted(params):
+        hash_obj.update(("%s=%r;" % (param_id, params[param_id])).encode())
+
+    return hash_obj.digest()
+
+#===================================================================================================
+def get_snapshot_file(module, input_file):
+    """ Returns the snapshot file for the given module and input file. """
+    slot = hashlib.sha1(("%s|%s" % (module, os.path.abspath(str(input_file)))).encode())
+    return get_cache_folder() / (module + "_" + slot.hexdigest()[:16] + SNAPSHOT_EXTENSION)
+
+#===================================================================================================
+def read_snapshot(snapshot_file, schema_version, key):
+    """ Reads a model snapshot.
+
+    Returns
+    -------
+        tuple
+            (recorded log messages, model) or None if the snapshot doesn't exist, is invalid or
+            its schema version or key don't match the given ones.
+    """
+    try:
+        with open(snapshot_file, "rb") as f:
+            header = f.read(SNAPSHOT_HEADER.size)
+            if len(header) != SNAPSHOT_HEADER.size:
+                return None
+            magic, format_version, snapshot_schema, snapshot_key = \
+                SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or format_version != SNAPSHOT_FORMAT_VERSION \
+            or snapshot_schema != schema_version or snapshot_key != key:
+                return None
+            return pickle.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log_debug("Invalid model snapshot '%s'. Reason: %s" % (snapshot_file, e))
+        return None
+
+#===================================================================================================
+def write_snapshot(snapshot_file, schema_version, key, records, model):
+    """ Writes a model snapshot. Failures are logged but otherwise ignored. """
+    snapshot_file = pl.Path(snapshot_file)
+    temp_file = snapshot_file.with_name("%s.%s.tmp" % (snapshot_file.name, os.getpid()))
+    try:
+        data = zlib.compress(pickle.dumps((records, model), pickle.HIGHEST_PROTOCOL), 1)
+        snapshot_file.parent.mkdir(parents = True, exist_ok = True)
+        with open(temp_file, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, \
+                                         schema_version, key))
+            f.write(data)
+        os.replace(temp_file, snapshot_file)
+        log_debug("Model snapshot stored in '%s'." % snapshot_file)
+    except Exception as e:
+        log_debug("Model snapshot '%s' couldn't be stored. Reason: %s" % (snapshot_file, e))
+        if cg.file_exists(temp_file):
+            cg.delete_file(temp_file)
+
+#===================================================================================================
+def parse_recorded(parse_model):
+    """ Calls parse_model() recording the logged messages. Recorded messages are logged once
+    parse_model returns (or raises an exception).
+
+    Returns
+    -------
+        tuple
+            (recorded log messages, returned model)
+    """
+    # Keep the messages recorded by an enclosing recording (e.g., of a worker process)
+    outer_records = log.records
+    log.start_recording()
+    try:
+        model = parse_model()
+    finally:
+        records = log.stop_recording()
+        log.records = outer_records
+        log.replay(records)
+
+    return (records, model)
+
+#===================================================================================================
+def get_model(project_obj, module, schema_version, input_file, params, parse_model):
+    """ Returns the model of the given module parsed from the given input file, taken from the
+    cache if available.
+
+    The reference to the project of the model (attribute project_obj, if any) is not stored in
+    the snapshot, it is set to project_obj when the model is taken from the cache.
+
+    Parameters
+    ----------
+        project_obj : Project
+            Project the model belongs to.
+        module : str
+            Component module (e.g., "comgen.CAN").
+        schema_version : int
+            Version of the model classes of the module.
+        input_file : path
+            User input file the model is parsed from.
+        params : dict
+            Parameters given to the component in the project file.
+        parse_model : function
+            Called as parse_model() if there is no valid snapshot. Shall return the parsed
+            model (None if parsing failed).
+    """
+    if is_enabled(project_obj) is False or input_file is None \
+    or cg.file_exists(input_file) is False:
+        return parse_model()
+
+    key = get_model_key(project_obj, module, schema_version, input_file, params)
+    snapshot_file = get_snapshot_file(module, input_file)
+    snapshot = read_snapshot(snapshot_file, schema_version, key)
+    if snapshot is not None:
+        records, model = snapshot
+        if hasattr(model, "project_obj"):
+            model.project_obj = project_obj
+        log.replay(records)
+        log_info("Model of '%s' loaded from cache '%s'." % (input_file, snapshot_file))
+    else:
+        records, model = parse_recorded(parse_model)
+        errors = [record for record in records if record[0] in ["error", "critical"]]
+        if model is not None and len(errors) == 0:
+            if hasattr(model, "project_obj"):
+                model.project_obj = None
+                write_snapshot(snapshot_file, schema_version, key, records, model)
+                model.project_obj = project_obj
+            else:
+                write_snapshot(snapshot_file, schema_version, key, records, model)
+
+    return model
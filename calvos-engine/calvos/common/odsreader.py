@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+""" CalvOS ODS Reader Module.
+
+Streaming reader of ODS spreadsheets (user input files of calvos components).
+
+Rows are streamed from the content.xml file of the ODS package (lxml iterparse) and only the
+requested sheets are kept. Reading stops as soon as all the requested sheets were read. Cell
+values are converted the same way pyexcel does for ODS files, so parsers previously based on
+pyexcel get the same data:
+    - Each table row is a row of the sheet (repeated rows are read only once).
+    - Repeated cells (number-columns-repeated) are repeated, trailing empty cells are dropped
+      and rows are padded with "" to the width of the widest row.
+    - Float values without decimals are returned as int.
+
+Typical usage:
+    book = get_book(input_file, ["Messages"])
+    sheet = book["Messages"]
+    sheet.name_columns_by_row(0)
+    columns = sheet.column_indexes
+    for row in sheet:
+        name = row[columns["Message Name"]]
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import re
+import zipfile
+import datetime
+
+import calvos.common.logsys as lg
+
+# --------------------------------------------------------------------------------------------------
+# Definitions for the logging system
+# --------------------------------------------------------------------------------------------------
+LOGGER_LABEL = "odsreader"
+
+log = lg.log_system
+log.add_logger(LOGGER_LABEL)
+
+def log_debug(message):
+    log.debug(LOGGER_LABEL, message)
+
+def log_info(message):
+    log.info(LOGGER_LABEL, message)
+
+def log_warn(message):
+    log.warning(LOGGER_LABEL, message)
+
+def log_error(message):
+    log.error(LOGGER_LABEL, message)
+
+def log_critical(message):
+    log.critical(LOGGER_LABEL, message)
+# --------------------------------------------------------------------------------------------------
+
+# ODF namespaces
+OFFICE_NS = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+TABLE_TAG = "{%s}table" % TABLE_NS
+ROW_TAG = "{%s}table-row" % TABLE_NS
+CELL_TAG = "{%s}table-cell" % TABLE_NS
+TABLE_NAME_ATTR = "{%s}name" % TABLE_NS
+REPEAT_ATTR = "{%s}number-columns-repeated" % TABLE_NS
+VALUE_TYPE_ATTR = "{%s}value-type" % OFFICE_NS
+CURRENCY_ATTR = "{%s}currency" % OFFICE_NS
+P_TAG = "{%s}p" % TEXT_NS
+SPACE_TAG = "{%s}s" % TEXT_NS
+TAB_TAG = "{%s}tab" % TEXT_NS
+LINE_BREAK_TAG = "{%s}line-break" % TEXT_NS
+SPACE_COUNT_ATTR = "{%s}c" % TEXT_NS
+ANNOTATION_TAG = "{%s}annotation" % OFFICE_NS
+
+# Attribute holding the value of a cell per value type
+VALUE_ATTRS = {"float" : "{%s}value" % OFFICE_NS, \
+               "percentage" : "{%s}value" % OFFICE_NS, \
+               "currency" : "{%s}value" % OFFICE_NS, \
+               "date" : "{%s}date-value" % OFFICE_NS, \
+               "time" : "{%s}time-value" % OFFICE_NS, \
+               "timedelta" : "{%s}time-value" % OFFICE_NS, \
+               "boolean" : "{%s}boolean-value" % OFFICE_NS}
+
+TIME_REGEX = re.compile(r"PT(\d+)H(\d+)M(\d+)S")
+
+#===================================================================================================
+def date_value(value):
+    """ Converts an ODS date value into a date or datetime object. """
+    return_value = None
+    try:
+        if len(value) == 10:
+            return_value = datetime.datetime.strptime(value, "%Y-%m-%d").date()
+        elif len(value) == 19:
+            return_value = datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S")
+        elif len(value) > 19:
+            return_value = datetime.datetime.strptime(value[0:26], "%Y-%m-%dT%H:%M:%S.%f")
+    except ValueError:
+        pass
+    if return_value is None:
+        raise ValueError("Bad date value %s" % value)
+
+    return return_value
+
+#===================================================================================================
+def time_value(value):
+    """ Converts an ODS time value (e.g., PT10H30M00S) into a time or timedelta object (if hours
+    exceed a day). Returns None if value is not recognized. """
+    return_value = None
+    match = TIME_REGEX.match(value)
+    if match is not None:
+        hours, minutes, seconds = (int(group) for group in match.groups())
+        if hours < 24:
+            return_value = datetime.time(hours, minutes, seconds)
+        else:
+            return_value = datetime.timedelta(hours = hours, minutes = minutes, \
+                                              seconds = seconds)
+
+    return return_value
+
+#===================================================================================================
+def float_value(value):
+    """ Converts an ODS float value into float, or int if it has no decimals. """
+    return_value = float(value)
+    if return_value.is_integer():
+        return_value = int(return_value)
+
+    return return_value
+
+#===================================================================================================
+def boolean_value(value):
+    """ Converts an ODS boolean value into True/False. Other values are returned unchanged. """
+    if value == "true":
+        return True
+    elif value == "false":
+        return False
+    return value
+
+VALUE_CONVERTERS = {"float" : float_value, \
+                    "percentage" : float, \
+                    "date" : date_value, \
+                    "time" : time_value, \
+                    "timedelta" : time_value, \
+                    "boolean" : boolean_value}
+
+#===================================================================================================
+def get_element_text(element):
+    """ Returns the text of a text element (e.g., text:p) expanding spaces, tabs and
+    line-breaks. """
+    text = [element.text or ""]
+    for child in element:
+        if child.tag == SPACE_TAG:
+            text.append(" " * int(child.get(SPACE_COUNT_ATTR, 1)))
+        elif child.tag == TAB_TAG:
+            text.append("\t")
+        elif child.tag == LINE_BREAK_TAG:
+            text.append("\n")
+        elif isinstance(child.tag, str):
+            text.append(get_element_text(child))
+        text.append(child.tail or "")
+
+    return "".join(text)
+
+#===================================================================================================
+def get_cell_text(cell):
+    """ Returns the text of a cell (paragraphs separated by new lines, annotations excluded). """
+    return "\n".join(get_element_text(paragraph) for paragraph in cell.iter(P_TAG) \
+                     if paragraph.getparent().tag != ANNOTATION_TAG)
+
+#===================================================================================================
+def get_cell_value(cell):
+    """ Returns the value of a table cell element. """
+    value_type = cell.get(VALUE_TYPE_ATTR, None)
+    if value_type == "currency":
+        return_value = cell.get(VALUE_ATTRS[value_type], None)
+        currency = cell.get(CURRENCY_ATTR, None)
+        if currency:
+            return_value = return_value + " " + currency
+    elif value_type in VALUE_CONVERTERS:
+        return_value = VALUE_CONVERTERS[value_type](cell.get(VALUE_ATTRS[value_type], None))
+    else:
+        return_value = get_cell_text(cell)
+
+    return return_value
+
+#===================================================================================================
+def get_row_values(row):
+    """ Returns the list of values of a table row element (trailing empty cells dropped). """
+    values = []
+    # Empty cells are kept pending as runs of [value, count] until a non-empty cell is found
+    pending = []
+    for cell in row.iter(CELL_TAG):
+        value = get_cell_value(cell)
+        repeat = int(cell.get(REPEAT_ATTR, 1))
+        if value is None or value == "":
+            pending.append((value, repeat))
+        else:
+            for pending_value, count in pending:
+                values.extend([pending_value] * count)
+            pending = []
+            values.extend([value] * repeat)
+
+    return values
+
+#===================================================================================================
+def make_names_unique(names):
+    """ Returns the given column names stripped and with duplicated names suffixed with the
+    number of occurrences (e.g., Name, Name-1). """
+    occurrences = {}
+    unique_names = []
+    for name in names:
+        name = str(name).strip()
+        if name in occurrences:
+            occurrences[name] += 1
+            unique_names.append("%s-%d" % (name, occurrences[name]))
+        else:
+            occurrences.update({name : 0})
+            unique_names.append(name)
+
+    return unique_names
+
+#===================================================================================================
+class OdsSheet():
+    """ Sheet of an ODS spreadsheet. Rows are tuples of values all with the same length. """
+
+    def __init__(self, name, rows):
+        """ Class constructor.
+
+        Parameters
+        ----------
+            name : str
+                Name of the sheet.
+            rows : list
+                List of rows, each one a list of cell values.
+        """
+        self.name = name
+        width = max((len(row) for row in rows), default = 0)
+        self.rows = [tuple(row) + ("",) * (width - len(row)) for row in rows]
+        self.colnames = []
+        self.column_indexes = {}
+
+    #===============================================================================================
+    def name_columns_by_row(self, row_index):
+        """ Uses the values of the given row as column names. The row is removed from the sheet.
+
+        Column names are available in colnames (list) and column_indexes (dictionary
+        {column name : column index}).
+        """
+        self.colnames = make_names_unique(self.rows[row_index])
+        del self.rows[row_index]
+        self.column_indexes = {}
+        for idx, column_name in enumerate(self.colnames):
+            self.column_indexes.setdefault(column_name, idx)
+
+    #===============================================================================================
+    def number_of_rows(self):
+        return len(self.rows)
+
+    #===============================================================================================
+    def __getitem__(self, row_column):
+        """ Returns the value of the cell at the given (row, column) position. """
+        row, column = row_column
+        return self.rows[row][column]
+
+    #===============================================================================================
+    def __iter__(self):
+        return iter(self.rows)
+
+    #===============================================================================================
+    def __len__(self):
+        return len(self.rows)
+
+#===================================================================================================
+class OdsBook():
+    """ ODS spreadsheet with the sheets read from it. """
+
+    def __init__(self, file_name, sheet_names = None):
+        """ Class constructor. Reads the given sheets of the spreadsheet.
+
+        Parameters
+        ----------
+            file_name : path
+                ODS spreadsheet.
+            sheet_names : list
+                Names of the sheets to read. All sheets are read if None.
+        """
+        self.file_name = str(file_name)
+        self.sheets = {}
+        self.read_sheets(sheet_names)
+
+    #===============================================================================================
+    def read_sheets(self, sheet_names = None):
+        """ Streams the content of the spreadsheet keeping the rows of the given sheets (all
+        sheets if None). """
+        from lxml import etree as ET
+
+        pending_sheets = None
+        if sheet_names is not None:
+            pending_sheets = set(sheet_names)
+        with zipfile.ZipFile(self.file_name) as ods_file:
+            with ods_file.open("content.xml") as content:
+                sheet_name = None
+                rows = None
+                for event, element in ET.iterparse(content, events = ("start", "end"), \
+                                                   tag = (TABLE_TAG, ROW_TAG)):
+                    if element.tag == TABLE_TAG:
+                        if event == "start":
+                            sheet_name = element.get(TABLE_NAME_ATTR, None)
+                            if pending_sheets is None or sheet_name in pending_sheets:
+                                rows = []
+                        else:
+                            if rows is not None:
+                                self.sheets.update({sheet_name : OdsSheet(sheet_name, rows)})
+                                log_debug("Read sheet '%s' (%s rows) of '%s'." \
+                                          % (sheet_name, len(rows), self.file_name))
+                                if pending_sheets is not None:
+                                    pending_sheets.discard(sheet_name)
+                            sheet_name = None
+                            rows = None
+                            element.clear()
+                            if pending_sheets is not None and len(pending_sheets) == 0:
+                                break
+                    elif event == "end":
+                        if rows is not None:
+                            rows.append(get_row_values(element))
+                        # Free the memory of the already processed rows
+                        element.clear()
+                        while element.getprevious() is not None:
+                            del element.getparent()[0]
+
+        if pending_sheets is not None and len(pending_sheets) > 0:
+            log_debug("Sheet(s) %s not found in '%s'." % (sorted(pending_sheets), self.file_name))
+
+    #===============================================================================================
+    def sheet_names(self):
+        return list(self.sheets.keys())
+
+    #===============================================================================================
+    def __getitem__(self, sheet_name):
+        """ Returns the given sheet (read from the spreadsheet if not yet read). """
+        if sheet_name not in self.sheets:
+            self.read_sheets([sheet_name])
+        return self.sheets[sheet_name]
+
+    #===============================================================================================
+    def __contains__(self, sheet_name):
+        return sheet_name in self.sheets
+
+#===================================================================================================
+def get_book(file_name, sheet_names = None):
+    """ Returns an OdsBook object with the given sheets (all if None) of the given ODS file. """
+    return OdsBook(file_name, sheet_names)
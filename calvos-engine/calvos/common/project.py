@@ -8,7 +8,6 @@ Module for managing a calvos project.
 @license:    GPL v3
 """
 __version__ = '0.0.1'
-from odf import element
 __date__ = '2020-11-12'
 __updated__ = '2020-11-12'
 
@@ -20,14 +19,25 @@ import importlib
 import json
 import re
 import pickle
+import hashlib
+import sys
+import concurrent.futures
 
+import calvos.__version__ as calvos_version
 import calvos.common.codegen as cg
+import calvos.common.cogtemplates as ctpl
+import calvos.common.workers as workers
+import calvos.common.registry as reg
 import calvos.common.logsys as lg
 import calvos.common.general as grl
 
 
 IN_TYPE_XML = 0
 IN_TYPE_ODS = 1
+IN_TYPE_DBC = 2
+
+# Format version of the generation manifest
+MANIFEST_VERSION = 1
 
 # -----------------------------------------------------------------------------
 # Definitions for the logging system
@@ -92,7 +102,12 @@ class Project:
             self.project_path = None
             self.paths = {}
         
-        self.components_definitions = {} #Expected dict {comp_type : CompDefinition object}
+        # {comp_type : CompDefinition object}, definitions are loaded at first access.
+        self.components_definitions = self.CompDefinitions(self)
+        # {comp_type : {"xml" : definition file, "instances" : list, "depends" : list}}
+        self.component_registry = {}
+        # True once the project paths have been resolved
+        self.paths_resolved = False
         self.components = [] #List of Component objects
         
         self.params = {} # param objects {param_id : param value}
@@ -138,6 +153,13 @@ class Project:
             if instances is not None:
                 comp_def_ojb.instances = instances
         
+        # Load dependencies (components to be processed before this one)
+        dependencies = XML_root.get("depends", None)
+        if dependencies is not None:
+            dependencies = grl.process_simple_param("list",dependencies)
+            if dependencies is not None:
+                comp_def_ojb.dependencies = dependencies
+        
         # Load component definition inputs if any
         for input_file in XML_root.findall("./clv:Inputs/clv:Input", nsmap):
             data_input = str(input_file.text).strip('"')
@@ -239,32 +261,15 @@ class Project:
             If at least one component is found returns a dictionary with following format:
             {component_name1 : component_xml_path1, component_name2 : component_xml_path2, ...}
             If no component is found then returns an empty dictionary.
+            
+        Components are taken from the component registry (see calvos.common.registry) which is
+        cached between runs.
         """
         
+        self.component_registry = reg.load_registry(_calvos_path)
         calvos_components = {} # {name : xml_path}
-        for path in sorted(_calvos_path.rglob('*.py')):
-            module_name = path.stem
-            xml_path = path.with_suffix(".xml")
-            # Check if corresponding xml file is found
-            if xml_path.is_file() is True:
-                # Python module is a calvos component, now gather its module string
-                calvos_path_found = False
-                module_name_list = []
-                module_name_string = ""
-                for parent in xml_path.parents:
-                    if parent.name == "calvos":
-                        calvos_path_found = True
-                        break;
-                    else:
-                        module_name_list.append(str(parent.name))
-                if calvos_path_found is True:
-                    # Form module name string
-                    for piece in module_name_list:
-                        module_name_string = piece + "." + module_name_string
-                    module_name_string += module_name
-                    calvos_components.update({module_name_string : xml_path})
-                    log_debug("Found component: '%s', XML: '%s'" \
-                              % (module_name_string, calvos_components[module_name_string])) 
+        for component_type, registry_entry in self.component_registry.items():
+            calvos_components.update({component_type : cg.string_to_path(registry_entry["xml"])})
         
         return calvos_components
     
@@ -293,22 +298,12 @@ class Project:
         # A calvos component shall have a module.py together with a module.xml at same path
         calvos_components = self.find_components(self.calvos_path)
         
-        # Load parameters of found components
-        # -----------------------------------
-        for comp_name, comp_xml in calvos_components.items():
-            # Create component definition object
-            self.components_definitions.update({comp_name : self.CompDefinition(comp_name)})
-            # Parse XML with component definitions
-            XML_tree = ET.parse(comp_xml)
-            XML_root = XML_tree.getroot()
-            self.load_component_definitions(XML_root, self.components_definitions[comp_name]) 
-        
-        if success is True:
-            log_info("============== Validating parameters' default data ==============")
-            valid = self.validate_simple_params_defaults()
-            if valid is False:
-                log_warn("Invalid data found during parameters validation.")
-                #TODO. determine wheter or not to continue processing, success = True/False? 
+        # Register found components, their definitions (parameters) are loaded at first use
+        # -----------------------------------------------------------------------------------
+        for comp_name in calvos_components.keys():
+            self.components_definitions.register(comp_name)
+        # Project's own definitions
+        self.components_definitions[self.module]
         
         if success is True:
             # Load project components
@@ -329,15 +324,17 @@ class Project:
                 
                     component_name = str(component.findtext("Name"))
                     component_desc = str(component.findtext("Desc"))
-                    component_input_type = str(component.find("Input").get("type"))
-                    if component_input_type == "ods":
+                    input_type_name = str(component.find("Input").get("type"))
+                    if input_type_name == "ods":
                         component_input_type = IN_TYPE_ODS
-                    elif component_input_type == "xml":
+                    elif input_type_name == "xml":
                         component_input_type = IN_TYPE_XML
+                    elif input_type_name == "dbc":
+                        component_input_type = IN_TYPE_DBC
                     else:
                         component_input_type = None
                         log_warn('Invalid input type "%s" for component "%s"' \
-                                  % (component_input_type, component_name))
+                                  % (input_type_name, component_name))
                         
                     # Get input file, remove trailing/leading quotes
                     component_input = str(component.findtext("Input")).strip('"')
@@ -367,28 +364,28 @@ class Project:
             
             # Check if mandatory components are missing from project. In such case use default
             # input data.
-            for component_def in self.components_definitions.values():
-                if component_def.instances is not None \
-                and len(component_def.instances) == 1 \
-                and component_def.instances[0] == 1:
+            for component_type, registry_entry in self.component_registry.items():
+                instances = registry_entry["instances"]
+                if instances is not None \
+                and len(instances) == 1 \
+                and instances[0] == 1:
                 # Component is mandatory. Check if user provided one
                     user_component_found = False
                     for component in self.components:
-                        if component.type == component_def.type:
+                        if component.type == component_type:
                             # Component found
                             user_component_found = True
                             break
                     
                     if user_component_found is False:
                         # Look for default data and load it if found
-                        default_data_path = self.get_component_default_data_file(component_def.type)
+                        default_data_path = self.get_component_default_data_file(component_type)
                         if cg.file_exists(default_data_path):
                             # Load component from default data file
                             log_info(("Loading default data for mandatory component '%s' from " \
-                                      + "file '%s'.") % (component_def.type,default_data_path))
-                            component_type = component_def.type 
-                            component_name = "Default: " + str(component_def.type)
-                            component_desc = "Default: " + str(component_def.type)
+                                      + "file '%s'.") % (component_type,default_data_path))
+                            component_name = "Default: " + str(component_type)
+                            component_desc = "Default: " + str(component_type)
                             component_input_type = IN_TYPE_ODS
                             component_input = default_data_path
                             component_params = {}
@@ -400,10 +397,56 @@ class Project:
                             log_info("Default data loaded for component '%s'." % component_name)
             log_info('Loading project components completed.')
             
+            # Load definitions of the used components (and of the ones they depend on)
+            for component in self.components:
+                self.load_definition_and_dependencies(component.type)
+            
+            log_info("============== Validating parameters' default data ==============")
+            valid = self.validate_simple_params_defaults()
+            if valid is False:
+                log_warn("Invalid data found during parameters validation.")
+                #TODO. determine wheter or not to continue processing, success = True/False? 
+            
             log_info("============== Resolving project paths. ==============")   
             self.resolve_paths()
             log_info("Paths expansion completed.") 
     
+    #===============================================================================================
+    def load_definition(self, component_type):
+        """ Loads the definition (parameters, inputs, etc.) of the given component type from
+        its XML file. Called by CompDefinitions at the first access to the definition.
+        
+        If the project paths were already resolved, the path parameters of the loaded
+        definition are resolved and its parameters validated too.
+        
+        Returns
+        -------
+            CompDefinition object
+        """
+        comp_def = self.CompDefinition(component_type)
+        dict.__setitem__(self.components_definitions, component_type, comp_def)
+        
+        # Parse XML with component definitions
+        XML_tree = ET.parse(self.component_registry[component_type]["xml"])
+        XML_root = XML_tree.getroot()
+        self.load_component_definitions(XML_root, comp_def)
+        
+        if self.paths_resolved is True:
+            self.validate_given_simple_params(component_type, comp_def.simple_params.values())
+            self.resolve_definition_paths(comp_def)
+        
+        return comp_def
+    
+    #===============================================================================================
+    def load_definition_and_dependencies(self, component_type):
+        """ Loads the definition of the given component type and of the components it depends on.
+        """
+        comp_def = self.components_definitions[component_type]
+        for dependency in comp_def.dependencies:
+            if dependency in self.components_definitions \
+            and self.components_definitions.is_loaded(dependency) is False:
+                self.load_definition_and_dependencies(dependency)
+    
     #===============================================================================================    
     def load_component_data(self, component):
         """ Loads the data related to the given component and returns and object. """
@@ -447,18 +490,119 @@ class Project:
     #===============================================================================================
     def process_project(self):
         """ Processes all defined components for this project. 
-        load_project function shall be called before this one. """
+        load_project function shall be called before this one.
+        
+        If more than one job is configured (parameter project_jobs), components are processed
+        in stages according to their dependencies (see get_components_stages) and the
+        components of a same stage are loaded and generated concurrently in worker processes.
+        
+        If incremental mode is enabled (parameter project_incremental), components whose
+        inputs didn't change since the last generation (according to the manifest in the
+        working directory) are skipped and their previous outputs are kept. Skipped components
+        are still loaded if a generated component depends on them.
+        """
         log_info("============== Processing project components. ==============")
-        for component in self.components:
+        
+        # Determine components to be skipped in incremental mode
+        components_hashes = self.get_components_hashes()
+        manifest = self.load_manifest()
+        skipped = []
+        if self.get_simple_param_val(self.module, "project_incremental", False) is True:
+            skipped = self.get_unchanged_components(components_hashes, manifest)
+        load_only = []
+        for component in skipped:
+            for dependent in self.components:
+                if dependent not in skipped and component.type in \
+                self.components_definitions[dependent.type].dependencies:
+                    load_only.append(component)
+                    break
+        for component in skipped:
+            log_info('-------------- Inputs of component "%s" of type "%s" unchanged. Code ' \
+                     'generation skipped.' % (component.name, component.type))
+        
+        jobs = self.get_simple_param_val(self.module, "project_jobs", 1)
+        if jobs is not None and jobs > 1:
+            for stage in self.get_components_stages():
+                stage = [component for component in stage \
+                         if component not in skipped or component in load_only]
+                stage_load_only = [component for component in stage if component in load_only]
+                for component in stage_load_only:
+                    self.load_component(component)
+                stage = [component for component in stage if component not in load_only]
+                if len(stage) > 1:
+                    self.process_components_concurrently(stage, jobs)
+                elif len(stage) > 0:
+                    self.process_components(stage)
+        else:
+            self.process_components([component for component in self.components \
+                                     if component not in skipped or component in load_only], \
+                                    load_only)
+        
+        # Store manifest of this generation
+        self.save_manifest(components_hashes, manifest, skipped)
+        
+        # Report compile/render timings of the used templates
+        ctpl.log_timings()
+    
+    #===============================================================================================
+    def load_component(self, component):
+        """ Loads user input of the given component, logging any failure. """
+        errors_count = lg.log_system.get_errors_count()
+        try:
+            log_info('-------------- Loading data for component "%s" of type "%s".' \
+                     % (component.name, component.type))
+            # Loads user input and creates a component specific object. Such object will be
+            # set in component.component_object
+            self.load_component_data(component)
+        except Exception as e:
+            log_error('Failed to load user input for component "%s". Reason: %s' \
+                      % (component.name, e) )
+        if lg.log_system.get_errors_count() != errors_count:
+            component.failed = True
+    
+    #===============================================================================================
+    def generate_component(self, component):
+        """ Generates code of the given component, logging any failure.
+        Files generated for the component are stored in component.output_files. """
+        errors_count = lg.log_system.get_errors_count()
+        outputs_start = len(ctpl.output_files)
+        try:
+            log_info('-------------- Generating code for component "%s" of type "%s".' \
+                     % (component.name, component.type))
+            self.generate_component_code(component, component.params)
+            
+        except Exception as e:
+            log_error('Failed to generate code for component "%s". Reason: %s' \
+                      % (component.name, e) )
+        if lg.log_system.get_errors_count() != errors_count:
+            component.failed = True
+        component.output_files = ctpl.output_files[outputs_start:]
+        component.generated = True
+    
+    #===============================================================================================
+    def create_project_pickle(self):
+        """ Creates a pickle of all project object to be available for source generators
+        (only if models are passed to templates through pickle files).
+        
+        Returns the path of the created pickle file or None if not created. """
+        pickle_full_file_name = None
+        if self.pickle_models() is True:
+            pickle_full_file_name = self.get_work_file_path(self.module, "project_pickle")
             try:
-                log_info('-------------- Loading data for component "%s" of type "%s".' \
-                         % (component.name, component.type))
-                # Loads user input and creates a component specific object. Such object will be
-                # set in component.component_object
-                self.load_component_data(component)
+                with open(pickle_full_file_name, 'wb') as f:
+                    pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
             except Exception as e:
-                log_error('Failed to load user input for component "%s". Reason: %s' \
-                          % (component.name, e) )
+                    print('Failed to create pickle file %s. Reason: %s' \
+                          % (pickle_full_file_name, e))
+        
+        return pickle_full_file_name
+    
+    #===============================================================================================
+    def process_components(self, components, load_only = []):
+        """ Loads and then generates the given components, one after the other. Components in
+        list load_only are only loaded. """
+        for component in components:
+            self.load_component(component)
 
         log_info("============== Generating components code. ==============")
         
@@ -474,29 +618,293 @@ class Project:
 #        for string in test_str:
 #            self.expand_all_tokens(string)
   
-        # Create a pickle of all project object to be available for source generators.
-        pickle_full_file_name = self.get_simple_param_val(self.module, "project_path_working") / \
-            self.get_simple_param_val(self.module, "project_pickle")
+        pickle_full_file_name = self.create_project_pickle()
+        
+        for component in components:
+            if component not in load_only:
+                self.generate_component(component)
+        
+        # Delete pickle file
+        if pickle_full_file_name is not None:
+            cg.delete_file(pickle_full_file_name)
+    
+    #===============================================================================================
+    def process_components_concurrently(self, components, jobs):
+        """ Loads and generates the given (independent) components across a pool of worker
+        processes.
+        
+        Each worker gets a copy of this project. Logs and outputs of the workers are replayed
+        in the order of the given components list and the loaded component objects are
+        attached back to this project. If the pool can't be used, remaining components are
+        processed in this process.
+        """
+        jobs = min(jobs, len(components))
+        log_info("============== Processing %s components with up to %s worker processes. " \
+                 "==============" % (len(components), jobs))
+        
+        pickle_full_file_name = self.create_project_pickle()
+        
+        processed = 0
         try:
-            with open(pickle_full_file_name, 'wb') as f:
-                pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+            shared_data_pickle = pickle.dumps((cg.get_module_state(), {"cog_proj_obj" : self}), \
+                                              pickle.HIGHEST_PROTOCOL)
+            with concurrent.futures.ProcessPoolExecutor(max_workers = jobs, \
+                    initializer = workers.init_worker, \
+                    initargs = (lg.log_system.level, shared_data_pickle)) as executor:
+                futures = [executor.submit(workers.component_job, \
+                                           self.components.index(component)) \
+                           for component in components]
+                # Collect results in submission order to get deterministic logs.
+                for component, future in zip(components, futures):
+                    component_object, records, job_stdout, job_stderr, timings, \
+                        output_files = future.result()
+                    if job_stdout != "":
+                        print(job_stdout, end = "")
+                    if job_stderr != "":
+                        print(job_stderr, end = "", file = sys.stderr)
+                    errors_count = lg.log_system.get_errors_count()
+                    lg.log_system.replay(records)
+                    if lg.log_system.get_errors_count() != errors_count:
+                        component.failed = True
+                    ctpl.output_files.extend(output_files)
+                    component.output_files = output_files
+                    component.generated = True
+                    for template_key, template_timings in timings.items():
+                        ctpl.add_timings(template_key, *template_timings)
+                    # Attach loaded object to this project
+                    if hasattr(component_object, "project_obj"):
+                        component_object.project_obj = self
+                    component.component_object = component_object
+                    processed += 1
         except Exception as e:
-                print('Failed to create pickle file %s. Reason: %s' \
-                      % (pickle_full_file_name, e))
+            log_warn("Processing components with %s worker processes failed, processing " \
+                     "remaining components in the main process. Reason: %s" % (jobs, e))
         
+        for component in components[processed:]:
+            self.load_component(component)
+            self.generate_component(component)
         
-        for component in self.components:
+        # Delete pickle file
+        if pickle_full_file_name is not None:
+            cg.delete_file(pickle_full_file_name)
+    
+    #===============================================================================================
+    def get_component_key(self, component):
+        """ Returns a string identifying the given component in the generation manifest. """
+        return "%s|%s|%s" % (component.type, component.name, component.input_file_path)
+    
+    #===============================================================================================
+    def get_component_hash(self, component, dependencies_hashes = []):
+        """ Returns a hash of everything the generation of the given component depends on.
+        
+        Hash considers the calvos version, the component's input file, its resolved parameters,
+        its python module and definition, its templates and the hashes of the components it
+        depends on (given in dependencies_hashes).
+        """
+        hash_obj = hashlib.sha256()
+        hash_obj.update(str(calvos_version.__version__).encode())
+        hash_obj.update(self.get_component_key(component).encode())
+        
+        # User input
+        if component.input_file_path is not None and cg.file_exists(component.input_file_path):
+            cg.update_file_hash(hash_obj, component.input_file_path)
+        
+        # Resolved parameters
+        if component.type in self.components_definitions:
+            simple_params = self.components_definitions[component.type].simple_params
+            for param_id in sorted(simple_params):
+                hash_obj.update(("%s=%r;" % (param_id, simple_params[param_id].param_value)) \
+                                .encode())
+        for param_id in sorted(component.params):
+            hash_obj.update(("%s=%r;" % (param_id, component.params[param_id])).encode())
+        
+        # Component's module, definition and templates
+        root_path = self.get_component_root_path(component.type)
+        module_name = component.type.split(".")[-1]
+        for module_file in [root_path / (module_name + ".py"), root_path / (module_name + ".xml")]:
+            if cg.file_exists(module_file):
+                cg.update_file_hash(hash_obj, module_file)
+        gen_path = self.get_component_gen_path(component.type)
+        if cg.folder_exists(gen_path):
+            for template_file in sorted(gen_path.rglob("*")):
+                if template_file.is_file() and "__pycache__" not in template_file.parts:
+                    hash_obj.update(str(template_file.relative_to(gen_path)).encode())
+                    cg.update_file_hash(hash_obj, template_file)
+        
+        # Dependencies
+        for dependency_hash in dependencies_hashes:
+            hash_obj.update(dependency_hash.encode())
+        
+        return hash_obj.hexdigest()
+    
+    #===============================================================================================
+    def get_components_hashes(self):
+        """ Returns a dictionary {Component object : hash} for all project components. """
+        components_hashes = {}
+        for stage in self.get_components_stages():
+            for component in stage:
+                dependencies = []
+                if component.type in self.components_definitions:
+                    dependencies = self.components_definitions[component.type].dependencies
+                dependencies_hashes = [components_hashes[dependency] \
+                                       for dependency in components_hashes \
+                                       if dependency.type in dependencies]
+                components_hashes.update({component : \
+                    self.get_component_hash(component, dependencies_hashes)})
+        
+        return components_hashes
+    
+    #===============================================================================================
+    def load_manifest(self):
+        """ Loads the generation manifest of the previous run (if any).
+        
+        Returns a dictionary {component key : {"hash" : str, "outputs" : list}}. Manifests of
+        other format versions are ignored.
+        """
+        manifest = {}
+        manifest_file = self.get_work_file_path(self.module, "project_manifest")
+        if manifest_file is not None and cg.file_exists(manifest_file):
             try:
-                log_info('-------------- Generating code for component "%s" of type "%s".' \
-                         % (component.name, component.type))
-                self.generate_component_code(component, component.params)
-                
+                with open(manifest_file, "r") as f:
+                    manifest_data = json.load(f)
+                if manifest_data.get("manifest_version", None) == MANIFEST_VERSION:
+                    manifest = manifest_data.get("components", {})
+                else:
+                    log_info("Ignoring generation manifest of different version.")
             except Exception as e:
-                log_error('Failed to generate code for component "%s". Reason: %s' \
-                          % (component.name, e) )
+                log_warn("Failed to read generation manifest '%s'. Reason: %s" \
+                         % (manifest_file, e))
         
-        # Delete pickle file
-        cg.delete_file(pickle_full_file_name)
+        return manifest
+    
+    #===============================================================================================
+    def get_unchanged_components(self, components_hashes, manifest):
+        """ Returns a list of the components whose hash matches the one in the manifest and
+        whose outputs still exist.
+        
+        Components sharing an output file with a component to be generated are not considered
+        unchanged, so that shared files are written in the same order as in a full generation.
+        """
+        unchanged = []
+        out_path = self.get_simple_param_val(self.module, "project_path_out")
+        for component in self.components:
+            entry = manifest.get(self.get_component_key(component), None)
+            if entry is not None and entry.get("hash", None) == components_hashes[component]:
+                outputs_exist = True
+                for output_file in entry.get("outputs", []):
+                    if cg.file_exists(out_path / output_file) is False:
+                        outputs_exist = False
+                        break
+                if outputs_exist is True:
+                    unchanged.append(component)
+        
+        changed_outputs = None
+        while changed_outputs is None or len(unchanged) != unchanged_count:
+            unchanged_count = len(unchanged)
+            changed_outputs = set()
+            for component in self.components:
+                if component not in unchanged:
+                    entry = manifest.get(self.get_component_key(component), {})
+                    changed_outputs.update(entry.get("outputs", []))
+            unchanged = [component for component in unchanged \
+                         if changed_outputs.isdisjoint( \
+                            manifest[self.get_component_key(component)]["outputs"])]
+        
+        return unchanged
+    
+    #===============================================================================================
+    def save_manifest(self, components_hashes, old_manifest, skipped):
+        """ Stores the generation manifest in the working directory.
+        
+        Generated components are stored only if their generation had no errors. Entries of
+        skipped components are kept. Outputs of the old manifest which are no longer generated
+        are deleted.
+        """
+        manifest_file = self.get_work_file_path(self.module, "project_manifest")
+        if manifest_file is None:
+            return
+        
+        out_path = self.get_simple_param_val(self.module, "project_path_out")
+        manifest = {}
+        for component in self.components:
+            component_key = self.get_component_key(component)
+            if component in skipped:
+                manifest.update({component_key : old_manifest[component_key]})
+            elif component.generated is True and component.failed is False:
+                outputs = []
+                for output_file in component.output_files:
+                    output_file = cg.string_to_path(output_file)
+                    try:
+                        output_file = output_file.relative_to(out_path)
+                    except ValueError:
+                        pass
+                    outputs.append(output_file.as_posix())
+                manifest.update({component_key : {"hash" : components_hashes[component], \
+                                                  "outputs" : outputs}})
+        
+        # Delete outputs no longer generated
+        current_outputs = set()
+        for component in self.components:
+            for output_file in component.output_files:
+                current_outputs.add(cg.string_to_path(output_file).resolve())
+        for entry in manifest.values():
+            for output_file in entry["outputs"]:
+                current_outputs.add((out_path / output_file).resolve())
+        for entry in old_manifest.values():
+            for output_file in entry.get("outputs", []):
+                output_file = (out_path / output_file).resolve()
+                if output_file not in current_outputs and cg.file_exists(output_file):
+                    log_info("Deleting output file no longer generated: '%s'" % output_file)
+                    cg.delete_file(output_file)
+        
+        try:
+            with open(manifest_file, "w") as f:
+                json.dump({"manifest_version" : MANIFEST_VERSION, \
+                           "calvos_version" : calvos_version.__version__, \
+                           "components" : manifest}, f, indent = 1)
+        except Exception as e:
+            log_warn("Failed to write generation manifest '%s'. Reason: %s" % (manifest_file, e))
+    
+    #===============================================================================================
+    def get_components_stages(self):
+        """ Returns the project components grouped in stages according to their dependencies.
+        
+        Components of a stage only depend on components of previous stages, e.g., all
+        components depending on "common.codegen" (as declared in the "depends" attribute of
+        their definition) are placed in a stage after the one of the "common.codegen" component.
+        Order of the components within a stage is the same as in the project.
+        
+        Returns
+        -------
+            list
+                List of stages, each one being a list of Component objects.
+        """
+        stages = []
+        pending = list(self.components)
+        while len(pending) > 0:
+            pending_types = [component.type for component in pending]
+            stage = []
+            for component in pending:
+                dependencies = []
+                if component.type in self.components_definitions:
+                    dependencies = self.components_definitions[component.type].dependencies
+                ready = True
+                for dependency in dependencies:
+                    if dependency != component.type and dependency in pending_types:
+                        ready = False
+                        break
+                if ready is True:
+                    stage.append(component)
+            
+            if len(stage) == 0:
+                log_warn("Circular dependencies found between components: %s" \
+                         % str(pending_types))
+                stage = pending
+            
+            stages.append(stage)
+            pending = [component for component in pending if component not in stage]
+        
+        return stages
     
     #===============================================================================================
     def validate_given_simple_params(self, component, simple_params_list):
@@ -531,7 +939,7 @@ class Project:
         valid = self.validate_given_simple_params(self.module, self.simple_params.values())
         if valid is True:
             # Check each component definition's parameters
-            for component in self.components_definitions.values():
+            for component in self.components_definitions.loaded_values():
                 valid = self.validate_given_simple_params(component.type, \
                                                          component.simple_params.values())
                 if valid is False:
@@ -948,14 +1356,21 @@ class Project:
                 param.param_value = current_path                
                 log_debug("Resolved path '%s': '%s'" % (param.param_id, param.param_value))
                 
-        for comp_def in self.components_definitions.values():
-            for param in comp_def.simple_params.values():
-                if param.param_type == "path":
-                    current_path = self.expand_all_tokens(param.param_value)["out_str"]
-                    current_path = cg.string_to_path(current_path)
-                    param.param_value = current_path  
-                    log_debug("Resolved component '%s' path '%s': '%s'" \
-                              % (comp_def.type, param.param_id, param.param_value))
+        for comp_def in self.components_definitions.loaded_values():
+            self.resolve_definition_paths(comp_def)
+        
+        self.paths_resolved = True
+    
+    #===============================================================================================
+    def resolve_definition_paths(self, comp_def):
+        """ Expands all parameters of type "path" of the given component definition. """ 
+        for param in comp_def.simple_params.values():
+            if param.param_type == "path":
+                current_path = self.expand_all_tokens(param.param_value)["out_str"]
+                current_path = cg.string_to_path(current_path)
+                param.param_value = current_path  
+                log_debug("Resolved component '%s' path '%s': '%s'" \
+                          % (comp_def.type, param.param_id, param.param_value))
     
     #===============================================================================================
     def get_work_file_path(self, comp_id, param_id):
@@ -970,6 +1385,28 @@ class Project:
         
         return return_value
     
+    #===============================================================================================
+    def pickle_models(self):
+        """ Returns True if models shall be passed to templates through pickle files. """
+        
+        return self.get_simple_param_val(self.module, "project_pickle_models", False) is True
+    
+    #===============================================================================================
+    def get_cog_project_variables(self):
+        """ Returns the template variables used to hand over this project to cog templates.
+        
+        If models are pickled, the variable 'cog_proj_pickle_file' with the path of the project
+        pickle file is returned, otherwise the live project object is returned in variable
+        'cog_proj_obj'.
+        """
+        if self.pickle_models() is True:
+            return_value = {"cog_proj_pickle_file" : \
+                            str(self.get_work_file_path(self.module, "project_pickle"))}
+        else:
+            return_value = {"cog_proj_obj" : self}
+        
+        return return_value
+    
     #===============================================================================================
     def get_component_root_path(self, component_id):
         """ Returns the path with cog files for the given component. 
@@ -1082,13 +1519,10 @@ class Project:
             # -----------------------------------
             log_info('---------------- Loading project parameters and component definitions...')
             components_lst = self.find_components(self.calvos_path)
-            for comp_name, comp_xml in components_lst.items():
-                # Create component definition object
-                self.components_definitions.update({comp_name : self.CompDefinition(comp_name)})
-                # Parse XML with component definitions
-                defs_XML_tree = ET.parse(comp_xml)
-                defs_XML_root = defs_XML_tree.getroot()
-                self.load_component_definitions(defs_XML_root, self.components_definitions[comp_name])
+            for comp_name in components_lst.keys():
+                self.components_definitions.register(comp_name)
+                # Load definitions of all the components
+                self.components_definitions[comp_name]
             
             log_info('Loaded project parameters and component definitions.')
             
@@ -1183,11 +1617,58 @@ class Project:
             self.title = kwargs.get('title', None)
             self.desc = kwargs.get('desc', None)
             self.instances = kwargs.get('instances', None)
+            self.dependencies = kwargs.get('dependencies', [])
             self.params = kwargs.get('params', None)
             self.simple_params = {} # {param_id : SimpleParam object}
             self.inputs = {}    # {file_name : file_type ("ods", "xml")}
             self.default_inputs = {}    # {file_name : file_type ("ods", "xml")}
     
+    #===============================================================================================
+    class CompDefinitions(dict):
+        """ Dictionary {component type : CompDefinition object} which loads each definition at
+        its first access.
+        
+        All registered component types are keys of the dictionary (so membership checks don't
+        load anything), types whose definition is not loaded yet have a None value internally.
+        """
+        def __init__(self, project):
+            super().__init__()
+            self.project = project
+        
+        def __reduce__(self):
+            # Pickle without loading definitions
+            return (self.__class__, (self.project,), None, None, iter(dict.items(self)))
+        
+        def __getitem__(self, component_type):
+            comp_def = dict.__getitem__(self, component_type)
+            if comp_def is None:
+                comp_def = self.project.load_definition(component_type)
+            return comp_def
+        
+        def register(self, component_type):
+            """ Registers a component type whose definition is to be loaded at first use. """
+            if component_type not in self:
+                dict.__setitem__(self, component_type, None)
+        
+        def is_loaded(self, component_type):
+            """ Returns True if the definition of the given type was already loaded. """
+            return dict.get(self, component_type, None) is not None
+        
+        def loaded_values(self):
+            """ Returns a list with the already loaded definitions. """
+            return [comp_def for comp_def in dict.values(self) if comp_def is not None]
+        
+        def get(self, component_type, default = None):
+            if component_type in self:
+                return self[component_type]
+            return default
+        
+        def values(self):
+            return [self[component_type] for component_type in self]
+        
+        def items(self):
+            return [(component_type, self[component_type]) for component_type in self]
+    
     #===============================================================================================
     class Component:
         """ Models a calvos project Component. """
@@ -1218,6 +1699,11 @@ class Project:
             self.component_object = None
             
             self.simple_params = {}
+            
+            # Generation results
+            self.generated = False
+            self.failed = False
+            self.output_files = []
         
         #===========================================================================================
         @classmethod
@@ -1250,7 +1736,8 @@ class Project:
             """ Sets the input file and input type for this component. """
             self.input_file_path = cg.string_to_path(str(input_file))
             
-            if input_type == IN_TYPE_XML or input_type == IN_TYPE_ODS:
+            if input_type == IN_TYPE_XML or input_type == IN_TYPE_ODS \
+            or input_type == IN_TYPE_DBC:
                 self.input_type = input_type
             else:
                 self.input_type = None
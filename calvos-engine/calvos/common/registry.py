@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+""" CalvOS Component Registry Module.
+
+Registry of the calvos components found within the calvos package. A calvos component is a
+module.py together with a module.xml (component definition) at the same path.
+
+Searching the package and reading the component definitions on every run is avoided by storing
+the registry in a user cache file. The cached registry is used as long as the calvos version
+and the modification times of the package folders and of the component definition files are
+the same as when it was created. The registry holds only the attributes of the root element of
+each component definition (e.g., instances, depends), the definitions themselves are parsed
+only when needed (see Project.CompDefinitions).
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import os
+import sys
+import json
+import hashlib
+import pathlib as pl
+import xml.etree.ElementTree as ET
+
+import calvos.__version__ as calvos_version
+import calvos.common.logsys as lg
+import calvos.common.general as grl
+
+# --------------------------------------------------------------------------------------------------
+# Definitions for the logging system
+# --------------------------------------------------------------------------------------------------
+LOGGER_LABEL = "registry"
+
+log = lg.log_system
+log.add_logger(LOGGER_LABEL)
+
+def log_debug(message):
+    log.debug(LOGGER_LABEL, message)
+
+def log_info(message):
+    log.info(LOGGER_LABEL, message)
+
+def log_warn(message):
+    log.warning(LOGGER_LABEL, message)
+
+def log_error(message):
+    log.error(LOGGER_LABEL, message)
+
+def log_critical(message):
+    log.critical(LOGGER_LABEL, message)
+# --------------------------------------------------------------------------------------------------
+
+# Format version of the registry file
+REGISTRY_VERSION = 1
+
+# Folders not searched for components
+IGNORED_FOLDERS = ["__pycache__"]
+
+#===================================================================================================
+def get_cache_path():
+    """ Returns the folder for calvos user cache files. """
+    if sys.platform.startswith("win") and "LOCALAPPDATA" in os.environ:
+        cache_path = pl.Path(os.environ["LOCALAPPDATA"])
+    elif "XDG_CACHE_HOME" in os.environ:
+        cache_path = pl.Path(os.environ["XDG_CACHE_HOME"])
+    else:
+        cache_path = pl.Path.home() / ".cache"
+
+    return cache_path / "calvos"
+
+#===================================================================================================
+def get_registry_file(calvos_path):
+    """ Returns the registry cache file for the given calvos package path. """
+    path_hash = hashlib.sha1(str(pl.Path(calvos_path).resolve()).encode()).hexdigest()[:12]
+
+    return get_cache_path() / ("component_registry_%s.json" % path_hash)
+
+#===================================================================================================
+def read_definition_header(xml_path):
+    """ Returns the attributes of interest of the root element of a component definition
+    (instances and depends) without parsing the whole file. """
+    header = {"instances" : None, "depends" : []}
+    for _, element in ET.iterparse(str(xml_path), events = ("start",)):
+        instances = element.get("instances", None)
+        if instances is not None:
+            header["instances"] = grl.process_simple_param("list", instances)
+        depends = element.get("depends", None)
+        if depends is not None:
+            depends = grl.process_simple_param("list", depends)
+            if depends is not None:
+                header["depends"] = depends
+        break
+
+    return header
+
+#===================================================================================================
+def scan_components(calvos_path):
+    """ Searches the calvos package for components.
+
+    Returns
+    -------
+        dict
+            Registry data: {"registry_version", "calvos_version", "calvos_path",
+            "folders" : {folder : mtime}, "components" : {component type : {"xml", "mtime",
+            "instances", "depends"}}}. Components are sorted by path of their python module.
+    """
+    calvos_path = pl.Path(calvos_path)
+    folders = {}
+    found = []
+    for folder, sub_folders, files in os.walk(str(calvos_path)):
+        sub_folders[:] = sorted(sub_folder for sub_folder in sub_folders \
+                                if sub_folder not in IGNORED_FOLDERS \
+                                and not sub_folder.startswith("."))
+        folders.update({folder : os.stat(folder).st_mtime_ns})
+        for file_name in files:
+            if file_name.endswith(".py"):
+                xml_path = pl.Path(folder) / (file_name[:-3] + ".xml")
+                if xml_path.is_file():
+                    found.append(pl.Path(folder) / file_name)
+
+    components = {}
+    for py_path in sorted(found):
+        xml_path = py_path.with_suffix(".xml")
+        module_name = ".".join(py_path.relative_to(calvos_path).with_suffix("").parts)
+        component = {"xml" : str(xml_path), "mtime" : os.stat(str(xml_path)).st_mtime_ns}
+        try:
+            component.update(read_definition_header(xml_path))
+        except Exception as e:
+            log_warn("Failed to read component definition '%s'. Reason: %s" % (xml_path, e))
+            continue
+        components.update({module_name : component})
+        log_debug("Found component: '%s', XML: '%s'" % (module_name, xml_path))
+
+    return {"registry_version" : REGISTRY_VERSION, \
+            "calvos_version" : calvos_version.__version__, \
+            "calvos_path" : str(calvos_path), \
+            "folders" : folders, \
+            "components" : components}
+
+#===================================================================================================
+def is_registry_valid(registry, calvos_path):
+    """ Returns True if the given registry data is up to date. """
+    if registry.get("registry_version", None) != REGISTRY_VERSION \
+    or registry.get("calvos_version", None) != calvos_version.__version__ \
+    or registry.get("calvos_path", None) != str(calvos_path):
+        return False
+    try:
+        for folder, mtime in registry["folders"].items():
+            if os.stat(folder).st_mtime_ns != mtime:
+                return False
+        for component in registry["components"].values():
+            if os.stat(component["xml"]).st_mtime_ns != component["mtime"]:
+                return False
+    except (OSError, KeyError):
+        return False
+
+    return True
+
+#===================================================================================================
+def load_registry(calvos_path):
+    """ Returns the registry of components of the given calvos package path.
+
+    The cached registry is used if it is up to date, otherwise the package is searched again
+    and the cache is updated (failures to write the cache are ignored).
+
+    Returns
+    -------
+        dict
+            {component type : {"xml" : xml path, "instances" : list, "depends" : list}}
+    """
+    calvos_path = pl.Path(calvos_path)
+    registry_file = get_registry_file(calvos_path)
+    registry = None
+    try:
+        with open(registry_file, "r") as f:
+            registry = json.load(f)
+    except Exception:
+        registry = None
+
+    if registry is not None and is_registry_valid(registry, calvos_path):
+        log_debug("Using cached component registry '%s'." % registry_file)
+    else:
+        log_debug("Searching calvos components in '%s'." % calvos_path)
+        registry = scan_components(calvos_path)
+        try:
+            registry_file.parent.mkdir(parents = True, exist_ok = True)
+            with open(registry_file, "w") as f:
+                json.dump(registry, f, indent = 1)
+            log_debug("Component registry stored in '%s'." % registry_file)
+        except Exception as e:
+            log_debug("Component registry couldn't be stored. Reason: %s" % e)
+
+    return registry["components"]
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+""" CalvOS Watch Module.
+
+Resident mode of calvos (--watch argument). The project is loaded once and kept in memory
+together with its loaded components and the compiled templates. Project inputs are polled for
+changes and, on a change, only the affected components are re-generated (see incremental
+generation in Project.process_project).
+
+Watched files are:
+    - The project file. If changed, the project is re-loaded (compiled templates are kept).
+    - The user input files (usr_in/*.ods and the input files of the project components).
+    - The templates of the project components (files in the components "gen" folders).
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import os
+import sys
+import time
+
+import calvos.common.cogtemplates as ctpl
+import calvos.common.logsys as lg
+
+# --------------------------------------------------------------------------------------------------
+# Definitions for the logging system
+# --------------------------------------------------------------------------------------------------
+LOGGER_LABEL = "watch"
+
+log = lg.log_system
+log.add_logger(LOGGER_LABEL)
+
+def log_debug(message):
+    log.debug(LOGGER_LABEL, message)
+
+def log_info(message):
+    log.info(LOGGER_LABEL, message)
+
+def log_warn(message):
+    log.warning(LOGGER_LABEL, message)
+
+def log_error(message):
+    log.error(LOGGER_LABEL, message)
+
+def log_critical(message):
+    log.critical(LOGGER_LABEL, message)
+# --------------------------------------------------------------------------------------------------
+
+# Default polling period in seconds
+WATCH_INTERVAL = 1.0
+
+#===================================================================================================
+class ProjectWatcher():
+    """ Watches the inputs of a loaded project and re-generates it on changes. """
+
+    def __init__(self, project, interval = WATCH_INTERVAL):
+        """ Class constructor.
+
+        Parameters
+        ----------
+            project : Project
+                Loaded (and already processed) project to watch.
+            interval : float
+                Polling period in seconds.
+        """
+        self.project = project
+        self.interval = interval
+        self.snapshot = self.get_snapshot()
+
+    #===============================================================================================
+    def get_watched_files(self):
+        """ Returns a set with the paths (str) of the files to watch. """
+        watched_files = set()
+        watched_files.add(os.path.abspath(str(self.project.project_file)))
+
+        input_path = self.project.paths["project_inputs"]
+        if input_path.is_dir():
+            for input_file in input_path.glob("*.ods"):
+                watched_files.add(os.path.abspath(str(input_file)))
+
+        for component in self.project.components:
+            if component.input_file_path is not None:
+                watched_files.add(os.path.abspath(str(component.input_file_path)))
+            gen_path = self.project.get_component_gen_path(component.type)
+            if gen_path.is_dir():
+                for template_file in gen_path.rglob("*"):
+                    if template_file.is_file() and "__pycache__" not in template_file.parts:
+                        watched_files.add(os.path.abspath(str(template_file)))
+
+        return watched_files
+
+    #===============================================================================================
+    def get_snapshot(self):
+        """ Returns a dictionary {file : (modification time, size)} of the watched files.
+        Value is None for files that don't exist. """
+        snapshot = {}
+        for watched_file in self.get_watched_files():
+            try:
+                file_stat = os.stat(watched_file)
+                snapshot.update({watched_file : (file_stat.st_mtime_ns, file_stat.st_size)})
+            except OSError:
+                snapshot.update({watched_file : None})
+
+        return snapshot
+
+    #===============================================================================================
+    def get_changed_files(self, new_snapshot):
+        """ Returns the sorted list of files changed between the current snapshot and the
+        given one. """
+        changed_files = []
+        for watched_file in set(self.snapshot) | set(new_snapshot):
+            if self.snapshot.get(watched_file, None) != new_snapshot.get(watched_file, None):
+                changed_files.append(watched_file)
+
+        return sorted(changed_files)
+
+    #===============================================================================================
+    def wait_changes(self):
+        """ Blocks until watched files change and remain stable for one polling period.
+        Returns the list of changed files. """
+        while True:
+            time.sleep(self.interval)
+            new_snapshot = self.get_snapshot()
+            changed_files = self.get_changed_files(new_snapshot)
+            if len(changed_files) > 0:
+                # Wait for files being written (e.g., by the spreadsheet editor) to settle
+                stable_snapshot = None
+                while stable_snapshot != new_snapshot:
+                    stable_snapshot = new_snapshot
+                    time.sleep(self.interval)
+                    new_snapshot = self.get_snapshot()
+                changed_files = self.get_changed_files(new_snapshot)
+                self.snapshot = new_snapshot
+                if len(changed_files) > 0:
+                    return changed_files
+
+    #===============================================================================================
+    def watch(self, reload_project, on_generated = None):
+        """ Watches the project inputs until interrupted (Ctrl+C) re-generating it on changes.
+
+        Parameters
+        ----------
+            reload_project : function
+                Function called as reload_project() when the project file changes. Shall
+                return the newly loaded project object (not yet processed).
+            on_generated : function
+                Optional function called as on_generated(project) after each re-generation
+                (e.g., to export the generated code).
+        """
+        project_file = os.path.abspath(str(self.project.project_file))
+        log_info("Watching %s file(s) for changes." % len(self.snapshot))
+        print("INFO: Watching project inputs for changes. Press Ctrl+C to stop.")
+        while True:
+            changed_files = self.wait_changes()
+            for changed_file in changed_files:
+                log_info("Changed: '%s'" % changed_file)
+            print("INFO: %s file(s) changed, re-generating..." % len(changed_files))
+            start_time = time.perf_counter()
+            errors_count = lg.log_system.get_errors_count()
+
+            invalidate_templates(changed_files)
+            if project_file in changed_files:
+                log_info("Project file changed, re-loading project.")
+                self.project = reload_project()
+            # Only components affected by the changes are re-generated
+            self.project.update_simple_param(self.project.module, "project_incremental", True)
+            self.project.process_project()
+            if on_generated is not None:
+                on_generated(self.project)
+            # Components (hence watched files) may have changed
+            self.snapshot = self.get_snapshot()
+
+            errors_count = lg.log_system.get_errors_count() - errors_count
+            log_info("Re-generation done in %.3f s with %s error(s)." \
+                     % (time.perf_counter() - start_time, errors_count))
+            print("INFO: Re-generation done in %.3f s with %s error(s). Watching for changes..." \
+                  % (time.perf_counter() - start_time, errors_count))
+
+#===================================================================================================
+def invalidate_templates(changed_files):
+    """ Drops compiled templates and imported template helper modules (e.g., cog_CAN.py) of the
+    given changed files so that they are loaded again on their next use. """
+    for changed_file in changed_files:
+        if changed_file in ctpl.compiled_templates:
+            del ctpl.compiled_templates[changed_file]
+            log_debug("Compiled template dropped: '%s'" % changed_file)
+        if changed_file.endswith(".py"):
+            module_name = os.path.splitext(os.path.basename(changed_file))[0]
+            module = sys.modules.get(module_name, None)
+            if module is not None and getattr(module, "__file__", None) is not None \
+            and os.path.abspath(module.__file__) == changed_file:
+                del sys.modules[module_name]
+                log_debug("Template module dropped: '%s'" % module_name)
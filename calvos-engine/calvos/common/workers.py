@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+""" CalvOS Worker Processes Module.
+
+Entry points for the worker processes used to spread loading and code generation across a
+process pool.
+
+This module shall not require the logging system at import time since worker processes may
+import it before their logging system is set-up (e.g., when processes are spawned).
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import io
+import pickle
+import contextlib
+
+import calvos.common.logsys as lg
+
+# Variables shared by all the render jobs of a worker process (e.g., project/network objects).
+shared_variables = None
+
+#===================================================================================================
+def init_worker(log_level, shared_data_pickle):
+    """ Initializes a worker process.
+
+    Log messages of the worker are recorded so that the parent process can replay them.
+    Shared data (codegen module state and shared variables) is given pickled so that it is
+    unpickled only once the logging system of the worker is set-up (calvos modules require it
+    when imported).
+    """
+    global shared_variables
+
+    if lg.log_system is None:
+        lg.log_system = lg.Log(log_level)
+    lg.log_system.start_recording()
+
+    import calvos.common.codegen as cg
+
+    codegen_state, shared_variables = pickle.loads(shared_data_pickle)
+    cg.set_module_state(codegen_state)
+
+#===================================================================================================
+def render_job(template_file, output_file, variables):
+    """ Renders a template in a worker process.
+
+    Returns a tuple with the render return value, the recorded log messages, the captured
+    stdout/stderr and the template timings of the job.
+    """
+    import calvos.common.cogtemplates as ctpl
+
+    template_key = str(template_file)
+    timings_before = ctpl.template_timings.get(template_key, [0, 0, 0])[:]
+
+    cog_variables = {}
+    if shared_variables is not None:
+        cog_variables.update(shared_variables)
+    cog_variables.update(variables)
+
+    captured_stdout = io.StringIO()
+    captured_stderr = io.StringIO()
+    lg.log_system.start_recording()
+    with contextlib.redirect_stdout(captured_stdout), \
+         contextlib.redirect_stderr(captured_stderr):
+        return_value = ctpl.render_template(template_file, output_file, cog_variables)
+    records = lg.log_system.stop_recording()
+
+    timings = ctpl.template_timings.get(template_key, [0, 0, 0])
+    timings = [timings[i] - timings_before[i] for i in range(3)]
+
+    return (return_value, records, captured_stdout.getvalue(), captured_stderr.getvalue(), \
+            timings)
+
+#===================================================================================================
+def component_job(component_idx):
+    """ Loads and generates a project component in a worker process.
+
+    The project is taken from the shared variables (entry "cog_proj_obj"). Returns a tuple with
+    the loaded component object (detached from the worker's project), the recorded log messages,
+    the captured stdout/stderr, the template timings of the job and the generated files.
+    """
+    import calvos.common.cogtemplates as ctpl
+
+    project = shared_variables["cog_proj_obj"]
+    component = project.components[component_idx]
+    # Nested worker pools are not used inside a worker process.
+    project.update_simple_param(project.module, "project_jobs", 1)
+
+    timings_before = {}
+    for template_key, timings in ctpl.template_timings.items():
+        timings_before.update({template_key : timings[:]})
+
+    captured_stdout = io.StringIO()
+    captured_stderr = io.StringIO()
+    lg.log_system.start_recording()
+    with contextlib.redirect_stdout(captured_stdout), \
+         contextlib.redirect_stderr(captured_stderr):
+        project.load_component(component)
+        project.generate_component(component)
+    records = lg.log_system.stop_recording()
+
+    timings_delta = {}
+    for template_key, timings in ctpl.template_timings.items():
+        before = timings_before.get(template_key, [0, 0, 0])
+        timings_delta.update({template_key : [timings[i] - before[i] for i in range(3)]})
+
+    component_object = component.component_object
+    if hasattr(component_object, "project_obj"):
+        component_object.project_obj = None
+
+    return (component_object, records, captured_stdout.getvalue(), captured_stderr.getvalue(), \
+            timings_delta, component.output_files)
@@ -12,11 +12,14 @@ import calvos.common.codegen as cg
 
 from cog_time import log_debug, log_info, log_warn, log_error, log_critical, C_gen_info
 
-try:
-	with open(cog_proj_pickle_file, 'rb') as f:
-		project_obj = pic.load(f)
-except Exception as e:
-        print('Failed to access pickle file %s. Reason: %s' % (cog_proj_pickle_file, e))
+if 'cog_proj_obj' in locals():
+	project_obj = cog_proj_obj
+else:
+	try:
+		with open(cog_proj_pickle_file, 'rb') as f:
+			project_obj = pic.load(f)
+	except Exception as e:
+		print('Failed to access pickle file %s. Reason: %s' % (cog_proj_pickle_file, e))
 ]]] */
 // [[[end]]]
 /*============================================================================*/
@@ -11,19 +11,18 @@ __version__ = '0.0.1'
 __date__ = '2021-01-17'
 __updated__ = '2021-01-17'
     
-import pyexcel as pe
 import math
-from lxml import etree as ET
-import xml.dom.minidom
 import pickle as pic
-import cogapp as cog
 import pathlib as pl
 import importlib
 import json
 
 import calvos.common.codegen as cg
 import calvos.common.logsys as lg
+import calvos.common.cogtemplates as ctpl
 import calvos.common.general as grl
+import calvos.common.odsreader as ods
+import calvos.common.modelcache as mc
 
 # --------------------------------------------------------------------------------------------------
 # Definitions for the logging system
@@ -61,6 +60,10 @@ def log_critical(message):
 # Cog sources to use for code generation of this module
 cog_sources = cg.CogSources("utils.time")
 
+# Version of the model classes (Timers and inner classes). Shall be incremented whenever they
+# change so that cached models (see common.modelcache) are discarded.
+MODEL_SCHEMA_VERSION = 1
+
 class Timers():
     """ Models Utilities for the calvos projects. """
     def __init__(self, project_obj, **kwargs):
@@ -98,7 +101,7 @@ class Timers():
     #===============================================================================================    
     def parse_spreadsheet_ods(self,input_file):
         """ parses an spreadsheet (ods format) to generate the timers. """
-        book = pe.get_book(file_name=str(input_file))
+        book = ods.get_book(input_file, ["Config", "Timers"])
         self.metadata_gen_source_file = str(input_file)
         
         self.input_file = cg.string_to_path(input_file)
@@ -111,12 +114,13 @@ class Timers():
         CONFIG_TITLE_ROW = 1 # Row number with titles
         working_sheet = book["Config"]
         working_sheet.name_columns_by_row(CONFIG_TITLE_ROW)
+        columns = working_sheet.column_indexes
         
         for idx, row in enumerate(working_sheet):
             # Ignore rows that are before the "config's" title row
             if idx >= CONFIG_TITLE_ROW:
-                param_id = row[working_sheet.colnames.index("Parameter")]
-                param_value = row[working_sheet.colnames.index("User Value")]
+                param_id = row[columns["Parameter"]]
+                param_value = row[columns["User Value"]]
                 if param_id != "" \
                 and self.project_obj.simple_param_exists(self.module, param_id) is True:
                     read_only = self.project_obj.simple_param_is_read_only(self.module, param_id)
@@ -172,13 +176,14 @@ class Timers():
         working_sheet = book["Timers"]
         TIMERS_TITLES_ROW = 0 # Row where the node's titles are located
         working_sheet.name_columns_by_row(TIMERS_TITLES_ROW)
+        columns = working_sheet.column_indexes
         
         for idx, row in enumerate(working_sheet):
             # Ignore rows that are before the "node's" title row
             if idx >= TIMERS_TITLES_ROW:
                 timer_obj = None
                 timer_def_error = False
-                timer_id = row[working_sheet.colnames.index("Timer Id")]
+                timer_id = row[columns["Timer Id"]]
                 # Skip rows with no timer id
                 
                 if str(timer_id) != "": 
@@ -191,10 +196,10 @@ class Timers():
                 
                 if timer_obj is not None:
                     # Gather rest of timer parameters
-                    timer_obj.desc = str(row[working_sheet.colnames.index("Description")])
+                    timer_obj.desc = str(row[columns["Description"]])
                     # Get timer tick base time (ms)
                     try:
-                        base_time = int(row[working_sheet.colnames.index("Base tick time (ms)")])
+                        base_time = int(row[columns["Base tick time (ms)"]])
                         # Confirm that selected base tick is a valid value 
                         validator = self.project_obj.get_simple_param_val("utils.time","time_tasks")
                         if base_time in validator:
@@ -209,7 +214,7 @@ class Timers():
                                  + ". Raised exception: \n%s") % (timer_id,e))
                     if timer_def_error is False:
                         # Get timer type if specified.
-                        timer_type = str(row[working_sheet.colnames.index("Type")])
+                        timer_type = str(row[columns["Type"]])
                         validator = self.project_obj.get_simple_param_val("utils.time","time_types")
                         default = self.project_obj.get_simple_param_val("utils.time", \
                                                                         "time_types_default")
@@ -224,7 +229,7 @@ class Timers():
                                 log_warn(("Invalid timer '%s' type. Allowed values are: '%s'. " \
                                           + "Timer not added.") % (timer_id,validator))
                     if timer_def_error is False:
-                        auto_reload = str(row[working_sheet.colnames.index("Auto reload")])
+                        auto_reload = str(row[columns["Auto reload"]])
                         if auto_reload == "True" or auto_reload == "true" or auto_reload == "TRUE":
                             timer_obj.auto_reload = True
                         elif auto_reload == "False" or auto_reload == "false" \
@@ -236,7 +241,7 @@ class Timers():
                                      % timer_id)
                     if timer_def_error is False:
                         # Get timer type if specified, otherwise assume automatic.
-                        reloads = str(row[working_sheet.colnames.index("Reloads")])
+                        reloads = str(row[columns["Reloads"]])
                         if reloads == "":
                             if timer_obj.auto_reload is False:
                                 # If auto reload is False we need a defined number of reloads
@@ -246,21 +251,21 @@ class Timers():
                         else:
                             try:
                                 reloads = \
-                                    int(row[working_sheet.colnames.index("Reloads")])
+                                    int(row[columns["Reloads"]])
                                 timer_obj.reloads = reloads 
                             except Exception as e:
                                 timer_def_error = True
                                 log_warn(("Timer '%s' reloads shall be an integer. Timer not " \
                                          + "added. Raised exception: \n%s") % (timer_id,e))
                     if timer_def_error is False:
-                        period = str(row[working_sheet.colnames.index("Period (ms)")])
+                        period = str(row[columns["Period (ms)"]])
                         if period != "" and timer_obj.auto_reload is True \
                         or timer_obj.reloads > 0:
                             period_mandatory = True
                         else:
                             period_mandatory = False
                         try:
-                            period = int(row[working_sheet.colnames.index("Period (ms)")])
+                            period = int(row[columns["Period (ms)"]])
                             timer_obj.period = period
                         except Exception as e:
                             if period_mandatory:
@@ -271,7 +276,7 @@ class Timers():
                                 log_info(("Timer '%s' period shall be an integer. " \
                                           + "Timer may be added with no period.") % timer_id)
                     if timer_def_error is False:
-                        auto_start = str(row[working_sheet.colnames.index("Auto start")])
+                        auto_start = str(row[columns["Auto start"]])
                         if auto_start == "True" or auto_start == "true" or auto_start == "TRUE":
                             timer_obj.auto_start = True
                         elif auto_start == "False" or auto_start == "false" \
@@ -417,7 +422,7 @@ class Timers():
         return cog_output_file
         
     #===============================================================================================     
-    def cog_generator(self, input_file, cog_output_file, project_pickle_file, variables = None):
+    def cog_generator(self, input_file, cog_output_file, model_variables, variables = None):
         """ Invoke cog generator for the specified file.
         """
         # Setup input and output files
@@ -433,27 +438,19 @@ class Timers():
                 
         # Invoke code generation
         # ----------------------           
-        cog_arguments = ['dummy_argument', \
-                   '-d', \
-                   '-D', 'input_worksheet=' + self.metadata_gen_source_file, \
-                   '-D', 'project_working_dir=' + str(work_dir), \
-                   '-D', 'cog_proj_pickle_file=' + str(project_pickle_file), \
-                   '-D', 'cog_output_file=' + str(cog_output_file)]
+        cog_variables = {"input_worksheet" : self.metadata_gen_source_file, \
+                         "project_working_dir" : str(work_dir), \
+                         "cog_output_file" : str(cog_output_file)}
+        cog_variables.update(model_variables)
         
         # Append additional variables if required
         if variables is not None:
             for variable, variable_val in variables.items():
-                variable_str = str(variable) + "=" +str(variable_val)
-                cog_arguments.append('-D')
-                cog_arguments.append(variable_str)
-
-        cog_arguments.append('-o')
-        cog_arguments.append(str(comgen_CAN_cog_output_file))
-        cog_arguments.append(str(comgen_CAN_cog_input_file))
+                cog_variables.update({str(variable) : str(variable_val)})
         
-                
-        # Call cogapp engine
-        cog_return = cog.Cog().main(cog_arguments)
+        # Render compiled template
+        cog_return = ctpl.render_template(comgen_CAN_cog_input_file, \
+                                          comgen_CAN_cog_output_file, cog_variables)
         if cog_return == 0:
             log_info("Code generation successful: '%s'" % comgen_CAN_cog_output_file)
             print("INFO: code generation successful: ",comgen_CAN_cog_output_file)
@@ -469,8 +466,8 @@ class Timers():
 
         global cog_sources
                 
-        # Get project pickle full file name 
-        project_pickle = self.project_obj.get_work_file_path("common.project","project_pickle")
+        # Hand over project object to the templates (live object or pickle file)
+        model_variables = self.project_obj.get_cog_project_variables()
          
         #----------------------------------------------------------------------
         # Generate source file(s)
@@ -484,7 +481,7 @@ class Timers():
                 include_var = json.dumps(includes_lst)
                 variables.update({"include_var" : include_var})
                   
-            self.cog_generator(cog_source.cog_in_file, cog_source.cog_out_file, project_pickle, \
+            self.cog_generator(cog_source.cog_in_file, cog_source.cog_out_file, model_variables, \
                               variables)
 #         
 #         # Delete pickle file
@@ -530,10 +527,17 @@ def load_input(input_file, input_type, params, project_obj):
         This function returns an object with the loaded data for the current module. For CAN
         Networks this object is of class Network_CAN.
     """
-    del input_type, params # Unused parameters
+    del input_type # Unused parameters
+    
+    def parse_model():
+        timers = Timers(project_obj)
+        timers.parse_spreadsheet_ods(input_file)
+        return timers
+    
     try:
-        return_object = Timers(project_obj)
-        return_object.parse_spreadsheet_ods(input_file)
+        # Parsed timers are taken from the model cache if input and parameters didn't change
+        return_object = mc.get_model(project_obj, "utils.time", MODEL_SCHEMA_VERSION, \
+                                     input_file, params, parse_model)
         try:
             return_object.update_cog_sources()
         except Exception as e:
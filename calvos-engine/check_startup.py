@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" CalvOS CLI start-up budget check.
+
+Runs the calvos CLI with python's "-X importtime" option and fails (exit code 1) if the
+cumulative import time of any of the checked scenarios exceeds the configured budget or if
+heavy dependencies (cogapp, pyexcel, lxml, odf) get imported at start-up. These shall only be
+imported at first use.
+
+Usage:
+    python check_startup.py [--budget MILLISECONDS] [--runs N]
+
+Budget can also be given in the environment variable CALVOS_STARTUP_BUDGET_MS.
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+__version__ = '0.0.1'
+__date__ = '2021-03-01'
+__updated__ = '2021-03-01'
+
+import os
+import re
+import sys
+import subprocess
+from argparse import ArgumentParser
+
+# Default import-time budget in milliseconds.
+DEFAULT_BUDGET_MS = 200
+
+# Modules which shall not be imported at start-up.
+HEAVY_MODULES = ["cogapp", "pyexcel", "lxml", "odf"]
+
+# Start-up scenarios {name : python arguments}
+SCENARIOS = {
+    "--version" : ["-m", "calvos", "--version"],
+    "--help" : ["-m", "calvos", "--help"],
+    # Modules imported by --demo and before processing a project.
+    "project import" : ["-c", "import calvos.common.logsys as lg; " \
+                        + "lg.log_system = lg.Log(20); import calvos.common.project"],
+    }
+
+IMPORTTIME_REGEX = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+#===================================================================================================
+def measure(python_args):
+    """ Runs python with the given arguments and "-X importtime".
+
+    Returns
+    -------
+        tuple
+            (total cumulative import time in microseconds, list of imported module names)
+    """
+    env = dict(os.environ)
+    engine_path = os.path.dirname(os.path.abspath(__file__))
+    env["PYTHONPATH"] = engine_path + os.pathsep + env.get("PYTHONPATH", "")
+    # Don't use bytecode compilation time of a first run as measurement
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run([sys.executable, "-X", "importtime"] + python_args, env = env, \
+                            cwd = engine_path, stdout = subprocess.DEVNULL, \
+                            stderr = subprocess.PIPE, universal_newlines = True)
+    total_us = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_REGEX.match(line)
+        if match is not None:
+            modules.append(match.group(4))
+            # Top level imports (no indentation) include the time of their sub-imports.
+            if len(match.group(3)) <= 1:
+                total_us += int(match.group(2))
+
+    return (total_us, modules)
+
+#===================================================================================================
+def main():
+    parser = ArgumentParser(description = "Checks the start-up import time of the calvos CLI.")
+    parser.add_argument("--budget", type = float, \
+                        default = float(os.environ.get("CALVOS_STARTUP_BUDGET_MS", \
+                                                       DEFAULT_BUDGET_MS)), \
+                        help = "Import-time budget in milliseconds. Default is %s." \
+                        % DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type = int, default = 3, \
+                        help = "Number of runs per scenario, best one is taken. Default is 3.")
+    args = parser.parse_args()
+
+    return_value = 0
+    for scenario, python_args in SCENARIOS.items():
+        # Warm-up run (creates bytecode caches)
+        measure(python_args)
+        best_us = None
+        modules = []
+        for _ in range(max(1, args.runs)):
+            total_us, modules = measure(python_args)
+            if best_us is None or total_us < best_us:
+                best_us = total_us
+
+        heavy_imports = sorted(set(module.split(".")[0] for module in modules \
+                                   if module.split(".")[0] in HEAVY_MODULES))
+        status = "OK"
+        if best_us / 1000 > args.budget:
+            status = "FAIL (over budget)"
+            return_value = 1
+        if len(heavy_imports) > 0:
+            status = "FAIL (imports %s)" % ", ".join(heavy_imports)
+            return_value = 1
+        print("%-16s %8.1f ms (budget %.1f ms)  %s" \
+              % (scenario, best_us / 1000, args.budget, status))
+
+    return return_value
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+""" Property test of Network_CAN.get_sorted_signals_by_layout.
+
+Compares the keyed sort of get_sorted_signals_by_layout against the former implementation
+(kept below as reference_sorted_signals_by_layout) over seeded random networks: the returned
+structure (flat and grouped by message), the order and identity of the signals and the logged
+warnings shall be the same, also when the result is memoized.
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+import logging
+import random
+import unittest
+
+import calvos.common.logsys as lg
+
+# CAN module takes the log system at import time.
+if lg.log_system is None:
+    lg.log_system = lg.Log(logging.WARNING, None, to_console = False)
+
+import calvos.comgen.CAN as nw
+from calvos.comgen.CAN import log_warn
+
+# Number of random networks and seed of the property test.
+RANDOM_NETWORKS = 300
+RANDOM_SEED = 1
+
+#===================================================================================================
+def reference_sorted_signals_by_layout(self, grouped_by_message = False):
+    """ Former implementation of Network_CAN.get_sorted_signals_by_layout (reference). """
+    return_list = {}
+    sorted_signals_list = []
+
+    # If input signals has elements do the sorting, otherwise return empty output.
+    if len(self.signals) > 0:
+        # Create working list of signals
+        for signal in self.signals:
+            if self.signals[signal].message is not None:
+                sorted_signals_list.append({signal : self.signals[signal]})
+            else:
+                log_warn(("Signal: \"" + signal \
+                        + "\" doesn't have a publishing message."))
+
+        # Sort signals by their messages
+        sorted_signals_list = \
+            sorted(sorted_signals_list, \
+                   key= lambda signal_entry : list(signal_entry.values())[0].message)
+
+        # Sort signals by layout within each message
+        # Following code will create temporal individual lists of signals
+        # for each message, then sort them. At the end all lists will be
+        # glued back together.
+        current_message = list(sorted_signals_list[0].values())[0].message
+        signals_of_a_message = []
+        list_of_list_of_signals = []
+        counter = 0
+
+        for signal in sorted_signals_list:
+
+            counter += 1
+            signal_object = list(signal.values())[0]
+            signal_name = list(signal.keys())[0]
+
+            # Check if we have changed to another message or not
+            if signal_object.message == current_message:
+                new_message = False
+            else:
+                # Jumping to a new message. Need to sort the list of the
+                # current message and then start the one of the new message
+                new_message = True
+
+            # For last item sort the list of current message and append it
+            # to the list of lists
+            if counter == len(sorted_signals_list):
+                last_signal = True
+            else:
+                last_signal = False
+            # If from above code a sort and start new list is required
+            # then do it.
+
+            if not new_message and not last_signal:
+                pre_add_signal = True
+                sort_and_append = False
+                post_add_signal = False
+                append_directly = False
+            elif not new_message and last_signal:
+                pre_add_signal = True
+                sort_and_append = True
+                post_add_signal = False
+                append_directly = False
+            elif new_message and not last_signal:
+                pre_add_signal = False
+                sort_and_append = True
+                post_add_signal = True
+                append_directly = False
+            else: #new_byte and last_byte
+                pre_add_signal = False
+                sort_and_append = True
+                post_add_signal = True
+                append_directly = True
+
+            # Execute actions
+            if pre_add_signal:
+                # Keep forming list of signals for a message
+                signals_of_a_message.append({signal_name : signal_object})
+            if sort_and_append:
+                # 1) Sort the list
+                signals_of_a_message = \
+                    sorted(signals_of_a_message, \
+                           key= lambda signal_entry : \
+                           list(signal_entry.values())[0].start_byte)
+                # Now sort by byte and bit
+                # ------------------------
+                # Now sort each byte by start_bit
+                # A new list for each byte will be created, then it will be
+                # sorted. At the end it will be glued back to the list of the
+                # message.
+                current_byte = list(signals_of_a_message[0].values())[0].start_byte
+                signals_by_start_byte = []
+                list_of_lists_by_byte = []
+                counter2 = 0
+                for signal_in_byte in signals_of_a_message:
+                    counter2 += 1
+                    signal_name2 = list(signal_in_byte.keys())[0]
+                    signal_object2 = list(signal_in_byte.values())[0]
+
+                    # Check if we have changed to another byte or not
+                    if signal_object2.start_byte == current_byte:
+                        new_byte = False
+
+                    else:
+                        # Jumping to a new byte. Defer appending this new signal
+                        # until after the list for current byte is sorted
+                        # and appended to the parent's list.
+                        new_byte = True
+                    # For last item sort the list of current byte and append it
+                    # to the list of lists
+                    if counter2 == len(signals_of_a_message):
+                        last_byte = True
+                    else:
+                        last_byte = False
+                    # If from above code a sort and start new list is required
+                    # then do it.
+
+                    if not new_byte and not last_byte:
+                        pre_add_signal2 = True
+                        sort_and_append2 = False
+                        post_add_signal2 = False
+                        append_directly2 = False
+                    elif not new_byte and last_byte:
+                        pre_add_signal2 = True
+                        sort_and_append2 = True
+                        post_add_signal2 = False
+                        append_directly2 = False
+                    elif new_byte and not last_byte:
+                        pre_add_signal2 = False
+                        sort_and_append2 = True
+                        post_add_signal2 = True
+                        append_directly2 = False
+                    else: #new_byte and last_byte
+                        pre_add_signal2 = False
+                        sort_and_append2 = True
+                        post_add_signal2 = True
+                        append_directly2 = True
+                    # Execute actions
+                    if pre_add_signal2:
+                        # Keep forming list of signals by start byte
+                        signals_by_start_byte.append({signal_name2 : signal_object2})
+                    if sort_and_append2:
+                        # 1) Sort the list
+                        signals_by_start_byte = \
+                            sorted(signals_by_start_byte, \
+                                   key= lambda signal_entry : \
+                                   list(signal_entry.values())[0].start_bit)
+                        # 2) Append list to the parent's list
+                        list_of_lists_by_byte.append(signals_by_start_byte.copy())
+                    if post_add_signal2:
+                        current_byte = signal_object2.start_byte
+                        signals_by_start_byte.clear()
+                        signals_by_start_byte.append({signal_name2 : signal_object2})
+
+                    if append_directly2:
+                        # 2) Append list to the parent's list
+                        list_of_lists_by_byte.append(signals_by_start_byte.copy())
+
+                # glue_back the list
+                signals_of_a_message.clear()
+                for this_list in list_of_lists_by_byte:
+                    for element in this_list:
+                        signal_name3 = list(element.keys())[0]
+                        signal_object3 = list(element.values())[0]
+                        signals_of_a_message.append({signal_name3 : \
+                                                     signal_object3})
+                # ------------------------
+
+                # 3) Append list to the parent's list
+                list_of_list_of_signals.append(signals_of_a_message.copy())
+            if post_add_signal:
+                # Start the list of the new message
+                current_message = signal_object.message
+                signals_of_a_message.clear()
+                signals_of_a_message.append({signal_name : signal_object})
+
+            if append_directly:
+                # Append list to the parent's list
+                list_of_list_of_signals.append(signals_of_a_message.copy())
+
+        if grouped_by_message is False:
+            #"flatten" the list to be ready to be returned. This list will
+            # contain each signal ordered by message and by layour (start
+            # byte, start bit)
+            for this_list in list_of_list_of_signals:
+                for element in this_list:
+                    signal_name = list(element.keys())[0]
+                    signal_object = list(element.values())[0]
+                    return_list.update({signal_name : signal_object})
+        else:
+            # Return list will contain a list for each found message
+            # each of these lists is indeed another list with the
+            # signals of that message ordered by layout.
+            return_list = list_of_list_of_signals
+
+        return return_list
+
+#===================================================================================================
+class ProjectStub():
+    """ Minimal project object required by Network_CAN. """
+    def get_component_gen_path(self, module):
+        return None
+
+#===================================================================================================
+def random_network(rand):
+    """ Returns a random CAN network. Some signals are left without message, some networks get
+    all their signals without message and in some networks signals share their start bit. """
+    network = nw.Network_CAN(ProjectStub())
+    message_names = rand.sample(["MSG_%d" % i for i in range(20)], rand.randint(1, 6))
+    for i, message_name in enumerate(message_names):
+        network.add_message(message_name, i + 1, rand.randint(1, 8), False, "spontan")
+
+    all_unmapped = rand.random() < 0.05
+    for i in range(rand.randint(1, 30)):
+        signal_name = "SIG_%d" % i
+        network.add_signal(signal_name, rand.randint(1, 16))
+        if all_unmapped is False and rand.random() < 0.9:
+            network.add_signal_to_message(rand.choice(message_names), signal_name, \
+                                          rand.randint(0, 7), rand.randint(0, 7))
+
+    if rand.random() < 0.3:
+        # Signals sharing their start bit (same layout position)
+        for signal in network.signals.values():
+            if signal.message is not None and rand.random() < 0.3:
+                signal.start_bit = 0
+        network.clear_sorted_signals()
+
+    return network
+
+#===================================================================================================
+def layout(sorted_signals):
+    """ Returns the given result of get_sorted_signals_by_layout as names and object ids. """
+    if isinstance(sorted_signals, dict):
+        return [(name, id(signal)) for name, signal in sorted_signals.items()]
+    else:
+        return [[(name, id(signal)) for entry in group for name, signal in entry.items()] \
+                for group in sorted_signals]
+
+#===================================================================================================
+def call_recording(function, *args):
+    """ Calls function returning its result (or raised exception) and the logged messages. """
+    lg.log_system.start_recording()
+    try:
+        result = function(*args)
+    except Exception as e:
+        result = e
+    return result, lg.log_system.stop_recording()
+
+#===================================================================================================
+class TestSortedSignalsByLayout(unittest.TestCase):
+
+    def test_against_reference(self):
+        rand = random.Random(RANDOM_SEED)
+        for i in range(RANDOM_NETWORKS):
+            network = random_network(rand)
+            all_unmapped = all(signal.message is None for signal in network.signals.values())
+            for grouped in (False, True):
+                with self.subTest(network = i, grouped = grouped):
+                    expected, expected_log = call_recording(reference_sorted_signals_by_layout, \
+                                                            network, grouped)
+                    # Second call gets the memoized sorting
+                    for _ in range(2):
+                        result, result_log = call_recording( \
+                            network.get_sorted_signals_by_layout, grouped)
+                        self.assertEqual(result_log, expected_log)
+                        if all_unmapped is True:
+                            # Reference fails in this case, now an empty result is returned.
+                            self.assertIsInstance(expected, IndexError)
+                            self.assertEqual(result, [] if grouped else {})
+                        else:
+                            self.assertIs(type(result), type(expected))
+                            self.assertEqual(layout(result), layout(expected))
+
+    def test_without_signals(self):
+        network = nw.Network_CAN(ProjectStub())
+        for grouped in (False, True):
+            self.assertIsNone(reference_sorted_signals_by_layout(network, grouped))
+            self.assertIsNone(network.get_sorted_signals_by_layout(grouped))
+
+    def test_memo_cleared(self):
+        network = nw.Network_CAN(ProjectStub())
+        network.add_message("MSG_1", 1, 8, False, "spontan")
+        network.add_signal("SIG_1", 8)
+        network.add_signal_to_message("MSG_1", "SIG_1", 1, 0)
+        updates = [("add_signal", lambda: network.add_signal("SIG_2", 8)),
+                   ("add_signal_to_message", \
+                    lambda: network.add_signal_to_message("MSG_1", "SIG_2", 0, 0)),
+                   ("update_indexes", network.update_indexes)]
+        for name, update in updates:
+            with self.subTest(update = name):
+                network.get_sorted_signals_by_layout()
+                self.assertIsNotNone(network.sorted_signals)
+                update()
+                self.assertIsNone(network.sorted_signals)
+        # Memo rebuilt with the updated layout
+        self.assertEqual(list(network.get_sorted_signals_by_layout()), ["SIG_2", "SIG_1"])
+
+if __name__ == '__main__':
+    unittest.main()
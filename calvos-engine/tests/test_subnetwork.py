@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+""" Test of Network_CAN.get_subnetwork views.
+
+A subnetwork view shares the nodes, messages and signals objects of its network but shall keep
+its own parameters and caches: changing or filling them in the view shall not affect the
+network and vice versa.
+
+@author: Carlos Calvillo
+@copyright:  2020 Carlos Calvillo. All rights reserved.
+@license:    GPL v3
+"""
+import logging
+import unittest
+
+import calvos.common.logsys as lg
+
+# CAN module takes the log system at import time.
+if lg.log_system is None:
+    lg.log_system = lg.Log(logging.WARNING, None, to_console = False)
+
+import calvos.comgen.CAN as nw
+import calvos.common.general as grl
+
+#===================================================================================================
+class ProjectStub():
+    """ Minimal project object required by Network_CAN. """
+    def get_component_gen_path(self, module):
+        return None
+
+#===================================================================================================
+def network_with_nodes():
+    """ Returns a network with two nodes, each one publishing a message with two signals. """
+    network = nw.Network_CAN(ProjectStub())
+    for i, node_name in enumerate(["NODE_A", "NODE_B"]):
+        network.add_node(node_name, "")
+        message_name = "MSG_%d" % i
+        network.add_message(message_name, i + 1, 8, False, "spontan")
+        network.add_tx_message_to_node(node_name, message_name)
+        for j in range(2):
+            signal_name = "SIG_%d_%d" % (i, j)
+            network.add_signal(signal_name, 8)
+            network.add_signal_to_message(message_name, signal_name, 1 - j, 0)
+    return network
+
+#===================================================================================================
+class TestSubnetworkView(unittest.TestCase):
+
+    def test_subnetwork_content(self):
+        network = network_with_nodes()
+        subnetwork = network.get_subnetwork(["NODE_A"])
+        self.assertEqual(list(subnetwork.nodes), ["NODE_A"])
+        self.assertEqual(list(subnetwork.messages), ["MSG_0"])
+        self.assertEqual(list(subnetwork.signals), ["SIG_0_0", "SIG_0_1"])
+        self.assertIs(subnetwork.signals["SIG_0_0"], network.signals["SIG_0_0"])
+
+    def test_params_independent(self):
+        network = network_with_nodes()
+        network.simple_params.update( \
+            {"CAN_tx_data_init" : grl.SimpleParam("CAN_tx_data_init", "int", 0)})
+        subnetwork = network.get_subnetwork(["NODE_A"])
+
+        subnetwork.simple_params["CAN_tx_data_init"].param_value = 255
+        subnetwork.gP.p["part_px"].pl[0] = "view_"
+        self.assertEqual(network.get_simple_param("CAN_tx_data_init"), 0)
+        self.assertEqual(network.gP.get_p("part_px", 0), "")
+
+        network.simple_params["CAN_tx_data_init"].param_value = 1
+        self.assertEqual(subnetwork.get_simple_param("CAN_tx_data_init"), 255)
+
+    def test_sorted_signals_independent(self):
+        network = network_with_nodes()
+        network.get_sorted_signals_by_layout()
+        subnetwork = network.get_subnetwork(["NODE_B"])
+        self.assertIsNone(subnetwork.sorted_signals)
+        self.assertEqual(list(subnetwork.get_sorted_signals_by_layout()), \
+                         ["SIG_1_1", "SIG_1_0"])
+        self.assertEqual(list(network.get_sorted_signals_by_layout()), \
+                         ["SIG_0_1", "SIG_0_0", "SIG_1_1", "SIG_1_0"])
+
+        network.clear_sorted_signals()
+        self.assertIsNotNone(subnetwork.sorted_signals)
+
+    def test_signal_access_independent(self):
+        network = network_with_nodes()
+        subnetwork = network.get_subnetwork(["NODE_A"])
+        self.assertEqual(subnetwork.signal_access_plans, {})
+        self.assertEqual(subnetwork.signals_access, {})
+
+        subnetwork.get_signal_access("SIG_0_0", nw.READ)
+        self.assertEqual(network.signal_access_plans, {})
+        self.assertEqual(network.signals_access, {})
+
+        network.get_signal_access("SIG_1_0", nw.WRITE)
+        self.assertNotIn((nw.WRITE, "SIG_1_0"), subnetwork.signals_access)
+        self.assertEqual(len(subnetwork.signal_access_plans), 1)
+
+if __name__ == '__main__':
+    unittest.main()